@@ -0,0 +1,149 @@
+# AllocationTracker.py
+# This is an opt-in instrumentation mode that counts the runtime objects a Lox program allocates.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import json, sys
+from collections import Counter, defaultdict
+from Interpreter import Interpreter
+from Environment import Environment
+from LoxFunction import LoxFunction
+from LoxInstance import LoxInstance
+from Return import Return
+
+# Runtime classes whose allocations are counted, and those whose live objects are tracked.
+TRACKED = [Environment, LoxFunction, LoxInstance, Return]
+LIVE = [Environment, LoxInstance]
+LIVE_NAMES = {cls.__name__ for cls in LIVE}
+
+# The token field each visit method reads its source line from.
+LINE_TOKENS = {
+    "visitAssignExpr": "name",
+    "visitBinaryExpr": "operator",
+    "visitCallExpr": "paren",
+    "visitGetExpr": "name",
+    "visitLogicalExpr": "operator",
+    "visitSetExpr": "name",
+    "visitSuperExpr": "keyword",
+    "visitThisExpr": "keyword",
+    "visitUnaryExpr": "operator",
+    "visitVariableExpr": "name",
+    "visitClassStmt": "name",
+    "visitFunctionStmt": "name",
+    "visitReturnStmt": "keyword",
+    "visitVarStmt": "name",
+}
+
+class TrackingInterpreter(Interpreter):
+    """An Interpreter that remembers the source line of the node it is evaluating."""
+    line = 0
+
+def trackLine(visit, tokenField):
+    def visitTracked(self, node):
+        self.line = getattr(node, tokenField).line
+        try:
+            return visit(self, node)
+        finally:
+            self.line = getattr(node, tokenField).line
+    return visitTracked
+
+for visitName, tokenField in LINE_TOKENS.items():
+    setattr(TrackingInterpreter, visitName, trackLine(getattr(Interpreter, visitName), tokenField))
+
+class AllocationTracker:
+    def __init__(self, interpreter: TrackingInterpreter):
+        self.interpreter = interpreter
+        self.allocations = Counter()
+        self.byLine = defaultdict(Counter)
+        self.live = Counter()
+        # The ids of the live objects counted, since objects made before install are freed uncounted.
+        self.counted = set()
+        self.peakLive = Counter()
+        self.originals = {}
+        self.recycling = None
+
+    def allocate(self, name: str, obj):
+        self.allocations[name] += 1
+        self.byLine[self.interpreter.line][name] += 1
+        if name in LIVE_NAMES:
+            self.counted.add(id(obj))
+            self.live[name] += 1
+            if self.live[name] > self.peakLive[name]:
+                self.peakLive[name] = self.live[name]
+
+    def free(self, name: str, obj):
+        if id(obj) in self.counted:
+            self.counted.remove(id(obj))
+            self.live[name] -= 1
+
+    def install(self):
+        """Wraps the constructors of the tracked runtime classes. Nothing is wrapped until this is called."""
+        # Frames pooled before now were never counted, so they are dropped before their __del__ counts them.
+        # Only this thread's free list is cleared; frames pooled by other threads are never counted as freed.
+        Environment.pool.frames.clear()
+        for cls in TRACKED:
+            self.originals[cls] = cls.__init__
+            cls.__init__ = self.wrapInit(cls.__init__, cls.__name__)
+        for cls in LIVE:
+            cls.__del__ = self.wrapDel(cls.__name__)
+        # A recycled frame skips __init__ and __del__, so it is counted as it leaves and enters the free list.
+        self.recycling = Environment.__dict__["acquire"], Environment.__dict__["release"]
+        Environment.acquire = self.wrapAcquire(self.recycling[0])
+        Environment.release = self.wrapRelease(self.recycling[1])
+
+    def uninstall(self):
+        for cls, init in self.originals.items():
+            cls.__init__ = init
+        for cls in LIVE:
+            del cls.__del__
+        Environment.acquire, Environment.release = self.recycling
+        self.originals = {}
+
+    def wrapInit(self, init, name: str):
+        tracker = self
+        def trackedInit(obj, *args, **kwargs):
+            init(obj, *args, **kwargs)
+            tracker.allocate(name, obj)
+        return trackedInit
+
+    def wrapDel(self, name: str):
+        tracker = self
+        def trackedDel(obj):
+            tracker.free(name, obj)
+        return trackedDel
+
+    def wrapAcquire(self, acquire: classmethod):
+        tracker = self
+        def trackedAcquire(cls, enclosing):
+            recycled = bool(cls.pool.frames)
+            env = acquire.__func__(cls, enclosing)
+            if recycled:
+                tracker.allocate("Environment", env)
+            return env
+        return classmethod(trackedAcquire)
+
+    def wrapRelease(self, release):
+        tracker = self
+        def trackedRelease(env):
+            pooled = len(Environment.pool.frames)
+            release(env)
+            if len(Environment.pool.frames) > pooled:
+                tracker.free("Environment", env)
+        return trackedRelease
+
+    def toDict(self) -> dict:
+        return {
+            "allocations": {cls.__name__: self.allocations[cls.__name__] for cls in TRACKED},
+            "peakLive": {cls.__name__: self.peakLive[cls.__name__] for cls in LIVE},
+            "liveAtExit": {cls.__name__: self.live[cls.__name__] for cls in LIVE},
+            "byLine": {str(line): dict(counts) for line, counts in sorted(self.byLine.items())},
+        }
+
+    def report(self, path: str):
+        """Writes the report as JSON to path, or to stderr if path is '-'."""
+        if path == "-":
+            json.dump(self.toDict(), sys.stderr, indent=2)
+            print(file=sys.stderr)
+        else:
+            with open(path, "w") as f:
+                json.dump(self.toDict(), f, indent=2)
@@ -0,0 +1,87 @@
+# ArrayModule.py
+# This is a native module providing fixed-size numeric arrays with bulk operations.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from array import array
+from itertools import repeat
+import operator
+from NativeModule import NativeModule, NativeInstance, NativeClass, nativeMethod, nativeError, checkNumber, checkIndex
+
+def divide(left: float, right: float) -> float:
+    # Matches the interpreter's '/', which gives NaN for any division by zero.
+    if right == 0:
+        return float('nan')
+    return left / right
+
+# The binary operators map() accepts, by their Lox lexeme.
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": divide,
+}
+
+class LoxArray(NativeInstance):
+    className = "Array"
+    __slots__ = ("values",)
+
+    def __init__(self, values: array):
+        self.values = values
+
+    def checkSameLength(self, interpreter, other):
+        if not isinstance(other, LoxArray):
+            nativeError(interpreter, "Operand must be an array.")
+        if len(other.values) != len(self.values):
+            nativeError(interpreter, "Arrays must have the same length.")
+
+    @nativeMethod("length", 0)
+    def length(self, interpreter):
+        return float(len(self.values))
+
+    @nativeMethod("get", 1)
+    def getAt(self, interpreter, index):
+        return self.values[checkIndex(interpreter, index, len(self.values))]
+
+    @nativeMethod("set", 2)
+    def setAt(self, interpreter, index, value):
+        self.values[checkIndex(interpreter, index, len(self.values))] = checkNumber(interpreter, value, "Value")
+        return value
+
+    @nativeMethod("fill", 1)
+    def fill(self, interpreter, value):
+        checkNumber(interpreter, value, "Value")
+        self.values[:] = array('d', [value]) * len(self.values)
+        return self
+
+    @nativeMethod("sum", 0)
+    def sum(self, interpreter):
+        return float(sum(self.values))
+
+    @nativeMethod("dot", 1)
+    def dot(self, interpreter, other):
+        self.checkSameLength(interpreter, other)
+        return float(sum(map(operator.mul, self.values, other.values)))
+
+    @nativeMethod("map", 2)
+    def map(self, interpreter, op, operand):
+        """Returns a new array of each element combined with operand, a number or an array of the same length."""
+        function = OPERATORS.get(op)
+        if function is None:
+            nativeError(interpreter, "Operator must be one of '+', '-', '*' or '/'.")
+        if isinstance(operand, float):
+            return LoxArray(array('d', map(function, self.values, repeat(operand))))
+        self.checkSameLength(interpreter, operand)
+        return LoxArray(array('d', map(function, self.values, operand.values)))
+
+def makeArray(interpreter, size):
+    checkNumber(interpreter, size, "Size")
+    if not size.is_integer() or size < 0:
+        nativeError(interpreter, "Size must be a non-negative integer.")
+    return LoxArray(array('d', bytes(8 * int(size))))
+
+class ArrayModule(NativeModule):
+    name = "array"
+
+    def members(self) -> dict:
+        return {"Array": NativeClass("Array", 1, makeArray)}
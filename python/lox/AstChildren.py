@@ -0,0 +1,97 @@
+# AstChildren.py
+# This file was generated by tool/generateAST.py.
+# Generated by: Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import Expr, Stmt
+
+def childrenAssignExpr(node):
+	return (node.value,)
+
+def childrenBinaryExpr(node):
+	return (node.left, node.right)
+
+def childrenCallExpr(node):
+	return (node.callee, node.arguments)
+
+def childrenGetExpr(node):
+	return (node.object,)
+
+def childrenGroupingExpr(node):
+	return (node.expression,)
+
+def childrenLiteralExpr(node):
+	return ()
+
+def childrenLogicalExpr(node):
+	return (node.left, node.right)
+
+def childrenSetExpr(node):
+	return (node.object, node.value)
+
+def childrenSuperExpr(node):
+	return ()
+
+def childrenThisExpr(node):
+	return ()
+
+def childrenUnaryExpr(node):
+	return (node.right,)
+
+def childrenVariableExpr(node):
+	return ()
+
+def childrenBlockStmt(node):
+	return (node.statements,)
+
+def childrenClassStmt(node):
+	return (node.superclass, node.methods)
+
+def childrenExpressionStmt(node):
+	return (node.expression,)
+
+def childrenFunctionStmt(node):
+	return (node.body,)
+
+def childrenIfStmt(node):
+	return (node.condition, node.thenBranch, node.elseBranch)
+
+def childrenImportStmt(node):
+	return ()
+
+def childrenPrintStmt(node):
+	return (node.expression,)
+
+def childrenReturnStmt(node):
+	return (node.value,)
+
+def childrenVarStmt(node):
+	return (node.initializer,)
+
+def childrenWhileStmt(node):
+	return (node.condition, node.body)
+
+CHILDREN = {
+	Expr.Assign: childrenAssignExpr,
+	Expr.Binary: childrenBinaryExpr,
+	Expr.Call: childrenCallExpr,
+	Expr.Get: childrenGetExpr,
+	Expr.Grouping: childrenGroupingExpr,
+	Expr.Literal: childrenLiteralExpr,
+	Expr.Logical: childrenLogicalExpr,
+	Expr.Set: childrenSetExpr,
+	Expr.Super: childrenSuperExpr,
+	Expr.This: childrenThisExpr,
+	Expr.Unary: childrenUnaryExpr,
+	Expr.Variable: childrenVariableExpr,
+	Stmt.Block: childrenBlockStmt,
+	Stmt.Class: childrenClassStmt,
+	Stmt.Expression: childrenExpressionStmt,
+	Stmt.Function: childrenFunctionStmt,
+	Stmt.If: childrenIfStmt,
+	Stmt.Import: childrenImportStmt,
+	Stmt.Print: childrenPrintStmt,
+	Stmt.Return: childrenReturnStmt,
+	Stmt.Var: childrenVarStmt,
+	Stmt.While: childrenWhileStmt,
+}
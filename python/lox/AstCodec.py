@@ -0,0 +1,263 @@
+# AstCodec.py
+# This file was generated by tool/generateAST.py.
+# Generated by: Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import Expr, Stmt
+
+# Hash of the grammar the tags were numbered from.
+GRAMMAR = 0xeebd21fd
+
+# Tags 0 and 1 are a missing node and a list; node tags follow in grammar order.
+NONE = 0
+LIST = 1
+
+def writeAssignExpr(writer, node):
+	writer.varint(2)
+	writer.token(node.name)
+
+def readAssignExpr(reader, stack):
+	value = stack.pop()
+	name = reader.token()
+	stack.append(Expr.Assign(name, value))
+
+def writeBinaryExpr(writer, node):
+	writer.varint(3)
+	writer.token(node.operator)
+
+def readBinaryExpr(reader, stack):
+	right = stack.pop()
+	left = stack.pop()
+	operator = reader.token()
+	stack.append(Expr.Binary(left, operator, right))
+
+def writeCallExpr(writer, node):
+	writer.varint(4)
+	writer.token(node.paren)
+
+def readCallExpr(reader, stack):
+	arguments = stack.pop()
+	callee = stack.pop()
+	paren = reader.token()
+	stack.append(Expr.Call(callee, paren, arguments))
+
+def writeGetExpr(writer, node):
+	writer.varint(5)
+	writer.token(node.name)
+
+def readGetExpr(reader, stack):
+	object = stack.pop()
+	name = reader.token()
+	stack.append(Expr.Get(object, name))
+
+def writeGroupingExpr(writer, node):
+	writer.varint(6)
+
+def readGroupingExpr(reader, stack):
+	expression = stack.pop()
+	stack.append(Expr.Grouping(expression))
+
+def writeLiteralExpr(writer, node):
+	writer.varint(7)
+	writer.object(node.value)
+	writer.optionalToken(node.token)
+
+def readLiteralExpr(reader, stack):
+	value = reader.object()
+	node = Expr.Literal(value)
+	node.token = reader.optionalToken()
+	stack.append(node)
+
+def writeLogicalExpr(writer, node):
+	writer.varint(8)
+	writer.token(node.operator)
+
+def readLogicalExpr(reader, stack):
+	right = stack.pop()
+	left = stack.pop()
+	operator = reader.token()
+	stack.append(Expr.Logical(left, operator, right))
+
+def writeSetExpr(writer, node):
+	writer.varint(9)
+	writer.token(node.name)
+
+def readSetExpr(reader, stack):
+	value = stack.pop()
+	object = stack.pop()
+	name = reader.token()
+	stack.append(Expr.Set(object, name, value))
+
+def writeSuperExpr(writer, node):
+	writer.varint(10)
+	writer.token(node.keyword)
+	writer.token(node.method)
+
+def readSuperExpr(reader, stack):
+	keyword = reader.token()
+	method = reader.token()
+	stack.append(Expr.Super(keyword, method))
+
+def writeThisExpr(writer, node):
+	writer.varint(11)
+	writer.token(node.keyword)
+
+def readThisExpr(reader, stack):
+	keyword = reader.token()
+	stack.append(Expr.This(keyword))
+
+def writeUnaryExpr(writer, node):
+	writer.varint(12)
+	writer.token(node.operator)
+
+def readUnaryExpr(reader, stack):
+	right = stack.pop()
+	operator = reader.token()
+	stack.append(Expr.Unary(operator, right))
+
+def writeVariableExpr(writer, node):
+	writer.varint(13)
+	writer.token(node.name)
+
+def readVariableExpr(reader, stack):
+	name = reader.token()
+	stack.append(Expr.Variable(name))
+
+def writeBlockStmt(writer, node):
+	writer.varint(14)
+
+def readBlockStmt(reader, stack):
+	statements = stack.pop()
+	stack.append(Stmt.Block(statements))
+
+def writeClassStmt(writer, node):
+	writer.varint(15)
+	writer.token(node.name)
+
+def readClassStmt(reader, stack):
+	methods = stack.pop()
+	superclass = stack.pop()
+	name = reader.token()
+	stack.append(Stmt.Class(name, superclass, methods))
+
+def writeExpressionStmt(writer, node):
+	writer.varint(16)
+
+def readExpressionStmt(reader, stack):
+	expression = stack.pop()
+	stack.append(Stmt.Expression(expression))
+
+def writeFunctionStmt(writer, node):
+	writer.varint(17)
+	writer.token(node.name)
+	writer.tokens(node.params)
+
+def readFunctionStmt(reader, stack):
+	body = stack.pop()
+	name = reader.token()
+	params = reader.tokens()
+	stack.append(Stmt.Function(name, params, body))
+
+def writeIfStmt(writer, node):
+	writer.varint(18)
+
+def readIfStmt(reader, stack):
+	elseBranch = stack.pop()
+	thenBranch = stack.pop()
+	condition = stack.pop()
+	stack.append(Stmt.If(condition, thenBranch, elseBranch))
+
+def writeImportStmt(writer, node):
+	writer.varint(19)
+	writer.token(node.keyword)
+	writer.token(node.path)
+
+def readImportStmt(reader, stack):
+	keyword = reader.token()
+	path = reader.token()
+	stack.append(Stmt.Import(keyword, path))
+
+def writePrintStmt(writer, node):
+	writer.varint(20)
+
+def readPrintStmt(reader, stack):
+	expression = stack.pop()
+	stack.append(Stmt.Print(expression))
+
+def writeReturnStmt(writer, node):
+	writer.varint(21)
+	writer.token(node.keyword)
+
+def readReturnStmt(reader, stack):
+	value = stack.pop()
+	keyword = reader.token()
+	stack.append(Stmt.Return(keyword, value))
+
+def writeVarStmt(writer, node):
+	writer.varint(22)
+	writer.token(node.name)
+
+def readVarStmt(reader, stack):
+	initializer = stack.pop()
+	name = reader.token()
+	stack.append(Stmt.Var(name, initializer))
+
+def writeWhileStmt(writer, node):
+	writer.varint(23)
+
+def readWhileStmt(reader, stack):
+	body = stack.pop()
+	condition = stack.pop()
+	stack.append(Stmt.While(condition, body))
+
+WRITERS = {
+	Expr.Assign: writeAssignExpr,
+	Expr.Binary: writeBinaryExpr,
+	Expr.Call: writeCallExpr,
+	Expr.Get: writeGetExpr,
+	Expr.Grouping: writeGroupingExpr,
+	Expr.Literal: writeLiteralExpr,
+	Expr.Logical: writeLogicalExpr,
+	Expr.Set: writeSetExpr,
+	Expr.Super: writeSuperExpr,
+	Expr.This: writeThisExpr,
+	Expr.Unary: writeUnaryExpr,
+	Expr.Variable: writeVariableExpr,
+	Stmt.Block: writeBlockStmt,
+	Stmt.Class: writeClassStmt,
+	Stmt.Expression: writeExpressionStmt,
+	Stmt.Function: writeFunctionStmt,
+	Stmt.If: writeIfStmt,
+	Stmt.Import: writeImportStmt,
+	Stmt.Print: writePrintStmt,
+	Stmt.Return: writeReturnStmt,
+	Stmt.Var: writeVarStmt,
+	Stmt.While: writeWhileStmt,
+}
+
+READERS = [
+	None,
+	None,
+	readAssignExpr,
+	readBinaryExpr,
+	readCallExpr,
+	readGetExpr,
+	readGroupingExpr,
+	readLiteralExpr,
+	readLogicalExpr,
+	readSetExpr,
+	readSuperExpr,
+	readThisExpr,
+	readUnaryExpr,
+	readVariableExpr,
+	readBlockStmt,
+	readClassStmt,
+	readExpressionStmt,
+	readFunctionStmt,
+	readIfStmt,
+	readImportStmt,
+	readPrintStmt,
+	readReturnStmt,
+	readVarStmt,
+	readWhileStmt,
+]
@@ -0,0 +1,248 @@
+# AstFormat.py
+# This is a compact binary format for parsed programs, so they can be loaded without scanning and parsing.
+# A file is a header, a table of the strings used by lexemes and literals, and the nodes in post-order.
+# Tags, string indices and the change in line number from the previous token are varints. The per-node code is generated into AstCodec.py from
+# the grammar in tool/generateAST.py, so the format follows the AST classes.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import mmap, struct, zlib
+from Token import Token, TokenType
+from StringTable import strings
+from AstCodec import GRAMMAR, NONE, LIST, WRITERS, READERS
+from AstChildren import CHILDREN
+
+MAGIC = b"LOXB"
+FORMAT_VERSION = 1
+
+NIL, TRUE, FALSE, NUMBER, STRING = range(5)
+
+TOKEN_TYPES = {tokenType.value: tokenType for tokenType in TokenType}
+
+def schemaHash(tokenTypes) -> int:
+    """Hashes the token types, in order, into the hash of the grammar."""
+    names = " ".join(f"{tokenType.name}={tokenType.value}" for tokenType in tokenTypes)
+    return zlib.crc32(names.encode(), GRAMMAR)
+
+# Token types are written by ordinal, so files written before one was added or moved would decode to the
+# wrong types. Files carry this hash, which changes with either the grammar or the token types.
+SCHEMA = schemaHash(TokenType)
+
+class AstFormatError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+    def __str__(self):
+        return self.message
+
+class Writer:
+    def __init__(self):
+        self.body = bytearray()
+        self.strings = {}
+        self.line = 0
+
+    def varint(self, value: int):
+        body = self.body
+        while value > 0x7F:
+            body.append((value & 0x7F) | 0x80)
+            value >>= 7
+        body.append(value)
+
+    def string(self, value: str):
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        self.varint(index)
+
+    def object(self, value):
+        if value is None:
+            self.body.append(NIL)
+        elif value is True:
+            self.body.append(TRUE)
+        elif value is False:
+            self.body.append(FALSE)
+        elif isinstance(value, float):
+            self.body.append(NUMBER)
+            self.body += struct.pack("<d", value)
+        elif isinstance(value, str):
+            self.body.append(STRING)
+            self.string(value)
+        else:
+            raise AstFormatError(f"Cannot encode literal {value!r}.")
+
+    def token(self, token: Token):
+        self.varint(token.type.value)
+        self.string(token.lexeme)
+        self.object(token.literal)
+        # Zigzag encoded, since post-order sometimes goes back a line.
+        delta = token.line - self.line
+        self.varint(delta << 1 if delta >= 0 else (-delta << 1) - 1)
+        self.line = token.line
+
+    def tokens(self, tokens: list):
+        self.varint(len(tokens))
+        for token in tokens:
+            self.token(token)
+
+    def optionalToken(self, token: Token):
+        self.body.append(token is not None)
+        if token is not None:
+            self.token(token)
+
+    def node(self, root):
+        """Writes root and everything under it, children before their parents."""
+        work = [root]
+        while work:
+            item = work.pop()
+            if item is None:
+                self.varint(NONE)
+            elif type(item) is list:
+                # The list's elements are written first, then its tag and length.
+                work.append((LIST, len(item)))
+                work.extend(reversed(item))
+            elif type(item) is tuple:
+                if item[0] == LIST:
+                    self.varint(LIST)
+                    self.varint(item[1])
+                else:
+                    WRITERS[type(item[1])](self, item[1])
+            else:
+                work.append((None, item))
+                work.extend(reversed(CHILDREN[type(item)](item)))
+
+    def getvalue(self) -> bytes:
+        header = Writer()
+        header.body += MAGIC
+        header.varint(FORMAT_VERSION)
+        header.body += struct.pack("<I", SCHEMA)
+        header.varint(len(self.strings))
+        for string in self.strings:
+            encoded = string.encode("utf-8")
+            header.varint(len(encoded))
+            header.body += encoded
+        return bytes(header.body + self.body)
+
+class Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.strings = []
+        self.line = 0
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        value = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return value
+
+    def object(self):
+        kind = self.data[self.pos]
+        self.pos += 1
+        if kind == NIL:
+            return None
+        if kind == TRUE:
+            return True
+        if kind == FALSE:
+            return False
+        if kind == NUMBER:
+            value = struct.unpack_from("<d", self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        if kind == STRING:
+            # Interned like the string literals the Scanner makes.
+            return strings.intern(self.strings[self.varint()])
+        raise AstFormatError(f"Unknown literal kind {kind}.")
+
+    def token(self) -> Token:
+        tokenType = TOKEN_TYPES[self.varint()]
+        lexeme = self.strings[self.varint()]
+        literal = self.object()
+        delta = self.varint()
+        self.line += -((delta + 1) >> 1) if delta & 1 else delta >> 1
+        return Token(tokenType, lexeme, literal, self.line)
+
+    def tokens(self) -> list:
+        return [self.token() for _ in range(self.varint())]
+
+    def optionalToken(self) -> Token:
+        present = self.data[self.pos]
+        self.pos += 1
+        return self.token() if present else None
+
+    def header(self):
+        if bytes(self.data[:len(MAGIC)]) != MAGIC:
+            raise AstFormatError("Not a Lox AST file.")
+        self.pos = len(MAGIC)
+        version = self.varint()
+        if version != FORMAT_VERSION:
+            raise AstFormatError(f"AST format version {version} is not supported.")
+        if struct.unpack_from("<I", self.data, self.pos)[0] != SCHEMA:
+            raise AstFormatError("AST file was written for a different grammar or set of token types.")
+        self.pos += 4
+        for _ in range(self.varint()):
+            length = self.varint()
+            self.strings.append(str(self.data[self.pos:self.pos + length], "utf-8"))
+            self.pos += length
+
+    def nodes(self) -> list:
+        stack = []
+        end = len(self.data)
+        while self.pos < end:
+            tag = self.varint()
+            if tag == NONE:
+                stack.append(None)
+            elif tag == LIST:
+                count = self.varint()
+                if count == 0:
+                    stack.append([])
+                else:
+                    items = stack[-count:]
+                    del stack[-count:]
+                    stack.append(items)
+            else:
+                READERS[tag](self, stack)
+        return stack
+
+def dump(statements: list) -> bytes:
+    writer = Writer()
+    writer.node(statements)
+    return writer.getvalue()
+
+def load(data) -> list:
+    """Decodes the statements in data, which can be bytes or a memoryview of a mapped file."""
+    reader = Reader(data)
+    try:
+        reader.header()
+        stack = reader.nodes()
+    except (IndexError, KeyError, TypeError, struct.error, UnicodeDecodeError) as e:
+        raise AstFormatError(f"Invalid AST file: {e!r}")
+    if len(stack) != 1 or type(stack[0]) is not list:
+        raise AstFormatError("Invalid AST file: expected a single list of statements.")
+    return stack[0]
+
+def saveFile(statements: list, path: str):
+    data = dump(statements)
+    with open(path, "wb") as f:
+        f.write(data)
+
+def loadFile(path: str) -> list:
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped.
+            return load(f.read())
+    with mapped, memoryview(mapped) as view:
+        return load(view)
+
+def isAstFile(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
@@ -1,136 +1,141 @@
 # AstPrinter.py
 # This is a concrete visitor that prints the AST.
+# Each visit method returns the parts of one node: strings, and child nodes still to be printed.
+# The parts are expanded with an explicit stack and streamed out, so printing takes linear time
+# and deep trees do not recurse.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-17.
+# Last Modified: 2026-10-19.
 
+import io
 from Expr import ExprVisitor
 from Stmt import StmtVisitor
 from Token import Token
 
 class AstPrinter(ExprVisitor, StmtVisitor):
-    def __init__(self):
-        self.outString = ""
+    def print(self, element) -> str:
+        out = io.StringIO()
+        self.write(element, out)
+        return out.getvalue()
 
-    def __str__(self):
-        return self.outString
-    
-    def print(self, element):
-        return element.accept(self)
+    def write(self, element, out):
+        """Writes element to out, which can be anything with a write() method."""
+        for chunk in self.chunks(element):
+            out.write(chunk)
+
+    def writeProgram(self, statements, out):
+        for statement in statements:
+            self.write(statement, out)
+            out.write("\n")
+
+    def chunks(self, element):
+        """Yields the printed form of element as a series of strings."""
+        stack = [element]
+        while stack:
+            part = stack.pop()
+            if isinstance(part, str):
+                yield part
+            else:
+                stack.extend(reversed(part.accept(self)))
 
     def parenthesize(self, name, elementList):
-        s = f"({name}"
+        parts = [f"({name}"]
         for expression in elementList:
-            s += " " + self.print(expression)
-        s += ")"
-        return s
+            parts += [" ", expression]
+        parts.append(")")
+        return parts
 
     def parenthesizeParts(self, name, partList):
-        s = f"({name}"
-        s += self.transformParts(partList)
-        s += ")"
-        return s
-    
+        return [f"({name}"] + self.transformParts(partList) + [")"]
+
     def transformParts(self, partList):
-        s = ""
+        parts = []
         for part in partList:
-            s += " "
+            parts.append(" ")
             if isinstance(part, Token):
-                s += part.lexeme
+                parts.append(part.lexeme)
             elif isinstance(part, list):
-                s += self.transformParts(part)
+                parts += self.transformParts(part)
             else:
-                s += self.print(part)
-        return s
-        
+                parts.append(part)
+        return parts
+
     def visitBlockStmt(self, block):
-        s = "(block "
-        for stmt in block.statements:
-            s += self.print(stmt)
-        s += ")"
-        return s
-    
+        return ["(block "] + block.statements + [")"]
+
     def visitClassStmt(self, classStmt):
-        s = "(class " + classStmt.name.lexeme + " "
+        parts = ["(class " + classStmt.name.lexeme + " "]
         if classStmt.superclass:
-            s += " < " + self.print(classStmt.superclass)
-        for method in classStmt.methods:
-            s += self.print(method)
-        s += ")"
-        return s
-    
+            parts += [" < ", classStmt.superclass]
+        return parts + classStmt.methods + [")"]
+
     def visitExpressionStmt(self, expressionStmt):
         return self.parenthesize(";", [expressionStmt.expression])
 
     def visitFunctionStmt(self, functionStmt):
-        s = "(fun " + functionStmt.name.lexeme + "("
-        for param in functionStmt.params:
-            if param != functionStmt.params[0]:
-                s += " "
-            s += param.lexeme
-        s += ") "
-        for stmt in functionStmt.body:
-            s += self.print(stmt)
-        s += ")"
-        return s
-    
+        params = " ".join(param.lexeme for param in functionStmt.params)
+        return [f"(fun {functionStmt.name.lexeme}({params}) "] + functionStmt.body + [")"]
+
     def visitIfStmt(self, ifStmt):
         if ifStmt.elseBranch:
             return self.parenthesizeParts("if-else", [ifStmt.condition, ifStmt.thenBranch, ifStmt.elseBranch])
         else:
             return self.parenthesizeParts("if", [ifStmt.condition, ifStmt.thenBranch])
-    
+
+    def visitImportStmt(self, importStmt):
+        return [f"(import {importStmt.path.lexeme})"]
+
     def visitPrintStmt(self, printStmt):
         return self.parenthesize("print", [printStmt.expression])
-    
+
     def visitReturnStmt(self, returnStmt):
-        return self.parenthesize("return", [returnStmt.value])
+        if returnStmt.value:
+            return self.parenthesize("return", [returnStmt.value])
+        return ["(return)"]
 
     def visitVarStmt(self, varStmt):
         if varStmt.initializer:
             return self.parenthesizeParts("var", [varStmt.name, varStmt.initializer])
         else:
             return self.parenthesizeParts("var", [varStmt.name])
-    
+
     def visitWhileStmt(self, whileStmt):
         return self.parenthesizeParts("while", [whileStmt.condition, whileStmt.body])
-    
+
     def visitAssignExpr(self, assignExpr):
-        return self.parenthesizeParts("=", [assignExpr.name.lexeme, assignExpr.value])
-    
+        return self.parenthesizeParts("=", [assignExpr.name, assignExpr.value])
+
     def visitBinaryExpr(self, binaryExpr):
         return self.parenthesize(binaryExpr.operator.lexeme, [binaryExpr.left, binaryExpr.right])
-    
+
     def visitCallExpr(self, callExpr):
-        return self.parenthesizeParts("call", [callExpr.callee, *callExpr.args])
-    
+        return self.parenthesizeParts("call", [callExpr.callee, *callExpr.arguments])
+
     def visitGetExpr(self, getExpr):
         return self.parenthesizeParts(".", [getExpr.object, getExpr.name])
-    
+
     def visitGroupingExpr(self, groupingExpr):
         return self.parenthesize("group", [groupingExpr.expression])
-    
+
     def visitLiteralExpr(self, literalExpr):
         if literalExpr.value == None:
-            return "nil"
+            return ["nil"]
         else:
-            return str(literalExpr.value)
-        
+            return [str(literalExpr.value)]
+
     def visitLogicalExpr(self, logicalExpr):
         return self.parenthesize(logicalExpr.operator.lexeme, [logicalExpr.left, logicalExpr.right])
 
     def visitSetExpr(self, setExpr):
-        return self.parenthesizeParts("=", [setExpr.object, setExpr.name.lexeme, setExpr.value])
-    
+        return self.parenthesizeParts("=", [setExpr.object, setExpr.name, setExpr.value])
+
     def visitSuperExpr(self, superExpr):
         return self.parenthesizeParts("super", [superExpr.method])
-    
+
     def visitThisExpr(self, thisExpr):
-        return "this"
-    
+        return ["this"]
+
     def visitUnaryExpr(self, unaryExpr):
         return self.parenthesize(unaryExpr.operator.lexeme, [unaryExpr.right])
-    
-    def visitVariableExpr(self, variableExpr):
-        return variableExpr.name.lexeme
 
-    
\ No newline at end of file
+    def visitVariableExpr(self, variableExpr):
+        return [variableExpr.name.lexeme]
@@ -0,0 +1,39 @@
+# AstUtil.py
+# These are helpers for walking the syntax tree and reading positions out of it, shared by the tools that do.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import Expr as E
+import Stmt as S
+from Token import Token
+from AstChildren import CHILDREN
+
+def firstToken(node):
+    """The first token in a statement or expression, or None if it has none."""
+    for value in vars(node).values():
+        for item in value if isinstance(value, list) else (value,):
+            if isinstance(item, Token):
+                return item
+            if isinstance(item, (E.Expr, S.Stmt)):
+                token = firstToken(item)
+                if token is not None:
+                    return token
+    return None
+
+def firstLine(node, default: int) -> int:
+    """The line of the first token in a statement or expression."""
+    token = firstToken(node)
+    return default if token is None else token.line
+
+def walk(root):
+    """Every node under root, including root."""
+    work = [root]
+    while work:
+        node = work.pop()
+        if node is None:
+            continue
+        if isinstance(node, list):
+            work.extend(node)
+            continue
+        yield node
+        work.extend(CHILDREN[type(node)](node))
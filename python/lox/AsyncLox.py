@@ -0,0 +1,73 @@
+# AsyncLox.py
+# This is an asyncio execution mode, so one event loop can run many Lox programs at once.
+# A program hands control back to the loop after every slice of statements and whenever it calls input().
+# Each running program still has its own thread (see Resumable.py), which reserves a 64MB stack, so a
+# thousand programs at once reserve 64GB of address space. Only the pages a program's recursion touches
+# are committed, but the thread count and address space limit how many can run.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import asyncio, sys
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Resumable import SlicedInterpreter, Suspend
+
+class InputQueue:
+    """An in-memory stand-in for stdin. Lines are fed in from outside; close() marks the end of input."""
+    def __init__(self, lines=()):
+        self.queue = asyncio.Queue()
+        for line in lines:
+            self.feed(line)
+
+    def feed(self, line: str):
+        self.queue.put_nowait(line)
+
+    def close(self):
+        self.queue.put_nowait(None)
+
+    async def readline(self):
+        return await self.queue.get()
+
+class StreamInput:
+    """Reads lines from an asyncio.StreamReader, or from sys.stdin on a worker thread if none is given."""
+    def __init__(self, reader: asyncio.StreamReader = None):
+        self.reader = reader
+
+    async def readline(self):
+        if self.reader is None:
+            line = await asyncio.to_thread(sys.stdin.readline)
+        else:
+            line = (await self.reader.readline()).decode("utf-8")
+        if line == "":
+            return None
+        return line.rstrip("\n")
+
+async def runProgram(source: str, input=None, output=None, sliceSize: int = 1000, maxCallDepth: int = 10000, tailCalls: bool = False,
+                     importDirectory: str = ".", importPath: list = ()):
+    """Runs a Lox program as an asyncio task. input has an async readline() returning a line, or None
+    at end of input; output has a write() method. Lox errors are raised as they are by Interpreter."""
+    statements = Parser(Scanner(source).scanTokens()).parseOrRaise()
+    interpreter = SlicedInterpreter(maxCallDepth, tailCalls, sliceSize, output)
+    interpreter.importDirectory = importDirectory
+    interpreter.importPath = list(importPath)
+    Resolver(interpreter).resolve(statements)
+    if input is None:
+        input = StreamInput()
+
+    program = interpreter.run(statements)
+    try:
+        request = program.resume()
+        while True:
+            if request == Suspend.BUDGET:
+                await asyncio.sleep(0)
+                request = program.resume()
+            elif request == Suspend.INPUT:
+                request = program.resume(await input.readline())
+            elif request == Suspend.ERROR:
+                raise program.value
+            else:
+                return
+    finally:
+        # Unwinds the program thread if this task was cancelled while the program was suspended.
+        program.abort()
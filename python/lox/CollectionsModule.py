@@ -0,0 +1,131 @@
+# CollectionsModule.py
+# This is a native module providing growable lists and hash maps.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from NativeModule import NativeModule, NativeInstance, NativeClass, nativeMethod, nativeError, checkIndex
+from Rope import Rope
+
+class BoolKey:
+    """Stands in for true and false as map keys, which Python would otherwise equate with 1 and 0."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def __reduce__(self):
+        # Unpickles to the shared key, since map lookups compare keys by identity.
+        return boolKey, (self.value,)
+
+def boolKey(value: bool) -> BoolKey:
+    return BOOL_KEYS[value]
+
+BOOL_KEYS = {True: BoolKey(True), False: BoolKey(False)}
+
+def mapKey(value):
+    if isinstance(value, bool):
+        return BOOL_KEYS[value]
+    if isinstance(value, Rope):
+        return str(value)
+    return value
+
+def loxValue(key):
+    if isinstance(key, BoolKey):
+        return key.value
+    return key
+
+class LoxList(NativeInstance):
+    className = "List"
+    __slots__ = ("items",)
+
+    def __init__(self, items: list):
+        self.items = items
+
+    @nativeMethod("length", 0)
+    def length(self, interpreter):
+        return float(len(self.items))
+
+    @nativeMethod("get", 1)
+    def getAt(self, interpreter, index):
+        return self.items[checkIndex(interpreter, index, len(self.items))]
+
+    @nativeMethod("set", 2)
+    def setAt(self, interpreter, index, value):
+        self.items[checkIndex(interpreter, index, len(self.items))] = value
+        return value
+
+    @nativeMethod("append", 1)
+    def append(self, interpreter, value):
+        self.items.append(value)
+        return value
+
+    @nativeMethod("pop", 0)
+    def pop(self, interpreter):
+        if not self.items:
+            nativeError(interpreter, "Cannot pop from an empty list.")
+        return self.items.pop()
+
+    @nativeMethod("insert", 2)
+    def insert(self, interpreter, index, value):
+        self.items.insert(checkIndex(interpreter, index, len(self.items) + 1), value)
+        return value
+
+    @nativeMethod("remove", 1)
+    def remove(self, interpreter, index):
+        return self.items.pop(checkIndex(interpreter, index, len(self.items)))
+
+    @nativeMethod("clear", 0)
+    def clear(self, interpreter):
+        self.items.clear()
+        return None
+
+class LoxMap(NativeInstance):
+    className = "Map"
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries = {}
+
+    @nativeMethod("length", 0)
+    def length(self, interpreter):
+        return float(len(self.entries))
+
+    @nativeMethod("get", 1)
+    def getKey(self, interpreter, key):
+        """Returns the value for key, or nil if there is none."""
+        return self.entries.get(mapKey(key))
+
+    @nativeMethod("set", 2)
+    def setKey(self, interpreter, key, value):
+        self.entries[mapKey(key)] = value
+        return value
+
+    @nativeMethod("has", 1)
+    def has(self, interpreter, key):
+        return mapKey(key) in self.entries
+
+    @nativeMethod("remove", 1)
+    def remove(self, interpreter, key):
+        return self.entries.pop(mapKey(key), None)
+
+    @nativeMethod("keys", 0)
+    def keys(self, interpreter):
+        return LoxList([loxValue(key) for key in self.entries])
+
+    @nativeMethod("values", 0)
+    def values(self, interpreter):
+        return LoxList(list(self.entries.values()))
+
+    @nativeMethod("clear", 0)
+    def clear(self, interpreter):
+        self.entries.clear()
+        return None
+
+class CollectionsModule(NativeModule):
+    name = "collections"
+
+    def members(self) -> dict:
+        return {
+            "List": NativeClass("List", 0, lambda interpreter: LoxList([])),
+            "Map": NativeClass("Map", 0, lambda interpreter: LoxMap()),
+        }
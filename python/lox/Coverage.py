@@ -0,0 +1,190 @@
+# Coverage.py
+# This is an opt-in interpreter that records which statements ran and which way each if, while,
+# and/or went, and writes the result as an lcov tracefile.
+# Statements and branches are numbered before they run, and each one sets a flag in a bytearray
+# at its number, so recording a hit is a single store.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import os
+import Expr as E
+import Stmt as S
+from Token import TokenType
+from Interpreter import Interpreter
+from Modules import findModule, moduleCache
+from AstChildren import CHILDREN
+from AstUtil import firstLine
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class Coverage:
+    def __init__(self):
+        # One flag per statement, and two per branch site: taken, then not taken.
+        self.statements = bytearray()
+        self.branches = bytearray()
+        self.statementLines = []
+        self.branchSites = []
+        self.registered = []
+
+    def register(self, statements: list, path: str):
+        """Numbers the statements and branch sites of a file. Registering the same statements again,
+        as happens when a cached module is imported by another interpreter, does nothing."""
+        if any(registered is statements for registered in self.registered):
+            return
+        self.registered.append(statements)
+        line = 1
+        blocks = {}
+        work = list(reversed(statements))
+        while work:
+            node = work.pop()
+            if node is None:
+                continue
+            if isinstance(node, list):
+                work.extend(reversed(node))
+                continue
+            if isinstance(node, S.Stmt) and not isinstance(node, S.Block):
+                # Literals the parser makes up, like a for loop's missing condition, have no token, so statements made only of them take the previous line.
+                line = firstLine(node, line)
+                node.coverageSlot = len(self.statementLines)
+                self.statementLines.append((path, line))
+                self.statements.append(0)
+            if isinstance(node, (S.If, S.While, E.Logical)):
+                branchLine = node.operator.line if isinstance(node, E.Logical) else line
+                block = blocks[branchLine] = blocks.get(branchLine, -1) + 1
+                node.coverageBranch = len(self.branches)
+                self.branchSites.append((path, branchLine, block, node.coverageBranch))
+                self.branches += b"\0\0"
+            if isinstance(node, S.Class):
+                # Methods are not statements of their own, only their bodies are.
+                work.append(node.superclass)
+                work.extend(reversed([method.body for method in node.methods]))
+            else:
+                work.extend(reversed(CHILDREN[type(node)](node)))
+
+    def report(self) -> dict:
+        """The coverage as {path: {"lines": {line: hits}, "branches": {(line, block, branch): hits}}}.
+        A branch's hits are None if its site never ran."""
+        files = {}
+        for (path, line), hit in zip(self.statementLines, self.statements):
+            lines = files.setdefault(path, {"lines": {}, "branches": {}})["lines"]
+            lines[line] = max(lines.get(line, 0), hit)
+        for path, line, block, slot in self.branchSites:
+            taken, notTaken = self.branches[slot], self.branches[slot + 1]
+            branches = files.setdefault(path, {"lines": {}, "branches": {}})["branches"]
+            reached = taken or notTaken
+            branches[(line, block, 0)] = taken if reached else None
+            branches[(line, block, 1)] = notTaken if reached else None
+        return files
+
+    def save(self, path: str):
+        """Writes the coverage to an lcov tracefile at path, adding it to the counts already there.
+        The file is locked while it is updated, so runs in parallel can share one file."""
+        with open(path, "a+") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            report = mergeReports(parseReport(f.read()), self.report())
+            f.seek(0)
+            f.truncate()
+            f.write(formatReport(report))
+
+def addHits(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+def mergeReports(*reports) -> dict:
+    merged = {}
+    for report in reports:
+        for path, data in report.items():
+            target = merged.setdefault(path, {"lines": {}, "branches": {}})
+            for line, hits in data["lines"].items():
+                target["lines"][line] = target["lines"].get(line, 0) + hits
+            for key, hits in data["branches"].items():
+                target["branches"][key] = addHits(target["branches"].get(key), hits)
+    return merged
+
+def parseReport(text: str) -> dict:
+    """Reads the lines and branches of an lcov tracefile. Other records are recomputed when written."""
+    report = {}
+    data = None
+    for line in text.splitlines():
+        kind, _, value = line.partition(":")
+        if kind == "SF":
+            data = report.setdefault(value, {"lines": {}, "branches": {}})
+        elif kind == "DA" and data is not None:
+            number, hits = value.split(",")[:2]
+            data["lines"][int(number)] = data["lines"].get(int(number), 0) + int(hits)
+        elif kind == "BRDA" and data is not None:
+            number, block, branch, hits = value.split(",")
+            key = (int(number), int(block), int(branch))
+            data["branches"][key] = addHits(data["branches"].get(key), None if hits == "-" else int(hits))
+    return report
+
+def formatReport(report: dict) -> str:
+    out = []
+    for path in sorted(report):
+        lines, branches = report[path]["lines"], report[path]["branches"]
+        out += ["TN:", f"SF:{path}"]
+        for key in sorted(branches):
+            hits = branches[key]
+            out.append(f"BRDA:{key[0]},{key[1]},{key[2]},{'-' if hits is None else hits}")
+        out.append(f"BRF:{len(branches)}")
+        out.append(f"BRH:{sum(1 for hits in branches.values() if hits)}")
+        for line in sorted(lines):
+            out.append(f"DA:{line},{lines[line]}")
+        out.append(f"LF:{len(lines)}")
+        out.append(f"LH:{sum(1 for hits in lines.values() if hits)}")
+        out.append("end_of_record")
+    return "\n".join(out) + "\n" if out else ""
+
+class CoverageInterpreter(Interpreter):
+    def __init__(self, coverage: Coverage, maxCallDepth: int = 10000, tailCalls: bool = False):
+        super().__init__(maxCallDepth, tailCalls)
+        self.coverage = coverage
+        self.statementHits = coverage.statements
+        self.branchHits = coverage.branches
+
+    def visitImportStmt(self, stmt: S.Import):
+        path = findModule(stmt.path, self.importDirectory, self.importPath)
+        if path not in self.imported:
+            self.coverage.register(moduleCache.load(path, self, stmt.path), path)
+        super().visitImportStmt(stmt)
+
+    def visitIfStmt(self, stmt: S.If):
+        if self.isTruthy(stmt.condition.accept(self)):
+            self.branchHits[stmt.coverageBranch] = 1
+            stmt.thenBranch.accept(self)
+        else:
+            self.branchHits[stmt.coverageBranch + 1] = 1
+            if stmt.elseBranch:
+                stmt.elseBranch.accept(self)
+
+    def visitWhileStmt(self, stmt: S.While):
+        while self.isTruthy(stmt.condition.accept(self)):
+            self.branchHits[stmt.coverageBranch] = 1
+            stmt.body.accept(self)
+        self.branchHits[stmt.coverageBranch + 1] = 1
+
+    def visitLogicalExpr(self, expr: E.Logical):
+        # The branch is taken when the right operand is skipped.
+        left = expr.left.accept(self)
+        if self.isTruthy(left) == (expr.operator.type == TokenType.OR):
+            self.branchHits[expr.coverageBranch] = 1
+            return left
+        self.branchHits[expr.coverageBranch + 1] = 1
+        return expr.right.accept(self)
+
+def coverStatement(visit):
+    def visitCovered(self, stmt):
+        self.statementHits[stmt.coverageSlot] = 1
+        return visit(self, stmt)
+    return visitCovered
+
+for visitName in [name for name in dir(S.StmtVisitor) if name.startswith("visit") and name != "visitBlockStmt"]:
+    setattr(CoverageInterpreter, visitName, coverStatement(getattr(CoverageInterpreter, visitName)))
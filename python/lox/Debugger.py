@@ -0,0 +1,216 @@
+# Debugger.py
+# This is an opt-in interpreter that reports statements, calls and runtime errors to a set of hooks,
+# with a tracer and a command-line debugger built on them. The hooks live in a subclass, so the
+# plain Interpreter pays nothing for them.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import sys
+import Expr as E
+import Stmt as S
+from Interpreter import Interpreter
+from LoxClass import LoxClass
+from LoxErrors import LoxRuntimeError, TokenError
+from LoxFunction import LoxFunction
+from Return import TailCall
+from AstUtil import firstLine
+
+class DebugHooks:
+    """Receives the events of a DebugInterpreter. Each does nothing unless overridden."""
+    def statement(self, interpreter, stmt: S.Stmt, line: int):
+        """Called before each statement other than a block runs."""
+        pass
+
+    def enterCall(self, interpreter, name: str, line: int):
+        pass
+
+    def exitCall(self, interpreter, name: str, value):
+        """Called when a call returns or raises. value is None if it raised."""
+        pass
+
+    def runtimeError(self, interpreter, error: Exception):
+        """Called once per error, before any frame is unwound."""
+        pass
+
+def callName(expr: E.Call, callee) -> str:
+    if isinstance(callee, LoxFunction):
+        return callee.declaration.name.lexeme
+    if isinstance(callee, LoxClass):
+        return callee.name
+    # Natives do not know their names, so use the name they were called by.
+    if isinstance(expr.callee, (E.Variable, E.Get)):
+        return expr.callee.name.lexeme
+    return str(callee)
+
+class DebugInterpreter(Interpreter):
+    def __init__(self, hooks: DebugHooks, maxCallDepth: int = 10000, tailCalls: bool = False):
+        super().__init__(maxCallDepth, tailCalls)
+        self.hooks = hooks
+        # The name of each active function and the line it was called from, outermost first.
+        self.frames = []
+        self.line = 0
+        self.lines = {}
+        self.reported = None
+
+    def statementLine(self, stmt: S.Stmt) -> int:
+        line = self.lines.get(stmt)
+        if line is None:
+            # Literals the parser makes up, like a for loop's missing condition, have no token, so statements made only of them take the previous line.
+            line = self.lines[stmt] = firstLine(stmt, self.line)
+        return line
+
+    def report(self, error: Exception):
+        if error is not self.reported:
+            self.reported = error
+            self.hooks.runtimeError(self, error)
+
+    def call(self, expr: E.Call, callee, arguments: list):
+        self.frames.append((callName(expr, callee), expr.paren.line))
+        self.hooks.enterCall(self, self.frames[-1][0], expr.paren.line)
+        value = None
+        try:
+            value = super().call(expr, callee, arguments)
+            return value
+        finally:
+            # A tail call may have renamed the frame since it was entered.
+            self.hooks.exitCall(self, self.frames.pop()[0], value)
+
+    def visitReturnStmt(self, stmt: S.Return):
+        try:
+            super().visitReturnStmt(stmt)
+        except TailCall as tail:
+            # The callee reuses the caller's frame: the caller returns, then the callee is entered.
+            self.hooks.exitCall(self, self.frames[-1][0], None)
+            name = tail.function.declaration.name.lexeme
+            self.frames[-1] = (name, stmt.keyword.line)
+            self.hooks.enterCall(self, name, stmt.keyword.line)
+            raise
+
+def hookStatement(visit):
+    def visitHooked(self, stmt):
+        self.line = self.statementLine(stmt)
+        self.hooks.statement(self, stmt, self.line)
+        try:
+            return visit(self, stmt)
+        except (LoxRuntimeError, TokenError) as error:
+            self.report(error)
+            raise
+    return visitHooked
+
+for visitName in [name for name in dir(S.StmtVisitor) if name.startswith("visit") and name != "visitBlockStmt"]:
+    setattr(DebugInterpreter, visitName, hookStatement(getattr(DebugInterpreter, visitName)))
+
+class Tracer(DebugHooks):
+    """Writes every event to out, one per line."""
+    def __init__(self, out=sys.stderr):
+        self.out = out
+
+    def statement(self, interpreter, stmt, line):
+        self.out.write(f"{'  ' * len(interpreter.frames)}line {line}\n")
+
+    def enterCall(self, interpreter, name, line):
+        self.out.write(f"{'  ' * (len(interpreter.frames) - 1)}call {name} [line {line}]\n")
+
+    def exitCall(self, interpreter, name, value):
+        self.out.write(f"{'  ' * len(interpreter.frames)}return {name} {interpreter.stringify(value)}\n")
+
+    def runtimeError(self, interpreter, error):
+        self.out.write(f"{'  ' * len(interpreter.frames)}error {error}\n")
+
+class Debugger(DebugHooks):
+    """Stops at breakpoints and steps, reading commands from input and writing to output."""
+    HELP = ("c(ontinue)  s(tep)  n(ext)  f(inish)  b(reak) [LINE]  d(elete) LINE\n"
+            "p(rint) NAME  bt  l(ist)  q(uit)\n")
+
+    def __init__(self, source: str = "", input=sys.stdin, output=sys.stderr, breakpoints=()):
+        self.sourceLines = source.splitlines()
+        self.input = input
+        self.output = output
+        self.breakpoints = set(breakpoints)
+        # How to stop next: "step" at any statement, "next" at one no deeper than stopDepth,
+        # "finish" at one shallower than it, and "continue" only at breakpoints.
+        self.mode = "step" if not self.breakpoints else "continue"
+        self.stopDepth = 0
+        self.lastLine = None
+
+    def statement(self, interpreter, stmt, line):
+        depth = len(interpreter.frames)
+        previous, self.lastLine = self.lastLine, (line, depth)
+        if self.mode == "step":
+            stop = True
+        elif self.mode == "next":
+            stop = depth <= self.stopDepth
+        elif self.mode == "finish":
+            stop = depth < self.stopDepth
+        else:
+            stop = False
+        # A breakpoint stops once each time its line is reached, not at each statement on it.
+        if stop or (line in self.breakpoints and previous != (line, depth)):
+            self.pause(interpreter, f"Stopped at line {line}")
+
+    def runtimeError(self, interpreter, error):
+        self.pause(interpreter, f"Runtime error: {error}", postMortem=True)
+
+    def sourceLine(self, line: int) -> str:
+        if 0 < line <= len(self.sourceLines):
+            return self.sourceLines[line - 1].strip()
+        return ""
+
+    def lookUp(self, interpreter, name: str):
+        environment = interpreter.environment
+        while environment is not None:
+            if name in environment.values:
+                return interpreter.stringify(environment.values[name])
+            environment = environment.enclosing
+        return f"Undefined variable '{name}'."
+
+    def pause(self, interpreter, reason: str, postMortem: bool = False):
+        self.output.write(f"{reason}: {self.sourceLine(interpreter.line)}\n")
+        while True:
+            self.output.write("(lox) ")
+            self.output.flush()
+            line = self.input.readline()
+            if not line:
+                # Out of commands: run the rest of the program without stopping.
+                self.mode = "continue"
+                self.breakpoints.clear()
+                return
+            command, _, argument = line.strip().partition(" ")
+            argument = argument.strip()
+            if command in ("c", "continue", "s", "step", "n", "next", "f", "finish"):
+                if postMortem:
+                    self.output.write("The program cannot continue after an error.\n")
+                    return
+                self.mode = {"c": "continue", "s": "step", "n": "next", "f": "finish"}[command[0]]
+                self.stopDepth = len(interpreter.frames)
+                return
+            elif command in ("b", "break"):
+                if argument:
+                    self.setBreakpoint(argument, add=True)
+                else:
+                    self.output.write(" ".join(str(line) for line in sorted(self.breakpoints)) + "\n")
+            elif command in ("d", "delete"):
+                self.setBreakpoint(argument, add=False)
+            elif command in ("p", "print"):
+                self.output.write(self.lookUp(interpreter, argument) + "\n")
+            elif command == "bt":
+                self.output.write(f"  line {interpreter.line}\n")
+                for name, callLine in reversed(interpreter.frames):
+                    self.output.write(f"  {name} called from line {callLine}\n")
+            elif command in ("l", "list"):
+                for line in range(max(1, interpreter.line - 2), interpreter.line + 3):
+                    if line <= len(self.sourceLines):
+                        marker = "->" if line == interpreter.line else "  "
+                        self.output.write(f"{marker} {line:4} {self.sourceLines[line - 1]}\n")
+            elif command in ("q", "quit"):
+                raise SystemExit(0)
+            else:
+                self.output.write(self.HELP)
+
+    def setBreakpoint(self, argument: str, add: bool):
+        if not argument.isdigit():
+            self.output.write("Expected a line number.\n")
+        elif add:
+            self.breakpoints.add(int(argument))
+        else:
+            self.breakpoints.discard(int(argument))
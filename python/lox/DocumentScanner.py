@@ -0,0 +1,30 @@
+# DocumentScanner.py
+# This is a Scanner for tools that read source as it is being edited, such as the language server and the linter.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from Scanner import Scanner
+from Token import TokenType
+from LoxErrors import LoxError
+
+class DocumentScanner(Scanner):
+    """A Scanner that records the column of each token, and records errors instead of stopping at them."""
+    def __init__(self, source: str):
+        super().__init__(source)
+        self.errors = []
+        # Whether a string ran into the end of the source, which a longer region might close.
+        self.unterminated = False
+
+    def column(self, offset: int) -> int:
+        return offset - (self._source.rfind("\n", 0, offset) + 1)
+
+    def addToken(self, tokenType: TokenType, literal=None):
+        super().addToken(tokenType, literal)
+        self._tokens[-1].column = self.column(self._start)
+
+    def scanToken(self):
+        try:
+            super().scanToken()
+        except LoxError as e:
+            self.unterminated = e.message == "Unterminated string."
+            self.errors.append((e.line, self.column(self._start), 1, e.message))
@@ -1,15 +1,41 @@
 # Environment.py
 # This class represents the environment in which the Lox interpreter runs.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
+import threading
 from LoxErrors import TokenError
 from Token import Token
 
+class FramePool(threading.local):
+    """A free list of frames for each thread, since acquire and release take no lock."""
+    def __init__(self):
+        self.frames = []
+
 class Environment():
+    # Frames that are known not to be captured by a closure are recycled through this free list.
+    pool = FramePool()
+    maxPoolSize = 256
+
     def __init__(self, enclosing=None):
         self.values = {}
         self.enclosing = enclosing
+
+    @classmethod
+    def acquire(cls, enclosing):
+        frames = cls.pool.frames
+        if frames:
+            env = frames.pop()
+            env.enclosing = enclosing
+            return env
+        return cls(enclosing)
+
+    def release(self):
+        self.values.clear()
+        self.enclosing = None
+        frames = Environment.pool.frames
+        if len(frames) < Environment.maxPoolSize:
+            frames.append(self)
     
     def get(self, name: Token):
         if name.lexeme in self.values:
@@ -1,7 +1,7 @@
 # Expr.py
 # This file was generated by tool/generateAST.py.
 # Generated by: Joel Peckham.
-# Last Modified: 2022-03-17.
+# Last Modified: 2026-10-19.
 
 from abc import ABC, abstractmethod
 
@@ -11,6 +11,7 @@ class Expr(ABC):
 		pass
 
 class Assign(Expr):
+	depth = None
 	def __init__(self, name, value):
 		"""Assign   : Token name, Expr value"""
 		self.name = name
@@ -37,6 +38,8 @@ class Call(Expr):
 		return visitor.visitCallExpr(self)
 
 class Get(Expr):
+	shape = None
+	index = None
 	def __init__(self, object, name):
 		"""Get      : Expr object, Token name"""
 		self.object = object
@@ -52,6 +55,7 @@ class Grouping(Expr):
 		return visitor.visitGroupingExpr(self)
 
 class Literal(Expr):
+	token = None
 	def __init__(self, value):
 		"""Literal  : Object value"""
 		self.value = value
@@ -59,6 +63,7 @@ class Literal(Expr):
 		return visitor.visitLiteralExpr(self)
 
 class Logical(Expr):
+	coverageBranch = None
 	def __init__(self, left, operator, right):
 		"""Logical  : Expr left, Token operator, Expr right"""
 		self.left = left
@@ -68,6 +73,9 @@ class Logical(Expr):
 		return visitor.visitLogicalExpr(self)
 
 class Set(Expr):
+	shape = None
+	index = None
+	nextShape = None
 	def __init__(self, object, name, value):
 		"""Set      : Expr object, Token name, Expr value"""
 		self.object = object
@@ -77,6 +85,7 @@ class Set(Expr):
 		return visitor.visitSetExpr(self)
 
 class Super(Expr):
+	depth = None
 	def __init__(self, keyword, method):
 		"""Super    : Token keyword, Token method"""
 		self.keyword = keyword
@@ -85,6 +94,7 @@ class Super(Expr):
 		return visitor.visitSuperExpr(self)
 
 class This(Expr):
+	depth = None
 	def __init__(self, keyword):
 		"""This     : Token keyword"""
 		self.keyword = keyword
@@ -100,6 +110,7 @@ class Unary(Expr):
 		return visitor.visitUnaryExpr(self)
 
 class Variable(Expr):
+	depth = None
 	def __init__(self, name):
 		"""Variable : Token name"""
 		self.name = name
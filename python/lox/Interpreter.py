@@ -1,7 +1,7 @@
 # Interpreter.py
 # This class is a concrete visitor that interprets the AST.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
 import Expr as E
 import Stmt as S
@@ -9,12 +9,18 @@ from Token import Token, TokenType
 from Environment import Environment
 from LoxCallable import LoxCallable
 from time import time
+import os
 from typing import List
 from LoxErrors import LoxRuntimeError
 from LoxClass import LoxClass
 from LoxFunction import LoxFunction
-from Return import Return
+from Return import Return, TailCall
 from LoxInstance import LoxInstance
+from Rope import Rope, concatenate
+from StringTable import strings
+from NativeModule import NativeModule, NativeInstance
+from ArrayModule import ArrayModule
+from CollectionsModule import CollectionsModule
 
 class ClockCallable(LoxCallable):
     def arity(self) -> int:
@@ -28,18 +34,51 @@ class InputCallable(LoxCallable):
     def arity(self) -> int:
         return 0
     def call(self, interpreter, arguments):
-        return input()
+        return strings.intern(input())
     def __str__(self):
         return "<native fn>"
 
+# Python frames used by one Lox call in the common case (visitCallExpr, LoxFunction.call,
+# executeBlock, a couple of statements and the expressions leading to the next call).
+# The recursion limit is left alone here: Lox.py raises it to maxCallDepth calls' worth only while
+# a program runs on a thread with a stack to match. Elsewhere deep recursion is a Stack overflow error.
+FRAMES_PER_CALL = 24
+
 class Interpreter(E.ExprVisitor, S.StmtVisitor):
-    def __init__(self):
+    def __init__(self, maxCallDepth: int = 10000, tailCalls: bool = False):
         self.globals = Environment()
         self.environment = self.globals
-        self.locals = {}
 
-        self.globals.define("clock", ClockCallable())
-        self.globals.define("input", InputCallable())
+        # The Lox call stack holds the Call expression of every active frame.
+        self.callStack: List[E.Call] = []
+        self.maxCallDepth = maxCallDepth
+        self.tailCalls = tailCalls
+
+        # Globals implemented in Python, by name. Snapshots refer to these rather than copying them.
+        self.natives = {}
+        self.defineNative("clock", ClockCallable())
+        self.defineNative("input", InputCallable())
+        self.modules = {}
+        for module in [ArrayModule(), CollectionsModule()]:
+            self.loadModule(module)
+
+        # Lox modules are looked for relative to the importing file, then on the import path.
+        # Each runs once per interpreter; imported holds their real paths.
+        self.importDirectory = "."
+        self.importPath: List[str] = []
+        self.imported = set()
+
+    def loadModule(self, module: NativeModule):
+        """Defines the members of a native module as globals. Loading a module twice does nothing."""
+        if module.name in self.modules:
+            return
+        self.modules[module.name] = module
+        for name, value in module.members().items():
+            self.defineNative(name, value)
+
+    def defineNative(self, name: str, value):
+        self.natives[name] = value
+        self.globals.define(name, value)
     
     def interpret(self, statements: List[S.Stmt]):
         try:
@@ -49,7 +88,7 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
             raise e
 
     def resolve(self, expr: E.Expr, depth: int):
-        self.locals[expr] = depth
+        expr.depth = depth
     
     def executeBlock(self, statements: List[S.Stmt], environment: Environment):
         previous = self.environment
@@ -61,7 +100,14 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
             self.environment = previous
     
     def visitBlockStmt(self, block: S.Block):
-        self.executeBlock(block.statements, Environment(self.environment))
+        if block.captured is False:
+            env = Environment.acquire(self.environment)
+            try:
+                self.executeBlock(block.statements, env)
+            finally:
+                env.release()
+        else:
+            self.executeBlock(block.statements, Environment(self.environment))
     
     def visitClassStmt(self, classStmt: S.Class):
         superclass = None
@@ -111,6 +157,8 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
             return "nil"
         if isinstance(obj, str):
             return obj
+        if isinstance(obj, Rope):
+            return str(obj)
         if isinstance(obj, bool):
             return "true" if obj else "false"
         if isinstance(obj, float):
@@ -125,13 +173,36 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
                 return str(obj)
         return str(obj)
 
+    def visitImportStmt(self, stmt: S.Import):
+        from Modules import findModule, moduleCache
+        path = findModule(stmt.path, self.importDirectory, self.importPath)
+        if path in self.imported:
+            return
+        # Marked before running, so a module that imports itself again through another does nothing.
+        self.imported.add(path)
+        statements = moduleCache.load(path, self, stmt.path)
+        previous = self.importDirectory
+        self.importDirectory = os.path.dirname(path)
+        try:
+            self.executeBlock(statements, self.globals)
+        finally:
+            self.importDirectory = previous
+
     def visitPrintStmt(self, stmt: S.Print):
         value = stmt.expression.accept(self)
         print(self.stringify(value))
     
-    def visitReturnStmt(self, stmt: Return):
+    def visitReturnStmt(self, stmt: S.Return):
         value = None
-        if stmt.value:
+        if self.tailCalls and isinstance(stmt.value, E.Call):
+            callee = stmt.value.callee.accept(self)
+            arguments = [argument.accept(self) for argument in stmt.value.arguments]
+            self.checkCall(stmt.value, callee, arguments)
+            if isinstance(callee, LoxFunction):
+                # Let the enclosing LoxFunction.call reuse its frame for the callee.
+                raise TailCall(callee, arguments)
+            value = self.call(stmt.value, callee, arguments)
+        elif stmt.value:
             value = stmt.value.accept(self)
         raise Return(value)
     
@@ -147,7 +218,7 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
     
     def visitAssignExpr(self, expr: E.Assign):
         value = expr.value.accept(self)
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         if distance != None:
             self.environment.assignAt(distance, expr.name, value)
         else:
@@ -155,10 +226,16 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
         return value
 
     def isEqual(self, a, b) -> bool:
-        if a == None and b == None:
-            return True
+        # Interned strings that are equal are the same object. NaN is the one value not equal to itself.
+        if a is b:
+            return a == a
         if a == None:
             return False
+        # Ropes compare as the strings they stand for.
+        if isinstance(a, Rope):
+            a = str(a)
+        if isinstance(b, Rope):
+            b = str(b)
         if type(a) != type(b):
             return False
         return a == b
@@ -196,8 +273,8 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
             self.checkNumberOperands(expr.operator, left, right)
             return float(left) - float(right)
         if opType == TokenType.PLUS:
-            if isinstance(left, str) and isinstance(right, str):
-                return left + right
+            if isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+                return concatenate(left, right)
             if isinstance(left, float) and isinstance(right, float):
                 return left + right
             raise LoxRuntimeError(expr.operator, "Operands must be two numbers or two strings.")
@@ -215,17 +292,34 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
         arguments = []
         for argument in expr.arguments:
             arguments.append(argument.accept(self))
+        self.checkCall(expr, callee, arguments)
+        return self.call(expr, callee, arguments)
+
+    def checkCall(self, expr: E.Call, callee, arguments: list):
         if not isinstance(callee, LoxCallable):
-            raise LoxRuntimeError(expr.parent, "Can only call functions and classes.")
-        
-        func = callee
-        if len(arguments) != func.arity():
-            raise LoxRuntimeError(expr.parent, "Expected " + str(func.arity()) + " arguments but got " + str(len(arguments)) + ".")
-        return func.call(self, arguments)
+            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity():
+            raise LoxRuntimeError(expr.paren, "Expected " + str(callee.arity()) + " arguments but got " + str(len(arguments)) + ".")
+
+    def call(self, expr: E.Call, callee: LoxCallable, arguments: list):
+        if len(self.callStack) >= self.maxCallDepth:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        self.callStack.append(expr)
+        try:
+            return callee.call(self, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        finally:
+            self.callStack.pop()
     
     def visitGetExpr(self, expr: E.Get):
         obj = expr.object.accept(self)
         if isinstance(obj, LoxInstance):
+            # Inline cache: a hit on the shape seen last time is a plain index load.
+            if obj.shape is expr.shape:
+                return obj.values[expr.index]
+            return obj.get(expr.name, expr)
+        if isinstance(obj, NativeInstance):
             return obj.get(expr.name)
         raise LoxRuntimeError(expr.name, "Only instances have properties.")
     
@@ -250,11 +344,18 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
         if not isinstance(obj, LoxInstance):
             raise LoxRuntimeError(expr.name, "Only instances have fields.")
         value = expr.value.accept(self)
-        obj.set(expr.name, value)
+        if obj.shape is expr.shape:
+            if expr.nextShape is expr.shape:
+                obj.values[expr.index] = value
+            else:
+                obj.values.append(value)
+                obj.shape = expr.nextShape
+        else:
+            obj.set(expr.name, value, expr)
         return value
     
     def visitSuperExpr(self, expr: E.Super):
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         superclass = self.environment.getAt(distance, "super")
         obj = self.environment.getAt(distance-1, "this")
         method = superclass.findMethod(expr.method.lexeme)
@@ -263,7 +364,7 @@ class Interpreter(E.ExprVisitor, S.StmtVisitor):
         return method.bind(obj)
     
     def lookUpVariable(self, name: Token, expr : E.Expr):
-        distance = self.locals.get(expr, None)
+        distance = expr.depth
         if distance != None:
             return self.environment.getAt(distance, name.lexeme)
         return self.globals.get(name)
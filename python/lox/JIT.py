@@ -0,0 +1,505 @@
+# JIT.py
+# This is a tracing tier that compiles hot loops and functions to Python source.
+# A While loop or LoxFunction that runs often enough is translated into a Python function specialized
+# for the types of the values it starts with, then compiled with compile(). If a later run starts with
+# different types, execution deoptimizes back to the tree walker.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import Expr as E
+import Stmt as S
+from Token import Token, TokenType
+from Environment import Environment
+from Interpreter import Interpreter
+from LoxErrors import LoxRuntimeError
+from LoxFunction import LoxFunction
+from Return import Return
+from Rope import Rope, concatenate
+
+# Iterations of a loop, and calls of a function, before it is compiled, unless JitInterpreter is given others.
+HOT_LOOP = 64
+HOT_CALLS = 64
+# Type signatures compiled for one loop or function before the rest are left to the tree walker.
+MAX_VARIANTS = 4
+
+# The kinds of value the compiler tracks. None is the empty kind: no value seen yet.
+NUM, STR, BOOL, NIL, ANY = "num", "str", "bool", "nil", "any"
+
+# Returned by Trace.run when the tree walker has to run the code instead.
+DEOPT = object()
+
+def kindOf(value) -> str:
+    if type(value) is float:
+        return NUM
+    if value is None:
+        return NIL
+    if value is True or value is False:
+        return BOOL
+    if type(value) is str or type(value) is Rope:
+        return STR
+    return ANY
+
+def join(a: str, b: str) -> str:
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    return ANY
+
+class Unsupported(Exception):
+    """Raised while compiling code the tracing tier leaves to the tree walker."""
+    pass
+
+# Helpers the generated code calls for anything it cannot do inline.
+
+def truthy(value) -> bool:
+    return value is not None and value is not False
+
+def divide(left: float, right: float) -> float:
+    if right == 0:
+        return float('nan')
+    return left / right
+
+def binary(interpreter: Interpreter, operator: Token, left, right):
+    """Interpreter.visitBinaryExpr on operands that have already been evaluated."""
+    opType = operator.type
+    if opType == TokenType.PLUS:
+        if isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+            return concatenate(left, right)
+        if isinstance(left, float) and isinstance(right, float):
+            return left + right
+        raise LoxRuntimeError(operator, "Operands must be two numbers or two strings.")
+    if opType == TokenType.EQUAL_EQUAL:
+        return interpreter.isEqual(left, right)
+    if opType == TokenType.BANG_EQUAL:
+        return not interpreter.isEqual(left, right)
+    interpreter.checkNumberOperands(operator, left, right)
+    left, right = float(left), float(right)
+    if opType == TokenType.MINUS:
+        return left - right
+    if opType == TokenType.STAR:
+        return left * right
+    if opType == TokenType.SLASH:
+        return divide(left, right)
+    if opType == TokenType.GREATER:
+        return left > right
+    if opType == TokenType.GREATER_EQUAL:
+        return left >= right
+    if opType == TokenType.LESS:
+        return left < right
+    return left <= right
+
+def negate(interpreter: Interpreter, operator: Token, right) -> float:
+    interpreter.checkNumberOperand(operator, right)
+    return -float(right)
+
+def callValue(interpreter: Interpreter, expr: E.Call, callee, arguments: list):
+    interpreter.checkCall(expr, callee, arguments)
+    return interpreter.call(expr, callee, arguments)
+
+def store(values: dict, name: str, value):
+    values[name] = value
+    return value
+
+def assignGlobal(interpreter: Interpreter, name: Token, value):
+    interpreter.globals.assign(name, value)
+    return value
+
+HELPERS = {
+    "truthy": truthy, "divide": divide, "binary": binary, "negate": negate, "callValue": callValue,
+    "store": store, "assignGlobal": assignGlobal, "concatenate": concatenate, "Return": Return,
+}
+
+ARITHMETIC = {TokenType.PLUS: "+", TokenType.MINUS: "-", TokenType.STAR: "*"}
+COMPARISON = {TokenType.GREATER: ">", TokenType.GREATER_EQUAL: ">=", TokenType.LESS: "<", TokenType.LESS_EQUAL: "<="}
+EQUALITY = {TokenType.EQUAL_EQUAL: "==", TokenType.BANG_EQUAL: "!="}
+
+class Region:
+    """The code one trace covers: a While statement, or the body of a function.
+    Variables declared inside the region become Python locals. Variables from outside it are
+    copied into Python locals on entry and written back on exit, unless the region makes calls,
+    in which case a callee could see them and they are read and written in their environments."""
+    def __init__(self, root, params: list, isFunction: bool):
+        self.root = root
+        self.params = params
+        self.isFunction = isFunction
+        self.makesCalls = False
+        self.check(root)
+
+    def check(self, node):
+        if isinstance(node, list):
+            for item in node:
+                self.check(item)
+        elif isinstance(node, S.Block):
+            self.check(node.statements)
+        elif isinstance(node, (S.Expression, S.Print)):
+            self.check(node.expression)
+        elif isinstance(node, S.If):
+            self.check([node.condition, node.thenBranch])
+            if node.elseBranch is not None:
+                self.check(node.elseBranch)
+        elif isinstance(node, S.Var):
+            if node.initializer is not None:
+                self.check(node.initializer)
+        elif isinstance(node, S.While):
+            self.check([node.condition, node.body])
+        elif isinstance(node, S.Return):
+            if node.value is not None:
+                self.check(node.value)
+        elif isinstance(node, (E.Binary, E.Logical)):
+            self.check([node.left, node.right])
+        elif isinstance(node, E.Unary):
+            self.check(node.right)
+        elif isinstance(node, E.Grouping):
+            self.check(node.expression)
+        elif isinstance(node, E.Assign):
+            self.check(node.value)
+        elif isinstance(node, E.Call):
+            self.makesCalls = True
+            self.check([node.callee] + node.arguments)
+        elif not isinstance(node, (E.Literal, E.Variable)):
+            # Functions, classes, properties, this and super stay in the tree walker.
+            raise Unsupported(type(node).__name__)
+
+class Compiler:
+    """Generates the Python source of one region, given the kinds of the values it starts with."""
+    def __init__(self, region: Region, kinds: dict):
+        self.region = region
+        # The kind of every Python local the region uses; live-ins start with their entry kinds.
+        self.kinds = dict(kinds)
+        self.assigned = dict(kinds)
+        self.scopes = []
+        self.lines = []
+        self.constants = {}
+        self.liveIns = {}
+        self.written = set()
+        self.ancestors = set()
+        self.usesGlobals = False
+        self.locals = 0
+        self.temps = 0
+
+    def compile(self) -> str:
+        region = self.region
+        if region.isFunction:
+            # Parameters are bound by the call itself, in the scope the function body shares.
+            self.scopes.append({param.lexeme: f"p_{param.lexeme}" for param in region.params})
+            self.block(region.root, 2)
+            self.emit(2, "return None")
+        else:
+            self.statement(region.root, 2)
+        body = self.lines
+
+        self.lines = []
+        head = ["interp", "env"] + [f"p_{param.lexeme}" for param in region.params] + list(self.liveIns)
+        self.emit(0, f"def trace({', '.join(head)}):")
+        if self.usesGlobals:
+            self.emit(1, "gv = interp.globals.values")
+        for distance in sorted(self.ancestors):
+            self.emit(1, f"e{distance} = env.ancestor({distance})")
+        if self.written:
+            # The body is generated one level deep, inside this try.
+            self.emit(1, "try:")
+            self.lines += body
+            self.emit(1, "finally:")
+            for name in sorted(self.written):
+                distance, lexeme = self.liveIns[name]
+                if distance is None:
+                    self.emit(2, f"gv[{lexeme!r}] = {name}")
+                else:
+                    self.emit(2, f"e{distance}.values[{lexeme!r}] = {name}")
+        else:
+            self.lines += [line[4:] for line in body]
+        return "\n".join(self.lines) + "\n"
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    def constant(self, value) -> str:
+        name = f"k{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"t{self.temps}"
+
+    def declare(self, lexeme: str, kind: str) -> str:
+        name = f"v{self.locals}_{lexeme}"
+        self.locals += 1
+        self.scopes[-1][lexeme] = name
+        self.record(name, kind)
+        return name
+
+    def record(self, name: str, kind: str):
+        self.assigned[name] = join(self.assigned.get(name), kind)
+
+    def kind(self, name: str) -> str:
+        kind = self.kinds.get(name)
+        return ANY if kind is None else kind
+
+    def lookup(self, name: Token, depth: int):
+        """Returns ("local", python name), ("cached", python name), ("env", distance) or ("global", None)."""
+        if depth is not None and depth < len(self.scopes):
+            return "local", self.scopes[-1 - depth][name.lexeme]
+        distance = None if depth is None else depth - len(self.scopes)
+        if self.region.makesCalls:
+            if distance is None:
+                self.usesGlobals = True
+                return "global", None
+            self.ancestors.add(distance)
+            return "env", distance
+        local = f"g_{name.lexeme}" if distance is None else f"o{distance}_{name.lexeme}"
+        self.liveIns[local] = (distance, name.lexeme)
+        if distance is None:
+            self.usesGlobals = True
+        else:
+            self.ancestors.add(distance)
+        return "cached", local
+
+    # Statements.
+
+    def block(self, statements: list, indent: int):
+        start = len(self.lines)
+        for statement in statements:
+            self.statement(statement, indent)
+        if len(self.lines) == start:
+            self.emit(indent, "pass")
+
+    def statement(self, stmt: S.Stmt, indent: int):
+        if isinstance(stmt, S.Block):
+            self.scopes.append({})
+            self.block(stmt.statements, indent)
+            self.scopes.pop()
+        elif isinstance(stmt, S.Expression):
+            self.emit(indent, self.expression(stmt.expression)[0])
+        elif isinstance(stmt, S.Print):
+            self.emit(indent, f"print(interp.stringify({self.expression(stmt.expression)[0]}))")
+        elif isinstance(stmt, S.Var):
+            code, kind = self.expression(stmt.initializer) if stmt.initializer is not None else ("None", NIL)
+            self.emit(indent, f"{self.declare(stmt.name.lexeme, kind)} = {code}")
+        elif isinstance(stmt, S.If):
+            self.emit(indent, f"if {self.condition(stmt.condition)}:")
+            self.block([stmt.thenBranch], indent + 1)
+            if stmt.elseBranch is not None:
+                self.emit(indent, "else:")
+                self.block([stmt.elseBranch], indent + 1)
+        elif isinstance(stmt, S.While):
+            self.emit(indent, f"while {self.condition(stmt.condition)}:")
+            self.block([stmt.body], indent + 1)
+        elif isinstance(stmt, S.Return):
+            code = self.expression(stmt.value)[0] if stmt.value is not None else "None"
+            if self.region.isFunction:
+                self.emit(indent, f"return {code}")
+            else:
+                self.emit(indent, f"raise Return({code})")
+
+    def condition(self, expr: E.Expr) -> str:
+        code, kind = self.expression(expr)
+        if kind == BOOL:
+            return code
+        return f"truthy({code})"
+
+    # Expressions. Each returns the Python source and the kind of value it produces.
+
+    def expression(self, expr: E.Expr):
+        if isinstance(expr, E.Literal):
+            value = expr.value
+            if isinstance(value, float):
+                return repr(value), NUM
+            if isinstance(value, (str, Rope)):
+                return self.constant(value), STR
+            return repr(value), kindOf(value)
+        if isinstance(expr, E.Grouping):
+            code, kind = self.expression(expr.expression)
+            return f"({code})", kind
+        if isinstance(expr, E.Variable):
+            return self.variable(expr)
+        if isinstance(expr, E.Assign):
+            return self.assign(expr)
+        if isinstance(expr, E.Unary):
+            return self.unary(expr)
+        if isinstance(expr, E.Binary):
+            return self.binary(expr)
+        if isinstance(expr, E.Logical):
+            return self.logical(expr)
+        if isinstance(expr, E.Call):
+            callee = self.expression(expr.callee)[0]
+            arguments = ", ".join(self.expression(argument)[0] for argument in expr.arguments)
+            return f"callValue(interp, {self.constant(expr)}, {callee}, [{arguments}])", ANY
+        raise Unsupported(type(expr).__name__)
+
+    def variable(self, expr: E.Variable):
+        where, name = self.lookup(expr.name, expr.depth)
+        if where in ("local", "cached"):
+            return name, self.kind(name)
+        lexeme = expr.name.lexeme
+        if where == "env":
+            return f"e{name}.values.get({lexeme!r})", ANY
+        return f"(gv[{lexeme!r}] if {lexeme!r} in gv else interp.globals.get({self.constant(expr.name)}))", ANY
+
+    def assign(self, expr: E.Assign):
+        value, kind = self.expression(expr.value)
+        where, name = self.lookup(expr.name, expr.depth)
+        if where in ("local", "cached"):
+            self.record(name, kind)
+            if where == "cached":
+                self.written.add(name)
+            return f"({name} := {value})", kind
+        if where == "env":
+            return f"store(e{name}.values, {expr.name.lexeme!r}, {value})", kind
+        return f"assignGlobal(interp, {self.constant(expr.name)}, {value})", kind
+
+    def unary(self, expr: E.Unary):
+        right, kind = self.expression(expr.right)
+        if expr.operator.type == TokenType.BANG:
+            if kind == BOOL:
+                return f"(not {right})", BOOL
+            return f"(not truthy({right}))", BOOL
+        if kind == NUM:
+            return f"(-{right})", NUM
+        return f"negate(interp, {self.constant(expr.operator)}, {right})", NUM
+
+    def binary(self, expr: E.Binary):
+        left, leftKind = self.expression(expr.left)
+        right, rightKind = self.expression(expr.right)
+        opType = expr.operator.type
+        if leftKind == NUM and rightKind == NUM:
+            if opType in ARITHMETIC:
+                return f"({left} {ARITHMETIC[opType]} {right})", NUM
+            if opType == TokenType.SLASH:
+                return f"divide({left}, {right})", NUM
+            if opType in COMPARISON:
+                return f"({left} {COMPARISON[opType]} {right})", BOOL
+        if opType in EQUALITY and leftKind == rightKind and leftKind in (NUM, BOOL, NIL):
+            return f"({left} {EQUALITY[opType]} {right})", BOOL
+        if opType == TokenType.PLUS and leftKind == STR and rightKind == STR:
+            return f"concatenate({left}, {right})", STR
+        code = f"binary(interp, {self.constant(expr.operator)}, {left}, {right})"
+        if opType == TokenType.PLUS:
+            return code, ANY
+        if opType in (TokenType.MINUS, TokenType.STAR, TokenType.SLASH):
+            return code, NUM
+        return code, BOOL
+
+    def logical(self, expr: E.Logical):
+        left, leftKind = self.expression(expr.left)
+        right, rightKind = self.expression(expr.right)
+        temp = self.temp()
+        test = f"({temp} := {left})" if leftKind == BOOL else f"truthy({temp} := {left})"
+        if expr.operator.type == TokenType.OR:
+            return f"({temp} if {test} else {right})", join(leftKind, rightKind)
+        return f"({right} if {test} else {temp})", join(leftKind, rightKind)
+
+class Trace:
+    """The compiled variants of one region, keyed by the kinds of the values it starts with."""
+    def __init__(self, region: Region):
+        self.region = region
+        self.variants = {}
+        # Which outer variables are copied in does not depend on kinds, so a first pass finds them.
+        compiler = Compiler(region, {})
+        compiler.compile()
+        self.liveIns = compiler.liveIns
+
+    def __reduce__(self):
+        # Compiled code is not saved in snapshots; the region is compiled again once it is hot.
+        return type(None), ()
+
+    def run(self, interpreter: Interpreter, env: Environment, arguments: list = ()):
+        """Runs the region, returning what it returns, or DEOPT if the tree walker has to run it."""
+        values = list(arguments)
+        for name in self.liveIns:
+            distance, lexeme = self.liveIns[name]
+            if distance is None:
+                globalValues = interpreter.globals.values
+                if lexeme not in globalValues:
+                    return DEOPT
+                values.append(globalValues[lexeme])
+            else:
+                values.append(env.ancestor(distance).values.get(lexeme))
+        signature = tuple(kindOf(value) for value in values)
+        function = self.variants.get(signature)
+        if function is None:
+            if signature in self.variants or len(self.variants) >= MAX_VARIANTS:
+                return DEOPT
+            function = self.variants[signature] = self.specialize(signature)
+            if function is None:
+                return DEOPT
+        return function(interpreter, env, *values)
+
+    def specialize(self, signature: tuple):
+        names = [f"p_{param.lexeme}" for param in self.region.params] + list(self.liveIns)
+        kinds = dict(zip(names, signature))
+        # Assignments can widen the kinds of variables, so compile until they stop changing.
+        while True:
+            compiler = Compiler(self.region, kinds)
+            source = compiler.compile()
+            widened = {name: join(kinds.get(name), kind) for name, kind in compiler.assigned.items()}
+            if widened == kinds:
+                break
+            kinds = widened
+        namespace = dict(HELPERS, **compiler.constants)
+        try:
+            exec(compile(source, "<lox trace>", "exec"), namespace)
+        except (SyntaxError, RecursionError, MemoryError):
+            return None
+        return namespace["trace"]
+
+def compileRegion(root, params: list = (), isFunction: bool = False):
+    """Returns a Trace for the region, or False if it uses something only the tree walker supports."""
+    try:
+        return Trace(Region(root, list(params), isFunction))
+    except Unsupported:
+        return False
+
+class JitInterpreter(Interpreter):
+    """An Interpreter that counts loop iterations and function calls, and runs hot ones as compiled Python."""
+    def __init__(self, maxCallDepth: int = 10000, tailCalls: bool = False, hotLoop: int = HOT_LOOP, hotCalls: int = HOT_CALLS):
+        super().__init__(maxCallDepth, tailCalls)
+        self.hotLoop = hotLoop
+        self.hotCalls = hotCalls
+
+    def visitWhileStmt(self, stmt: S.While):
+        trace = stmt.trace
+        if trace is None:
+            hits = stmt.hits or 0
+            while self.isTruthy(stmt.condition.accept(self)):
+                stmt.body.accept(self)
+                hits += 1
+                if hits == self.hotLoop:
+                    # The loop is between iterations, so the compiled version can take over from here.
+                    stmt.hits = hits
+                    stmt.trace = trace = compileRegion(stmt)
+                    break
+            else:
+                stmt.hits = hits
+                return
+        if trace and trace.run(self, self.environment) is not DEOPT:
+            return
+        while self.isTruthy(stmt.condition.accept(self)):
+            stmt.body.accept(self)
+
+    def call(self, expr: E.Call, callee, arguments: list):
+        if type(callee) is not LoxFunction or callee.isInitializer or self.tailCalls:
+            return super().call(expr, callee, arguments)
+        declaration = callee.declaration
+        trace = declaration.trace
+        if trace is None:
+            declaration.hits = (declaration.hits or 0) + 1
+            if declaration.hits < self.hotCalls:
+                return super().call(expr, callee, arguments)
+            declaration.trace = trace = compileRegion(declaration.body, declaration.params, True)
+        if not trace:
+            return super().call(expr, callee, arguments)
+
+        if len(self.callStack) >= self.maxCallDepth:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        self.callStack.append(expr)
+        try:
+            value = trace.run(self, callee.closure, arguments)
+        except RecursionError:
+            raise LoxRuntimeError(expr.paren, "Stack overflow.")
+        finally:
+            self.callStack.pop()
+        if value is DEOPT:
+            return super().call(expr, callee, arguments)
+        return value
@@ -0,0 +1,383 @@
+# LanguageServer.py
+# This is a language server for Lox, speaking the Language Server Protocol over stdio.
+# It publishes syntax and resolution errors, and answers go-to-definition and hover requests.
+# Each document is kept as a list of chunks: runs of lines holding whole top-level declarations,
+# each with its own parse and index. An edit only re-scans and re-parses the chunks around it.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import bisect, json, sys, traceback
+import Stmt as S
+from Token import Token, TokenType
+from DocumentScanner import DocumentScanner
+from Parser import Parser
+from Resolver import Resolver
+from LoxErrors import LoxRuntimeError
+
+# LSP constants.
+SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+class RequestError(Exception):
+    """A failed request, answered with a JSON-RPC error of the given code."""
+    def __init__(self, code: int, message: str):
+        self.code = code
+        self.message = message
+    def __str__(self):
+        return self.message
+
+class IndexingResolver(Resolver):
+    """A Resolver that records every declaration, and what each variable refers to:
+    the token that declared it, or None for a global, which is looked up by name."""
+    def __init__(self):
+        super().__init__(None)
+        self.declarations = []
+        self.details = {}
+        self.definitions = []
+        self.references = []
+        self.globals = {}
+
+    def beginScope(self):
+        super().beginScope()
+        self.declarations.append({})
+
+    def endScope(self):
+        super().endScope()
+        self.declarations.pop()
+
+    def declare(self, name: Token):
+        super().declare(name)
+        detail = self.details.get(id(name), f"var {name.lexeme}")
+        self.definitions.append((name, detail))
+        if self.declarations:
+            self.declarations[-1][name.lexeme] = name
+        else:
+            self.globals.setdefault(name.lexeme, (name, detail))
+
+    def resolveLocal(self, expr, name: Token):
+        if name.type != TokenType.IDENTIFIER:
+            return
+        for scope in reversed(self.declarations):
+            if name.lexeme in scope:
+                self.references.append((name, scope[name.lexeme]))
+                return
+        self.references.append((name, None))
+
+    def visitClassStmt(self, classStmt: S.Class):
+        name = classStmt.name.lexeme
+        superclass = f" < {classStmt.superclass.name.lexeme}" if classStmt.superclass else ""
+        self.details[id(classStmt.name)] = f"class {name}{superclass}"
+        for method in classStmt.methods:
+            parameters = ", ".join(param.lexeme for param in method.params)
+            self.definitions.append((method.name, f"method {name}.{method.name.lexeme}({parameters})"))
+        super().visitClassStmt(classStmt)
+
+    def visitFunctionStmt(self, stmt: S.Function):
+        parameters = ", ".join(param.lexeme for param in stmt.params)
+        self.details[id(stmt.name)] = f"fun {stmt.name.lexeme}({parameters})"
+        super().visitFunctionStmt(stmt)
+
+    def resolveFunction(self, function: S.Function, funcType):
+        for param in function.params:
+            self.details[id(param)] = f"parameter {param.lexeme}"
+        super().resolveFunction(function, funcType)
+
+class Chunk:
+    """Lines start to the next chunk's start. Token lines count from 1 at the start of the region the
+    chunk was parsed in, and origin is where the chunk began in that region, so tokens keep their
+    lines when edits above the chunk move it."""
+    def __init__(self, start: int, origin: int = 0):
+        self.start = start
+        self.origin = origin
+        self.statements = []
+        # (token line, column, length, message)
+        self.diagnostics = []
+        self.definitions = []
+        self.references = []
+        self.globals = {}
+
+    def line(self, tokenLine: int) -> int:
+        """The document line, counted from 0, of a token line in this chunk."""
+        return self.start + tokenLine - 1 - self.origin
+
+    def tokenLine(self, line: int) -> int:
+        return line - self.start + self.origin + 1
+
+    def index(self):
+        resolver = IndexingResolver()
+        try:
+            resolver.resolve(self.statements)
+        except LoxRuntimeError as e:
+            self.diagnostics.append((e.token.line, getattr(e.token, "column", 0), len(e.token.lexeme), e.message))
+        self.definitions = resolver.definitions
+        self.references = resolver.references
+        self.globals = resolver.globals
+
+class Document:
+    def __init__(self, uri: str, text: str):
+        self.uri = uri
+        # Lines scanned by the last update, for measuring how incremental it was.
+        self.reparsedLines = 0
+        self.setText(text)
+
+    def setText(self, text: str):
+        self.lines = text.split("\n")
+        self.chunks = [Chunk(0)]
+        self.reparse(0, 0)
+
+    def chunkAt(self, line: int) -> int:
+        return max(0, bisect.bisect_right([chunk.start for chunk in self.chunks], line) - 1)
+
+    def change(self, change: dict):
+        """Applies one entry of a didChange notification's contentChanges."""
+        if "range" not in change:
+            self.setText(change["text"])
+            return
+        start, end = change["range"]["start"], change["range"]["end"]
+        first, last = self.chunkAt(start["line"]), self.chunkAt(end["line"])
+        prefix = self.lines[start["line"]][:start["character"]]
+        suffix = self.lines[end["line"]][end["character"]:] if end["line"] < len(self.lines) else ""
+        replacement = (prefix + change["text"] + suffix).split("\n")
+        self.lines[start["line"]:end["line"] + 1] = replacement
+        delta = len(replacement) - (end["line"] - start["line"] + 1)
+        for chunk in self.chunks[last + 1:]:
+            chunk.start += delta
+        # The neighbors are parsed too, since an edit can join a declaration to the one before or after it.
+        self.reparse(max(0, first - 1), min(len(self.chunks) - 1, last + 1))
+
+    def reparse(self, first: int, last: int):
+        """Replaces chunks first to last with a new parse of their lines. While the parse runs into the
+        end of the region, as an unclosed block or string does, the next chunk is added to it."""
+        while True:
+            start = self.chunks[first].start
+            end = self.chunks[last + 1].start if last + 1 < len(self.chunks) else len(self.lines)
+            chunks, closed = self.parseRegion(start, end)
+            if closed or last + 1 >= len(self.chunks):
+                break
+            last += 1
+        self.reparsedLines = end - start
+        self.chunks[first:last + 1] = chunks
+
+    def parseRegion(self, start: int, end: int):
+        scanner = DocumentScanner("\n".join(self.lines[start:end]))
+        tokens = scanner.scanTokens()
+        parser = Parser(tokens)
+        # Each group is [first line, last line, statements, parse errors], lines counted from 0 in the region.
+        groups = []
+        # Whether the last declaration parsed cleanly. If it did not, the parser's recovery ran into the
+        # end of the region, and would have skipped into the next chunk in a parse of the whole document.
+        lastClean = True
+        while not parser.isAtEnd():
+            firstToken = parser.peek()
+            errors = len(parser.errors)
+            statement = parser.declaration()
+            # A token's line is the one it ends on, which for a string can be later than where it starts.
+            firstLine = firstToken.line - 1 - firstToken.lexeme.count("\n")
+            lastLine = parser.previous().line - 1
+            if not groups or firstLine > groups[-1][1]:
+                groups.append([firstLine, lastLine, [], []])
+            group = groups[-1]
+            group[1] = max(group[1], lastLine)
+            if statement is not None:
+                group[2].append(statement)
+            group[3] += parser.errors[errors:]
+            lastClean = len(parser.errors) == errors
+
+        chunks = []
+        for i, (firstLine, _, statements, errors) in enumerate(groups):
+            origin = 0 if i == 0 else firstLine
+            chunk = Chunk(start + origin, origin)
+            chunk.statements = statements
+            chunk.diagnostics = [(e.token.line, e.token.column, max(1, len(e.token.lexeme)), e.message) for e in errors]
+            chunks.append(chunk)
+        if not chunks:
+            chunks.append(Chunk(start))
+        for line, column, length, message in scanner.errors:
+            chunk = chunks[max(0, bisect.bisect_right([chunk.origin for chunk in chunks], line - 1) - 1)]
+            chunk.diagnostics.append((line, column, length, message))
+        for chunk in chunks:
+            chunk.index()
+
+        closed = lastClean and not scanner.unterminated
+        return chunks, closed
+
+    # Queries. Lines and characters count from 0, as in LSP.
+
+    def range(self, chunk: Chunk, token: Token) -> dict:
+        line = min(chunk.line(token.line), len(self.lines) - 1)
+        return {"start": {"line": line, "character": token.column},
+                "end": {"line": line, "character": token.column + max(1, len(token.lexeme))}}
+
+    def diagnostics(self) -> list:
+        result = []
+        for chunk in self.chunks:
+            for tokenLine, column, length, message in chunk.diagnostics:
+                line = min(chunk.line(tokenLine), len(self.lines) - 1)
+                result.append({"range": {"start": {"line": line, "character": column},
+                                         "end": {"line": line, "character": column + length}},
+                               "severity": SEVERITY_ERROR, "source": "lox", "message": message})
+        return result
+
+    def tokenAt(self, line: int, character: int):
+        """The chunk and the declared or referenced name at a position, and what that name refers to."""
+        chunk = self.chunks[self.chunkAt(line)]
+        tokenLine = chunk.tokenLine(line)
+        found = [(token, token) for token, _ in chunk.definitions] + chunk.references
+        for token, target in found:
+            if token.line == tokenLine and token.column <= character < token.column + len(token.lexeme):
+                if target is not None:
+                    return chunk, target
+                return self.globalDefinition(token.lexeme)
+        return None, None
+
+    def globalDefinition(self, name: str):
+        for chunk in self.chunks:
+            if name in chunk.globals:
+                return chunk, chunk.globals[name][0]
+        return None, None
+
+    def detail(self, chunk: Chunk, token: Token) -> str:
+        for definition, detail in chunk.definitions:
+            if definition is token:
+                return detail
+        return token.lexeme
+
+class LanguageServer:
+    def __init__(self, input=sys.stdin.buffer, output=sys.stdout.buffer):
+        self.input = input
+        self.output = output
+        self.documents = {}
+        self.running = True
+        self.handlers = {
+            "initialize": self.initialize,
+            "shutdown": self.shutdown,
+            "exit": self.exit,
+            "textDocument/didOpen": self.didOpen,
+            "textDocument/didChange": self.didChange,
+            "textDocument/didClose": self.didClose,
+            "textDocument/definition": self.definition,
+            "textDocument/hover": self.hover,
+        }
+
+    # Transport.
+
+    def read(self):
+        """The next message, or None at the end of the input."""
+        length = None
+        while True:
+            header = self.input.readline()
+            if not header:
+                return None
+            header = header.strip()
+            if not header:
+                break
+            name, _, value = header.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(self.input.read(length).decode("utf-8"))
+
+    def send(self, message: dict):
+        body = json.dumps(message).encode("utf-8")
+        self.output.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        self.output.flush()
+
+    def notify(self, method: str, params: dict):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def serve(self):
+        while self.running:
+            message = self.read()
+            if message is None:
+                break
+            handler = self.handlers.get(message.get("method"))
+            if "id" not in message:
+                # Notifications get no reply, even when they are not understood.
+                if handler is not None:
+                    self.dispatch(handler, message)
+                continue
+            if handler is None:
+                self.send({"jsonrpc": "2.0", "id": message["id"],
+                           "error": {"code": METHOD_NOT_FOUND, "message": f"Unknown method {message.get('method')}."}})
+            else:
+                self.dispatch(handler, message)
+
+    def dispatch(self, handler, message: dict):
+        """Runs a handler, so that one failed message never stops the server. A failed request is answered
+        with an error; a failed notification has no reply, so it is logged to stderr."""
+        try:
+            result = handler(message.get("params", {}))
+        except RequestError as e:
+            code, text = e.code, e.message
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            code, text = INTERNAL_ERROR, f"{type(e).__name__}: {e}"
+        else:
+            if "id" in message:
+                self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+            return
+        if "id" in message:
+            self.send({"jsonrpc": "2.0", "id": message["id"], "error": {"code": code, "message": text}})
+        else:
+            print(f"Ignored {message.get('method')}: {text}", file=sys.stderr)
+
+    # Lifecycle.
+
+    def initialize(self, params: dict) -> dict:
+        return {"capabilities": {
+            "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+            "definitionProvider": True,
+            "hoverProvider": True,
+        }, "serverInfo": {"name": "pylox"}}
+
+    def shutdown(self, params: dict):
+        return None
+
+    def exit(self, params: dict):
+        self.running = False
+
+    # Documents.
+
+    def publish(self, document: Document):
+        self.notify("textDocument/publishDiagnostics", {"uri": document.uri, "diagnostics": document.diagnostics()})
+
+    def didOpen(self, params: dict):
+        item = params["textDocument"]
+        document = self.documents[item["uri"]] = Document(item["uri"], item["text"])
+        self.publish(document)
+
+    def document(self, params: dict) -> Document:
+        uri = params["textDocument"]["uri"]
+        if uri not in self.documents:
+            raise RequestError(INVALID_PARAMS, f"Document {uri} is not open.")
+        return self.documents[uri]
+
+    def didChange(self, params: dict):
+        document = self.document(params)
+        for change in params["contentChanges"]:
+            document.change(change)
+        self.publish(document)
+
+    def didClose(self, params: dict):
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def definition(self, params: dict):
+        document = self.document(params)
+        position = params["position"]
+        chunk, token = document.tokenAt(position["line"], position["character"])
+        if token is None:
+            return None
+        return {"uri": document.uri, "range": document.range(chunk, token)}
+
+    def hover(self, params: dict):
+        document = self.document(params)
+        position = params["position"]
+        chunk, token = document.tokenAt(position["line"], position["character"])
+        if token is None:
+            return None
+        line = chunk.line(token.line) + 1
+        return {"contents": {"kind": "markdown", "value": f"```lox\n{document.detail(chunk, token)}\n```\nDeclared on line {line}."}}
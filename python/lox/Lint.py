@@ -0,0 +1,240 @@
+# Lint.py
+# This is a static analysis pass that reports likely mistakes and slow code without running anything:
+# unused locals and parameters, code after a return, constant conditions, and loops that build strings
+# by prepending or look methods up on every iteration.
+# It rides on the Resolver's walk of the scopes, so a file is scanned, parsed and walked once.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import json, os, sys
+from typing import List
+import Expr as E
+import Stmt as S
+from Token import Token, TokenType
+from Parser import Parser
+from Resolver import Resolver
+from LoxErrors import LoxRuntimeError
+from AstUtil import firstToken, walk
+from DocumentScanner import DocumentScanner
+
+ERROR = "error"
+WARNING = "warning"
+
+class Finding:
+    """A problem at a position. Columns count from 0 here, as the scanner records them,
+    and from 1 in both output formats, as compilers print them."""
+    __slots__ = ("path", "line", "column", "severity", "code", "message")
+
+    def __init__(self, path: str, line: int, column: int, severity: str, code: str, message: str):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.severity = severity
+        self.code = code
+        self.message = message
+
+    def asDict(self) -> dict:
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields["column"] += 1
+        return fields
+
+    def __str__(self):
+        return f"{self.path}:{self.line}:{self.column + 1}: {self.severity} {self.code}: {self.message}"
+
+def terminates(stmt: S.Stmt) -> bool:
+    """Whether control never reaches the statement after stmt."""
+    if isinstance(stmt, S.Return):
+        return True
+    if isinstance(stmt, S.Block):
+        return any(terminates(statement) for statement in stmt.statements)
+    if isinstance(stmt, S.If):
+        return stmt.elseBranch is not None and terminates(stmt.thenBranch) and terminates(stmt.elseBranch)
+    return False
+
+def constantTruth(expr: E.Expr):
+    """Whether expr is always truthy or always falsey, or None if that depends on the program."""
+    if isinstance(expr, E.Literal):
+        return expr.value is not None and expr.value is not False
+    if isinstance(expr, E.Grouping):
+        return constantTruth(expr.expression)
+    if isinstance(expr, E.Unary) and expr.operator.type == TokenType.BANG:
+        truth = constantTruth(expr.right)
+        return None if truth is None else not truth
+    if isinstance(expr, E.Logical):
+        left, right = constantTruth(expr.left), constantTruth(expr.right)
+        # The left operand decides the result on its own when it short-circuits.
+        if left is (expr.operator.type == TokenType.OR):
+            return left
+        return right if left is not None else None
+    return None
+
+def concatenation(expr: E.Expr) -> list:
+    """The operands of a chain of +, left to right."""
+    if isinstance(expr, E.Grouping):
+        return concatenation(expr.expression)
+    if isinstance(expr, E.Binary) and expr.operator.type == TokenType.PLUS:
+        return concatenation(expr.left) + concatenation(expr.right)
+    return [expr]
+
+class LintResolver(Resolver):
+    def __init__(self, path: str, methods: set):
+        super().__init__(None)
+        self.path = path
+        # Names only ever declared as methods, never stored as fields.
+        self.methods = methods
+        self.findings: List[Finding] = []
+        # For each open scope, the declared names and whether each has been read.
+        self.usage = []
+        self.parameters = set()
+        # For each loop being walked in the current function, the names its body assigns or declares.
+        self.loops = []
+
+    def report(self, token: Token, code: str, message: str, severity: str = WARNING):
+        self.findings.append(Finding(self.path, token.line, getattr(token, "column", 0), severity, code, message))
+
+    def resolve(self, statements):
+        if isinstance(statements, list):
+            for statement, following in zip(statements, statements[1:]):
+                if terminates(statement):
+                    # Only statements the parser made up, with no source of their own, lack a token.
+                    token = firstToken(following)
+                    if token is not None:
+                        self.report(token, "unreachable-code", "Code after a return is never run.")
+                    break
+        super().resolve(statements)
+
+    # Unused variables.
+
+    def beginScope(self):
+        super().beginScope()
+        self.usage.append({})
+
+    def endScope(self):
+        super().endScope()
+        for name, (token, used) in self.usage.pop().items():
+            if used or name.startswith("_"):
+                continue
+            if id(token) in self.parameters:
+                self.report(token, "unused-parameter", f"Parameter '{name}' is never used.")
+            else:
+                self.report(token, "unused-variable", f"Local '{name}' is never used.")
+
+    def declare(self, name: Token):
+        super().declare(name)
+        if self.usage:
+            self.usage[-1][name.lexeme] = [name, False]
+
+    def resolveLocal(self, expr: E.Expr, name: Token):
+        for scope in reversed(self.usage):
+            if name.lexeme in scope:
+                # Assigning to a variable is not a use of it.
+                if not isinstance(expr, E.Assign):
+                    scope[name.lexeme][1] = True
+                return
+
+    def resolveFunction(self, function: S.Function, funcType):
+        self.parameters.update(id(param) for param in function.params)
+        # A function's body runs when it is called, not on each iteration of a loop around its declaration.
+        loops, self.loops = self.loops, []
+        super().resolveFunction(function, funcType)
+        self.loops = loops
+
+    # Constant conditions.
+
+    def checkCondition(self, expr: E.Expr, token: Token):
+        truth = constantTruth(expr)
+        # Conditions the parser makes up, such as a for loop's missing one, have no token and are not reported.
+        if truth is not None and token is not None:
+            self.report(token, "constant-condition", f"Condition is always {'true' if truth else 'false'}.")
+
+    def visitIfStmt(self, stmt: S.If):
+        self.checkCondition(stmt.condition, firstToken(stmt))
+        super().visitIfStmt(stmt)
+
+    def visitLogicalExpr(self, expr: E.Logical):
+        self.checkCondition(expr.left, expr.operator)
+        super().visitLogicalExpr(expr)
+
+    def visitWhileStmt(self, stmt: S.While):
+        # while (true) is how Lox spells a loop left by returning, and is what a for loop without a condition becomes.
+        if not (isinstance(stmt.condition, E.Literal) and stmt.condition.value is True):
+            self.checkCondition(stmt.condition, firstToken(stmt))
+        changed = set()
+        for node in walk([stmt.condition, stmt.body]):
+            if isinstance(node, (E.Assign, S.Var, S.Function, S.Class)):
+                changed.add(node.name.lexeme)
+        self.loops.append(changed)
+        super().visitWhileStmt(stmt)
+        self.loops.pop()
+
+    # Slow code in loops.
+
+    def visitAssignExpr(self, expr: E.Assign):
+        if self.loops:
+            operands = concatenation(expr.value)
+            prepends = any(isinstance(operand, E.Variable) and operand.name.lexeme == expr.name.lexeme for operand in operands[1:])
+            if prepends and any(isinstance(operand, E.Literal) and isinstance(operand.value, str) for operand in operands):
+                self.report(expr.name, "string-concat-in-loop",
+                            f"'{expr.name.lexeme}' is built by adding to its front in a loop, which copies the whole string "
+                            "each time. Append to it instead.")
+        super().visitAssignExpr(expr)
+
+    def visitCallExpr(self, expr: E.Call):
+        callee = expr.callee
+        if self.loops:
+            if isinstance(callee, E.Super):
+                self.report(callee.method, "uncached-method-lookup",
+                            f"'super.{callee.method.lexeme}' is looked up and bound on every iteration. "
+                            "Store it in a local before the loop.")
+            elif isinstance(callee, E.Get) and callee.name.lexeme in self.methods and self.invariant(callee.object):
+                self.report(callee.name, "uncached-method-lookup",
+                            f"Method '{callee.name.lexeme}' is looked up and bound on every iteration, since only fields "
+                            "are cached. Store it in a local before the loop.")
+        super().visitCallExpr(expr)
+
+    def invariant(self, expr: E.Expr) -> bool:
+        """Whether expr names the same object on every iteration of the innermost loop."""
+        if isinstance(expr, E.This):
+            return True
+        return isinstance(expr, E.Variable) and expr.name.lexeme not in self.loops[-1]
+
+def lintSource(source: str, path: str = "<lox>") -> List[Finding]:
+    scanner = DocumentScanner(source)
+    parser = Parser(scanner.scanTokens())
+    statements = parser.parse()
+    findings = [Finding(path, line, column, ERROR, "syntax-error", message) for line, column, _, message in scanner.errors]
+    findings += [Finding(path, e.token.line, e.token.column, ERROR, "syntax-error", e.message) for e in parser.errors]
+
+    methods, fields = set(), set()
+    for node in walk(statements):
+        if isinstance(node, S.Class):
+            methods.update(method.name.lexeme for method in node.methods)
+        elif isinstance(node, E.Set):
+            fields.add(node.name.lexeme)
+    resolver = LintResolver(path, methods - fields)
+    try:
+        resolver.resolve(statements)
+    except LoxRuntimeError as e:
+        resolver.report(e.token, "resolve-error", e.message, ERROR)
+    findings += resolver.findings
+    findings.sort(key=lambda finding: (finding.line, finding.column))
+    return findings
+
+def lintPaths(paths: List[str]) -> List[Finding]:
+    """Lints each file, and each .lox file under each directory, in order."""
+    findings = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(directory, name) for directory, _, names in os.walk(path)
+                           for name in names if name.endswith(".lox"))
+        else:
+            files = [path]
+        for file in files:
+            with open(file, "r", errors="replace") as f:
+                findings += lintSource(f.read(), file)
+    return findings
+
+def writeFindings(findings: List[Finding], format: str = "text", out=sys.stdout):
+    """Writes one finding per line: as path:line:column text, or as JSON objects."""
+    for finding in findings:
+        out.write((json.dumps(finding.asDict()) if format == "json" else str(finding)) + "\n")
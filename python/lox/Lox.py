@@ -1,30 +1,28 @@
 # Lox.py
 # This is the main entry point for the Lox interpreter.
 # Written by: Joel Peckham.
-# Last Modified: 2022-03-17.
+# Last Modified: 2026-10-19.
 
-import argparse, sys
+import argparse, atexit, os, sys
 from Scanner import Scanner
 from Parser import Parser
-from Interpreter import Interpreter
+from Interpreter import Interpreter, FRAMES_PER_CALL
+from Resumable import runOnProgramThread
 from Resolver import Resolver
-interpreter = Interpreter()
 
-def run(source):
-    scanner = Scanner(source)
-    tokens = scanner.scanTokens()
-    parser = Parser(tokens)
-    statements = parser.parse()
+def execute(statements):
     resolver = Resolver(interpreter)
     resolver.resolve(statements)
     interpreter.interpret(statements)
     
 def runPrompt():
+    from Repl import ReplSession
+    session = ReplSession(interpreter)
     while True:
         try:
             print("> ", end="")
             source = input()
-            run(source)
+            session.run(source)
         except (KeyboardInterrupt, EOFError):
             print("\nBye!")
             break
@@ -34,11 +32,62 @@ def runPrompt():
             # exit(70)
             
 
-def runFile(path):
+def readProgram(path):
+    """The statements of a source file, or of a file written with --save-ast."""
+    from AstFormat import isAstFile, loadFile
+    if isAstFile(path):
+        return loadFile(path)
     with open(path, "r") as f:
         source = f.read()
+    return Parser(Scanner(source).scanTokens()).parseOrRaise()
+
+def saveAST(path, outPath):
+    from AstFormat import saveFile
+    saveFile(readProgram(path), outPath)
+
+def transpileFile(path, outPath):
+    import py_compile
+    from Transpiler import Transpiler
+    from Modules import inlineImports
+    statements = readProgram(path)
+    Resolver(interpreter).resolve(statements)
+    statements = inlineImports(statements, interpreter.importDirectory, interpreter.importPath, interpreter)
+    module = Transpiler(os.path.basename(path), args.max_depth, args.runtime_path).transpile(statements, interpreter.natives)
+    with open(outPath, "w") as f:
+        f.write(module)
+    # Byte-compile now, so importing the module later loads the cached bytecode.
+    py_compile.compile(outPath, doraise=True)
+
+def dumpAST(path, outPath):
+    from AstPrinter import AstPrinter
+    statements = readProgram(path)
+    if outPath == "-":
+        AstPrinter().writeProgram(statements, sys.stdout)
+    else:
+        with open(outPath, "w") as f:
+            AstPrinter().writeProgram(statements, f)
+
+def runFile(path):
+    interpreter.importDirectory = os.path.dirname(os.path.abspath(path))
     try:
-        run(source)
+        if args.dump_ast is not None:
+            dumpAST(path, args.dump_ast)
+        elif args.transpile is not None:
+            transpileFile(path, args.transpile)
+        elif args.save_ast is not None:
+            saveAST(path, args.save_ast)
+        elif args.async_mode:
+            import asyncio
+            from AsyncLox import runProgram
+            with open(path, "r") as f:
+                source = f.read()
+            asyncio.run(runProgram(source, sliceSize=args.slice, maxCallDepth=args.max_depth, tailCalls=args.tail_calls,
+                                   importDirectory=interpreter.importDirectory, importPath=interpreter.importPath))
+        else:
+            statements = readProgram(path)
+            if args.coverage is not None:
+                interpreter.coverage.register(statements, os.path.abspath(path))
+            execute(statements)
     except Exception as e:
         print(e, file=sys.stderr)
         exit(65)
@@ -46,10 +95,128 @@ def runFile(path):
 # Get args from command line.
 parser = argparse.ArgumentParser(description='Lox interpreter.')
 parser.add_argument('file', nargs='?', default=None, help='The file to run.')
+parser.add_argument('--max-depth', type=int, default=10000, help='Maximum Lox call depth before a stack overflow error.')
+parser.add_argument('--tail-calls', action='store_true', help='Reuse the caller\'s frame for calls in return position.')
+parser.add_argument('--alloc-stats', metavar='PATH', default=None, help='Count runtime allocations and write a JSON report to PATH (- for stderr) at exit.')
+parser.add_argument('--async', dest='async_mode', action='store_true', help='Run the file under asyncio, yielding to the event loop between slices and on input().')
+parser.add_argument('--slice', type=int, default=1000, help='Statements run per slice in --async mode.')
+parser.add_argument('--jit', action='store_true', help='Compile hot loops and functions to Python.')
+parser.add_argument('--jit-threshold', metavar='N', type=int, default=None, help='Loop iterations and function calls before --jit compiles them. Defaults to 64.')
+parser.add_argument('--transpile', metavar='PATH', default=None, help='Write the file as an equivalent Python module to PATH instead of running it. The module imports LoxRuntime, so this directory has to be on its Python path.')
+parser.add_argument('--runtime-path', metavar='DIR', default=None, help='Make the --transpile module add DIR to its Python path to import LoxRuntime from.')
+parser.add_argument('--dump-ast', metavar='PATH', default=None, help='Write the syntax tree of the file to PATH (- for stdout) instead of running it.')
+parser.add_argument('--save-ast', metavar='PATH', default=None, help='Write the parsed file to PATH in the binary AST format instead of running it. Such files can be run like source files.')
+parser.add_argument('--trace', metavar='PATH', default=None, help='Write every statement, call, return and runtime error to PATH (- for stderr).')
+parser.add_argument('--debug', action='store_true', help='Run the file under a command-line debugger on stdin and stderr. Stops at the first statement unless --break is given.')
+parser.add_argument('--break', dest='breakpoints', metavar='LINE', type=int, action='append', default=[], help='Stop at LINE when debugging. Can be repeated.')
+parser.add_argument('--coverage', metavar='PATH', default=None, help='Add the lines and branches the file runs to the lcov tracefile at PATH, creating it if needed.')
+parser.add_argument('--language-server', action='store_true', help='Run a language server for Lox on stdin and stdout instead of a file.')
+parser.add_argument('--lint', action='store_true', help='Report unused variables, unreachable code, constant conditions and slow loops in the file, or in every .lox file under it if it is a directory, instead of running it. Exits with 1 if anything is found.')
+parser.add_argument('--lint-format', choices=['text', 'json'], default='text', help='Write --lint findings as path:line:column text, or as one JSON object per line. Columns count from 1 in both.')
+parser.add_argument('--import-path', metavar='DIR', action='append', default=[], help='Also look for imported modules in DIR, after the importing file\'s directory and before LOX_PATH. Can be repeated.')
+parser.add_argument('--load-snapshot', metavar='PATH', default=None, help='Restore globals saved with --save-snapshot before running.')
+parser.add_argument('--save-snapshot', metavar='PATH', default=None, help='Save the globals defined by the file to PATH after running it.')
 args = parser.parse_args()
 
-# If no file is specified, run the REPL.
-if args.file is None:
-    runPrompt()
+# Each of these runs the file on its own kind of interpreter, and each action does something else instead of
+# running it, so at most one of all of them can be given.
+modes = {"--coverage": args.coverage is not None, "--debug": args.debug, "--trace": args.trace is not None,
+         "--jit": args.jit, "--alloc-stats": args.alloc_stats is not None, "--async": args.async_mode}
+actions = {"--language-server": args.language_server, "--lint": args.lint, "--transpile": args.transpile is not None,
+           "--dump-ast": args.dump_ast is not None, "--save-ast": args.save_ast is not None}
+given = [flag for flag, on in {**modes, **actions}.items() if on]
+if len(given) > 1:
+    parser.error(f"{given[0]} cannot be used with {given[1]}")
+# The async runtime makes its own interpreter and the actions run nothing, so neither has globals to snapshot.
+snapshot = "--load-snapshot" if args.load_snapshot is not None else "--save-snapshot" if args.save_snapshot is not None else None
+if snapshot is not None and given and (given[0] == "--async" or given[0] in actions):
+    parser.error(f"{snapshot} cannot be used with {given[0]}")
+# Coverage numbers the statements of the file and its imports before they run, which the REPL's lines
+# and the functions in a snapshot never are.
+if args.load_snapshot is not None and args.coverage is not None:
+    parser.error("--load-snapshot cannot be used with --coverage")
+if args.file is None and given and given[0] in ("--coverage", "--async", "--transpile", "--dump-ast", "--save-ast"):
+    parser.error(f"{given[0]} needs a file")
+if args.breakpoints and not args.debug:
+    parser.error("--break needs --debug")
+if args.runtime_path is not None and args.transpile is None:
+    parser.error("--runtime-path needs --transpile")
+if args.jit_threshold is not None and not args.jit:
+    parser.error("--jit-threshold needs --jit")
+if args.jit_threshold is not None and args.jit_threshold < 1:
+    parser.error("--jit-threshold must be at least 1")
+
+if args.language_server:
+    from LanguageServer import LanguageServer
+    LanguageServer().serve()
+    sys.exit(0)
+
+if args.lint:
+    from Lint import lintPaths, writeFindings
+    findings = lintPaths([args.file if args.file is not None else "."])
+    writeFindings(findings, args.lint_format)
+    sys.exit(1 if findings else 0)
+
+if args.coverage is not None:
+    from Coverage import Coverage, CoverageInterpreter
+    interpreter = CoverageInterpreter(Coverage(), args.max_depth, args.tail_calls)
+    atexit.register(interpreter.coverage.save, args.coverage)
+elif args.debug or args.trace is not None:
+    from Debugger import DebugInterpreter, Debugger, Tracer
+    if args.debug:
+        source = ""
+        if args.file is not None:
+            with open(args.file, "r", errors="replace") as f:
+                source = f.read()
+        hooks = Debugger(source, breakpoints=args.breakpoints)
+    else:
+        out = sys.stderr if args.trace == "-" else open(args.trace, "w")
+        atexit.register(out.flush)
+        hooks = Tracer(out)
+    interpreter = DebugInterpreter(hooks, args.max_depth, args.tail_calls)
+elif args.jit:
+    from JIT import JitInterpreter, HOT_LOOP, HOT_CALLS
+    hotLoop, hotCalls = (HOT_LOOP, HOT_CALLS) if args.jit_threshold is None else (args.jit_threshold, args.jit_threshold)
+    interpreter = JitInterpreter(args.max_depth, args.tail_calls, hotLoop, hotCalls)
+elif args.alloc_stats is not None:
+    from AllocationTracker import AllocationTracker, TrackingInterpreter
+    interpreter = TrackingInterpreter(args.max_depth, args.tail_calls)
+    tracker = AllocationTracker(interpreter)
+    tracker.install()
+    atexit.register(tracker.report, args.alloc_stats)
 else:
-    runFile(args.file)
+    interpreter = Interpreter(args.max_depth, args.tail_calls)
+
+interpreter.importPath = args.import_path + [d for d in os.environ.get("LOX_PATH", "").split(os.pathsep) if d]
+
+def main():
+    if args.load_snapshot is not None:
+        from Snapshot import loadSnapshot, SnapshotError
+        try:
+            loadSnapshot(interpreter, args.load_snapshot)
+        except (SnapshotError, OSError) as e:
+            print(e, file=sys.stderr)
+            exit(65)
+
+    # If no file is specified, run the REPL.
+    if args.file is None:
+        runPrompt()
+    else:
+        runFile(args.file)
+
+    if args.save_snapshot is not None:
+        from Snapshot import saveSnapshot, SnapshotError
+        try:
+            saveSnapshot(interpreter, args.save_snapshot)
+        except (SnapshotError, OSError) as e:
+            print(e, file=sys.stderr)
+            exit(65)
+
+# The program runs on a thread with a stack deep enough for --max-depth Lox calls.
+try:
+    runOnProgramThread(main, args.max_depth * FRAMES_PER_CALL)
+except KeyboardInterrupt:
+    # Ctrl-C reaches only this thread, so the REPL says goodbye here.
+    if args.file is None:
+        print("\nBye!")
+    sys.exit(0 if args.file is None else 130)
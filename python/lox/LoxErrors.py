@@ -23,9 +23,24 @@ class TokenError(Exception):
         else:
             return f"[line {self.token.line}] Error at '{self.token.lexeme}': {self.message}"
 
+class ParseErrors(Exception):
+    """All the syntax errors in a program, printed one per line."""
+    def __init__(self, errors):
+        self.errors = errors
+    def __str__(self):
+        return "\n".join(str(error) for error in self.errors)
+
 class LoxRuntimeError(Exception):
     def __init__(self, token, message):
         self.message = message
         self.token = token
     def __str__(self):
-        return f"{self.message} [line {self.token.line}]"
\ No newline at end of file
+        return f"{self.message} [line {self.token.line}]"
+
+class ModuleError(LoxRuntimeError):
+    """An import of a module that could not be compiled, carrying the syntax errors in the module."""
+    def __init__(self, token, message, errors):
+        super().__init__(token, message)
+        self.errors = errors
+    def __str__(self):
+        return "\n".join([str(error) for error in self.errors] + [super().__str__()])
@@ -1,13 +1,13 @@
 # LoxFunction.py 
 # This is a implementation of LoxCallable for functions.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
 from LoxCallable import LoxCallable
 import Stmt as S
 from Environment import Environment
 from LoxInstance import LoxInstance
-from Return import Return
+from Return import Return, TailCall
 
 class LoxFunction(LoxCallable):
     def __init__(self, declaration: S.Function, closure: Environment, isInitializer: bool):
@@ -24,19 +24,29 @@ class LoxFunction(LoxCallable):
         return len(self.declaration.params)
     
     def call(self, interpreter, arguments: list) -> object:
-        env = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments):
-            env.define(param.lexeme, arg)
-        try:
-            interpreter.executeBlock(self.declaration.body, env)
-        except Return as ret:
-            if self.isInitializer:
-                return self.closure.getAt(0, "this")
-            return ret.value
-        
-        if self.isInitializer:
-            return self.closure.getAt(0, "this")
-        return None
+        function = self
+        while True:
+            # The Resolver marks functions whose frame no closure can capture.
+            recycle = function.declaration.captured is False
+            env = Environment.acquire(function.closure) if recycle else Environment(function.closure)
+            for param, arg in zip(function.declaration.params, arguments):
+                env.define(param.lexeme, arg)
+            try:
+                interpreter.executeBlock(function.declaration.body, env)
+            except TailCall as tail:
+                function, arguments = tail.function, tail.arguments
+                continue
+            except Return as ret:
+                if function.isInitializer:
+                    return function.closure.getAt(0, "this")
+                return ret.value
+            finally:
+                if recycle:
+                    env.release()
+            
+            if function.isInitializer:
+                return function.closure.getAt(0, "this")
+            return None
     
     def __str__(self):
         return f"<fn {self.declaration.name.lexeme}>"
@@ -1,27 +1,67 @@
 # LoxInstance.py
 # This is an implemenation of instances of Lox classes.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
 from LoxErrors import LoxRuntimeError
 from Token import Token
 
+class Shape:
+    """A hidden class mapping field names to slots in an instance's values list.
+    Instances that add the same fields in the same order share one Shape."""
+    __slots__ = ("slots", "transitions")
+
+    def __init__(self, slots: dict):
+        self.slots = slots
+        self.transitions = {}
+
+    def withField(self, name: str) -> "Shape":
+        shape = self.transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = Shape(slots)
+            self.transitions[name] = shape
+        return shape
+
+EMPTY_SHAPE = Shape({})
+
 class LoxInstance:
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass):
         self.klass = klass
-        self.fields = {}
-    
-    def get(self, name: Token) -> object:
-        if name.lexeme in self.fields:
-            return self.fields[name.lexeme]
+        self.shape = EMPTY_SHAPE
+        self.values = []
+
+    def get(self, name: Token, site=None) -> object:
+        # site is the Get expression to record the shape and slot on, if any.
+        index = self.shape.slots.get(name.lexeme)
+        if index is not None:
+            if site is not None:
+                site.shape = self.shape
+                site.index = index
+            return self.values[index]
         method = self.klass.findMethod(name.lexeme)
         if method:
             return method.bind(self)
         raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
-    
-    def set(self, name: Token, value: object):
-        self.fields[name.lexeme] = value
-    
+
+    def set(self, name: Token, value: object, site=None):
+        # site is the Set expression to record the shape before and after the store on, if any.
+        shape = self.shape
+        index = shape.slots.get(name.lexeme)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self.shape = shape.withField(name.lexeme)
+        else:
+            self.values[index] = value
+        if site is not None:
+            site.shape = shape
+            site.index = index
+            site.nextShape = self.shape
+
     def __str__(self):
         return f"{self.klass.name} instance"
-    
\ No newline at end of file
+
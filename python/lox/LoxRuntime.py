@@ -0,0 +1,275 @@
+# LoxRuntime.py
+# This is the runtime support imported by Python modules generated with Transpiler.py.
+# Lox functions and classes become Python functions and classes; the helpers here give
+# operators, calls and properties the same semantics and error messages as the Interpreter.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import linecache, re, sys
+from types import FunctionType
+from Token import Token, TokenType
+from LoxErrors import LoxRuntimeError, TokenError
+from LoxCallable import LoxCallable
+from Interpreter import Interpreter
+from NativeModule import NativeInstance
+from Resumable import runOnProgramThread
+from Rope import Rope, concatenate
+
+# Natives are called with this interpreter, and their errors are reported at the top of its call stack.
+interpreter = Interpreter()
+callStack = interpreter.callStack
+stringify = interpreter.stringify
+isEqual = interpreter.isEqual
+maxCallDepth = 10000
+
+# Python frames used by one Lox call: call(), the generated function, and a block function or two.
+FRAMES_PER_CALL = 4
+
+# Returned by a block function that finished without running a Lox return statement.
+NORETURN = object()
+
+class Site:
+    """A call site. Like the Call expressions on the Interpreter's call stack, it has the closing paren."""
+    __slots__ = ("paren",)
+
+    def __init__(self, paren: Token):
+        self.paren = paren
+
+def token(lexeme: str, line: int) -> Token:
+    return Token(TokenType.IDENTIFIER, lexeme, None, line)
+
+def site(line: int) -> Site:
+    return Site(Token(TokenType.RIGHT_PAREN, ")", None, line))
+
+def defineNatives(moduleGlobals: dict):
+    for name, value in interpreter.natives.items():
+        moduleGlobals["g_" + name] = value
+
+class Function(LoxCallable):
+    """A Lox function or bound method, wrapping the Python function generated for it."""
+    __slots__ = ("name", "function", "parameters")
+
+    def __init__(self, name: str, function, parameters: int):
+        self.name = name
+        self.function = function
+        self.parameters = parameters
+
+    def arity(self) -> int:
+        return self.parameters
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.function(*arguments)
+
+    def __str__(self):
+        return f"<fn {self.name}>"
+
+class Instance:
+    """Base class of the Python classes generated for Lox classes. Methods are stored as m_<name>."""
+    __slots__ = ("fields",)
+    loxClass = None
+
+    def __init__(self):
+        self.fields = {}
+
+    def __str__(self):
+        return f"{self.loxClass.name} instance"
+
+def methodArity(method) -> int:
+    return method.__code__.co_argcount - 1
+
+class Class(LoxCallable):
+    def __init__(self, name: str, pythonClass: type, superclass):
+        self.name = name
+        self.pythonClass = pythonClass
+        self.superclass = superclass
+        pythonClass.loxClass = self
+
+    def arity(self) -> int:
+        initializer = getattr(self.pythonClass, "m_init", None)
+        return 0 if initializer is None else methodArity(initializer)
+
+    def call(self, interpreter, arguments: list) -> object:
+        instance = self.pythonClass()
+        initializer = getattr(self.pythonClass, "m_init", None)
+        if initializer is not None:
+            initializer(instance, *arguments)
+        return instance
+
+    def __str__(self):
+        return self.name
+
+def superclass(value, name: Token) -> Class:
+    if not isinstance(value, Class):
+        raise LoxRuntimeError(name, "Superclass must be a class.")
+    return value
+
+# Operators. The fast path of each is inlined in the generated code when both operands are simple.
+
+def truthy(value) -> bool:
+    return value is not None and value is not False
+
+def checkNumberOperands(operator: Token, left, right):
+    if not isinstance(left, (int, float)) or not isinstance(right, (int, float)):
+        raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+def add(left, right, operator: Token):
+    if type(left) is float and type(right) is float:
+        return left + right
+    if isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+        return concatenate(left, right)
+    raise LoxRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+def subtract(left, right, operator: Token) -> float:
+    checkNumberOperands(operator, left, right)
+    return float(left) - float(right)
+
+def multiply(left, right, operator: Token) -> float:
+    checkNumberOperands(operator, left, right)
+    return float(left) * float(right)
+
+def divide(left, right, operator: Token) -> float:
+    checkNumberOperands(operator, left, right)
+    if right == 0:
+        return float('nan')
+    return float(left) / float(right)
+
+def greater(left, right, operator: Token) -> bool:
+    checkNumberOperands(operator, left, right)
+    return float(left) > float(right)
+
+def greaterEqual(left, right, operator: Token) -> bool:
+    checkNumberOperands(operator, left, right)
+    return float(left) >= float(right)
+
+def less(left, right, operator: Token) -> bool:
+    checkNumberOperands(operator, left, right)
+    return float(left) < float(right)
+
+def lessEqual(left, right, operator: Token) -> bool:
+    checkNumberOperands(operator, left, right)
+    return float(left) <= float(right)
+
+def negate(right, operator: Token) -> float:
+    if not isinstance(right, (int, float)):
+        raise LoxRuntimeError(operator, "Operand must be a number.")
+    return -float(right)
+
+# Variables.
+
+def undefinedVariable(name: Token):
+    raise TokenError(name, "Undefined variable '" + name.lexeme + "'.")
+
+def assignGlobal(moduleGlobals: dict, key: str, value, name: Token):
+    if key not in moduleGlobals:
+        undefinedVariable(name)
+    moduleGlobals[key] = value
+    return value
+
+# Calls and properties.
+
+def call(callee, site: Site, *arguments):
+    isFunction = type(callee) is Function
+    if not isFunction and not isinstance(callee, LoxCallable):
+        raise LoxRuntimeError(site.paren, "Can only call functions and classes.")
+    arity = callee.parameters if isFunction else callee.arity()
+    if len(arguments) != arity:
+        raise LoxRuntimeError(site.paren, f"Expected {arity} arguments but got {len(arguments)}.")
+    if len(callStack) >= maxCallDepth:
+        raise LoxRuntimeError(site.paren, "Stack overflow.")
+    callStack.append(site)
+    try:
+        if isFunction:
+            return callee.function(*arguments)
+        return callee.call(interpreter, list(arguments))
+    except RecursionError:
+        raise LoxRuntimeError(site.paren, "Stack overflow.")
+    finally:
+        callStack.pop()
+
+def lookUp(obj, name: str, token: Token):
+    """The property a method call will call: a field's value, a native method, or the Python function of a method."""
+    if isinstance(obj, Instance):
+        fields = obj.fields
+        if name in fields:
+            return fields[name]
+        method = getattr(type(obj), "m_" + name, None)
+        if method is None:
+            raise LoxRuntimeError(token, f"Undefined property '{name}'.")
+        return method
+    if isinstance(obj, NativeInstance):
+        return obj.get(token)
+    raise LoxRuntimeError(token, "Only instances have properties.")
+
+def invoke(found, obj, site: Site, *arguments):
+    """Calls what lookUp found. Methods are called on obj directly, without binding them first."""
+    if type(found) is not FunctionType:
+        return call(found, site, *arguments)
+    if len(arguments) != methodArity(found):
+        raise LoxRuntimeError(site.paren, f"Expected {methodArity(found)} arguments but got {len(arguments)}.")
+    if len(callStack) >= maxCallDepth:
+        raise LoxRuntimeError(site.paren, "Stack overflow.")
+    callStack.append(site)
+    try:
+        return found(obj, *arguments)
+    except RecursionError:
+        raise LoxRuntimeError(site.paren, "Stack overflow.")
+    finally:
+        callStack.pop()
+
+def getProperty(obj, name: str, token: Token):
+    found = lookUp(obj, name, token)
+    if type(found) is FunctionType:
+        return Function(name, found.__get__(obj), methodArity(found))
+    return found
+
+def checkInstance(obj, token: Token) -> Instance:
+    if not isinstance(obj, Instance):
+        raise LoxRuntimeError(token, "Only instances have fields.")
+    return obj
+
+def setProperty(obj: Instance, name: str, value):
+    obj.fields[name] = value
+    return value
+
+def superMethod(klass: Class, this: Instance, name: str, token: Token) -> Function:
+    method = getattr(klass.pythonClass, "m_" + name, None)
+    if method is None:
+        raise LoxRuntimeError(token, f"Undefined property '{name}'.")
+    return Function(name, method.__get__(this), methodArity(method))
+
+# Running a generated module.
+
+def sourceLine(error: NameError, main) -> int:
+    """The Lox line of the statement a NameError came from, read from the generated line's comment."""
+    line = 0
+    traceback = error.__traceback__
+    while traceback is not None:
+        code = traceback.tb_frame.f_code
+        if code.co_filename == main.__code__.co_filename:
+            match = re.search(r"# line (\d+)$", linecache.getline(code.co_filename, traceback.tb_lineno))
+            if match:
+                line = int(match.group(1))
+        traceback = traceback.tb_next
+    return line
+
+def run(main, maxDepth: int = 10000):
+    """Runs main on a thread with a large stack, reporting Lox errors as Lox.py does."""
+    global maxCallDepth
+    maxCallDepth = maxDepth
+    errors = []
+
+    def target():
+        try:
+            main()
+        except NameError as e:
+            # Globals are g_<name>; one read before its declaration ran is an undefined variable.
+            name = e.name[2:] if e.name else "?"
+            errors.append(TokenError(token(name, sourceLine(e, main)), f"Undefined variable '{name}'."))
+        except Exception as e:
+            errors.append(e)
+
+    runOnProgramThread(target, maxDepth * FRAMES_PER_CALL)
+    sys.stdout.flush()
+    if errors:
+        print(errors[0], file=sys.stderr)
+        exit(65)
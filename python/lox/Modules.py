@@ -0,0 +1,110 @@
+# Modules.py
+# This finds the files named by import statements and keeps their parsed statements.
+# The cache is shared by every interpreter in the process and checks each file's modification time,
+# then its hash, so a module is only parsed again when its contents change.
+# Interpreters leave per-run state on the nodes they run (JIT counters and traces, coverage slots,
+# property caches), so the cache keeps each module in the binary AST format and gives every interpreter
+# its own resolved copy, the same one each time that interpreter asks.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import hashlib, os, weakref
+from typing import List
+from Token import Token
+from Scanner import Scanner
+from Parser import Parser
+from LoxErrors import LoxRuntimeError, ModuleError
+import Stmt as S
+
+MODULE_EXTENSION = ".lox"
+
+def findModule(path: Token, directory: str, importPath: List[str]) -> str:
+    """The real path of the module path names, looked for in directory and then on the import path."""
+    name = path.literal
+    names = [name] if name.endswith(MODULE_EXTENSION) else [name, name + MODULE_EXTENSION]
+    directories = [""] if os.path.isabs(name) else [directory, *importPath]
+    for candidate in (os.path.join(d, n) for d in directories for n in names):
+        if os.path.isfile(candidate):
+            return os.path.realpath(candidate)
+    raise LoxRuntimeError(path, f"Cannot find module {path.lexeme}.")
+
+class CachedModule:
+    __slots__ = ("mtime", "size", "digest", "data", "loaded")
+
+    def __init__(self, mtime: int, size: int, digest: bytes, data: bytes):
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+        # The parsed module in the binary AST format, and the statements loaded from it for each interpreter.
+        self.data = data
+        self.loaded = weakref.WeakKeyDictionary()
+
+class ModuleCache:
+    def __init__(self):
+        self.modules = {}
+        # Counts of modules compiled and of loads served from the cache.
+        self.compiled = 0
+        self.hits = 0
+
+    def load(self, path: str, interpreter, pathToken: Token) -> List[S.Stmt]:
+        """The statements of the module at path resolved for interpreter, compiling it if it is new or has changed."""
+        from Resolver import Resolver
+        from AstFormat import load
+        cached = self.current(path, pathToken)
+        statements = cached.loaded.get(interpreter)
+        if statements is None:
+            statements = load(cached.data)
+            Resolver(interpreter).resolve(statements)
+            cached.loaded[interpreter] = statements
+        return statements
+
+    def current(self, path: str, pathToken: Token) -> CachedModule:
+        stat = os.stat(path)
+        cached = self.modules.get(path)
+        if cached is not None and (cached.mtime, cached.size) == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            return cached
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).digest()
+        if cached is not None and cached.digest == digest:
+            # Touched but not changed.
+            cached.mtime, cached.size = stat.st_mtime_ns, stat.st_size
+            self.hits += 1
+            return cached
+        cached = self.modules[path] = CachedModule(stat.st_mtime_ns, stat.st_size, digest, self.compile(data, pathToken))
+        self.compiled += 1
+        return cached
+
+    def compile(self, data: bytes, pathToken: Token) -> bytes:
+        """The module in data in the binary AST format, raising a ModuleError if it has syntax errors."""
+        from AstFormat import MAGIC, dump
+        if data.startswith(MAGIC):
+            return data
+        parser = Parser(Scanner(data.decode("utf-8")).scanTokens())
+        statements = parser.parse()
+        if parser.errors:
+            raise ModuleError(pathToken, f"Could not compile module {pathToken.lexeme}.", parser.errors)
+        return dump(statements)
+
+    def clear(self):
+        self.modules.clear()
+
+moduleCache = ModuleCache()
+
+def inlineImports(statements: List[S.Stmt], directory: str, importPath: List[str], interpreter, imported: set = None) -> List[S.Stmt]:
+    """Replaces each import with the statements of its module, the first time that module is imported,
+    for consumers such as the Transpiler that need the whole program at once."""
+    imported = set() if imported is None else imported
+    program = []
+    for statement in statements:
+        if not isinstance(statement, S.Import):
+            program.append(statement)
+            continue
+        path = findModule(statement.path, directory, importPath)
+        if path in imported:
+            continue
+        imported.add(path)
+        module = moduleCache.load(path, interpreter, statement.path)
+        program += inlineImports(module, os.path.dirname(path), importPath, interpreter, imported)
+    return program
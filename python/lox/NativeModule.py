@@ -0,0 +1,92 @@
+# NativeModule.py
+# This is the support code for native modules: groups of globals implemented in Python.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from LoxCallable import LoxCallable
+from LoxErrors import LoxRuntimeError
+from Token import Token
+
+def nativeError(interpreter, message: str):
+    """Raises a runtime error at the call site of the native being run."""
+    raise LoxRuntimeError(interpreter.callStack[-1].paren, message)
+
+def checkNumber(interpreter, value, what: str) -> float:
+    if not isinstance(value, float):
+        nativeError(interpreter, f"{what} must be a number.")
+    return value
+
+def checkIndex(interpreter, value, length: int) -> int:
+    if not isinstance(value, float) or not value.is_integer():
+        nativeError(interpreter, "Index must be an integer.")
+    if value < 0 or value >= length:
+        nativeError(interpreter, "Index out of range.")
+    return int(value)
+
+def nativeMethod(name: str, arity: int):
+    """Marks a method of a NativeInstance subclass as the Lox method name."""
+    def decorate(function):
+        function.loxName = name
+        function.arity = arity
+        return function
+    return decorate
+
+class NativeMethod(LoxCallable):
+    """A native method bound to its instance. Unlike LoxFunction.bind, no Environment is created."""
+    def __init__(self, instance, function):
+        self.instance = instance
+        self.function = function
+
+    def arity(self) -> int:
+        return self.function.arity
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.function(self.instance, interpreter, *arguments)
+
+    def __str__(self):
+        return "<native fn>"
+
+class NativeInstance:
+    """Base class for values whose methods are written in Python."""
+    __slots__ = ()
+    className = "Native"
+    methods = {}
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        cls.methods = dict(cls.methods)
+        for attribute in vars(cls).values():
+            if hasattr(attribute, "loxName"):
+                cls.methods[attribute.loxName] = attribute
+
+    def get(self, name: Token) -> object:
+        function = self.methods.get(name.lexeme)
+        if function is None:
+            raise LoxRuntimeError(name, f"Undefined property '{name.lexeme}'.")
+        return NativeMethod(self, function)
+
+    def __str__(self):
+        return f"{self.className} instance"
+
+class NativeClass(LoxCallable):
+    """A callable global that constructs native instances."""
+    def __init__(self, name: str, arity: int, construct):
+        self.name = name
+        self.constructArity = arity
+        self.construct = construct
+
+    def arity(self) -> int:
+        return self.constructArity
+
+    def call(self, interpreter, arguments: list) -> object:
+        return self.construct(interpreter, *arguments)
+
+    def __str__(self):
+        return self.name
+
+class NativeModule:
+    """A named group of globals. Interpreter.loadModule defines each member in its globals."""
+    name = ""
+
+    def members(self) -> dict:
+        return {}
@@ -1,18 +1,27 @@
 # Parser.py
 # Written by: Joel Peckham.
-# Last Modified: 2022-03-17.
+# Last Modified: 2026-10-19.
 
 from Token import TokenType, Token
-from LoxErrors import TokenError
+from LoxErrors import TokenError, ParseErrors
 from typing import List
+from enum import IntEnum
+from collections import namedtuple
 import Expr
 import Stmt
-import sys
+
+# Error recovery skips to just after a semicolon, or to the first token that can only start a declaration
+# or statement.
+SYNC_AFTER = frozenset([TokenType.SEMICOLON])
+SYNC_BEFORE = frozenset([TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.IMPORT, TokenType.FOR,
+                         TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN])
 
 class Parser:
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
         self.current = 0
+        # Every syntax error found, in order. Declarations with one are left out of the program.
+        self.errors: List[TokenError] = []
     
     def peek(self):
         return self.tokens[self.current]
@@ -44,23 +53,35 @@ class Parser:
                 return True
         return False
     
-    def synchronize(self):
-        self.advance()
-        while not self.isAtEnd():
-
-            returnIfPrevious = [TokenType.SEMICOLON]
-            returnIfNext = [TokenType.CLASS, TokenType.FUN, TokenType.VAR, TokenType.FOR, TokenType.IF, TokenType.WHILE, TokenType.PRINT, TokenType.RETURN]
+    def error(self, token: Token, message: str):
+        """Records an error that the parser can carry on from without synchronizing."""
+        self.errors.append(TokenError(token, message))
 
-            if self.previous().type in returnIfPrevious:
-                return
-            if self.peek().type in returnIfNext:
-                return
-            self.advance()
+    def synchronize(self):
+        tokens = self.tokens
+        last = len(tokens) - 1
+        # Skip the token the error was at, unless it is the end of the file.
+        current = min(self.current + 1, last)
+        while current < last:
+            if tokens[current - 1].type in SYNC_AFTER or tokens[current].type in SYNC_BEFORE:
+                break
+            current += 1
+        self.current = current
 
-    def parse(self):
+    def parse(self) -> List[Stmt.Stmt]:
+        """Parses every declaration, leaving out those with syntax errors, which go to self.errors."""
         statements = []
         while not self.isAtEnd():
-            statements.append(self.declaration())
+            statement = self.declaration()
+            if statement is not None:
+                statements.append(statement)
+        return statements
+
+    def parseOrRaise(self) -> List[Stmt.Stmt]:
+        """Like parse, but raises the syntax errors instead of returning a partial program."""
+        statements = self.parse()
+        if self.errors:
+            raise ParseErrors(self.errors)
         return statements
 
     def expression(self) -> Expr.Expr:
@@ -74,9 +95,11 @@ class Parser:
                 return self.function("function")
             if self.match([TokenType.VAR]):
                 return self.varDeclaration()
+            if self.match([TokenType.IMPORT]):
+                return self.importDeclaration()
             return self.statement()
         except TokenError as e:
-            print(e, file=sys.stderr)
+            self.errors.append(e)
             self.synchronize()
             return None
     
@@ -166,6 +189,12 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expect ';' after variable declaration.")
         return Stmt.Var(name, initializer)
     
+    def importDeclaration(self) -> Stmt.Stmt:
+        keyword = self.previous()
+        path = self.consume(TokenType.STRING, "Expect module path after 'import'.")
+        self.consume(TokenType.SEMICOLON, "Expect ';' after module path.")
+        return Stmt.Import(keyword, path)
+
     def whileStatement(self) -> Stmt.Stmt:
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.expression()
@@ -185,8 +214,8 @@ class Parser:
         if not self.check(TokenType.RIGHT_PAREN):
             do = True
             while do:
-                if len(parameters) >= 255:
-                    raise TokenError(self.peek(), "Cannot have more than 255 parameters.")
+                if len(parameters) == 255:
+                    self.error(self.peek(), "Cannot have more than 255 parameters.")
                 parameters.append(self.consume(TokenType.IDENTIFIER, "Expect parameter name."))
                 if not self.match([TokenType.COMMA]):
                     do = False
@@ -198,12 +227,14 @@ class Parser:
     def block(self) -> List[Stmt.Stmt]:
         statements = []
         while not self.check(TokenType.RIGHT_BRACE) and not self.isAtEnd():
-            statements.append(self.declaration())
+            statement = self.declaration()
+            if statement is not None:
+                statements.append(statement)
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statements
     
     def assignment(self) -> Expr.Expr:
-        expr = self.or_()
+        expr = self.parsePrecedence(Precedence.OR)
         if self.match([TokenType.EQUAL]):
             equals = self.previous()
             value = self.assignment()
@@ -213,110 +244,128 @@ class Parser:
             elif isinstance(expr, Expr.Get):
                 return Expr.Set(expr.object, expr.name, value)
 
-            raise TokenError(equals, "Invalid assignment target.")
+            self.error(equals, "Invalid assignment target.")
         return expr
 
-    def or_(self) -> Expr.Expr:
-        expr = self.and_()
-        while self.match([TokenType.OR]):
-            operator = self.previous()
-            right = self.and_()
-            expr = Expr.Logical(expr, operator, right)
-        return expr
-    
-    def and_(self) -> Expr.Expr:
-        expr = self.equality()
-        while self.match([TokenType.AND]):
-            operator = self.previous()
-            right = self.equality()
-            expr = Expr.Logical(expr, operator, right)
-        return expr
-    
-    def equality(self) -> Expr.Expr:
-        expr = self.comparison()
-        while self.match([TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL]):
-            operator = self.previous()
-            right = self.comparison()
-            expr = Expr.Binary(expr, operator, right)
-        return expr
-    
-    def comparison(self) -> Expr.Expr:
-        expr = self.term()
-        while self.match([TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL]):
-            operator = self.previous()
-            right = self.term()
-            expr = Expr.Binary(expr, operator, right)
-        return expr
-    
-    def term(self) -> Expr.Expr:
-        expr = self.factor()
-        while self.match([TokenType.MINUS, TokenType.PLUS]):
-            operator = self.previous()
-            right = self.factor()
-            expr = Expr.Binary(expr, operator, right)
-        return expr
-    
-    def factor(self) -> Expr.Expr:
-        expr = self.unary()
-        while self.match([TokenType.SLASH, TokenType.STAR]):
-            operator = self.previous()
-            right = self.unary()
-            expr = Expr.Binary(expr, operator, right)
-        return expr
-    
-    def unary(self) -> Expr.Expr:
-        if self.match([TokenType.BANG, TokenType.MINUS]):
-            operator = self.previous()
-            right = self.unary()
-            return Expr.Unary(operator, right)
-        return self.call()
-    
-    def call(self) -> Expr.Expr:
-        expr = self.primary()
+    def parsePrecedence(self, precedence: int) -> Expr.Expr:
+        # Pratt parser: the prefix rule for the current token parses the left operand,
+        # then infix rules keep extending it while they bind at least as tightly as precedence.
+        rule = rules.get(self.peek().type)
+        if rule is None or rule.prefix is None:
+            raise TokenError(self.peek(), "Expect expression.")
+        self.advance()
+        expr = rule.prefix(self)
         while True:
-            if self.match([TokenType.LEFT_PAREN]):
-                expr = self.finishCall(expr)
-            elif self.match([TokenType.DOT]):
-                name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
-                expr = Expr.Get(expr, name)
-            else:
-                break
-        return expr
+            rule = rules.get(self.peek().type)
+            if rule is None or rule.precedence < precedence:
+                return expr
+            self.advance()
+            expr = rule.infix(self, expr)
+
+    def binary(self, left: Expr.Expr) -> Expr.Expr:
+        operator = self.previous()
+        right = self.parsePrecedence(rules[operator.type].precedence + 1)
+        return Expr.Binary(left, operator, right)
+
+    def logical(self, left: Expr.Expr) -> Expr.Expr:
+        operator = self.previous()
+        right = self.parsePrecedence(rules[operator.type].precedence + 1)
+        return Expr.Logical(left, operator, right)
+
+    def unary(self) -> Expr.Expr:
+        operator = self.previous()
+        right = self.parsePrecedence(Precedence.UNARY)
+        return Expr.Unary(operator, right)
+
+    def call(self, callee: Expr.Expr) -> Expr.Expr:
+        return self.finishCall(callee)
+
+    def dot(self, obj: Expr.Expr) -> Expr.Expr:
+        name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Expr.Get(obj, name)
     
     def finishCall(self, callee: Expr.Expr) -> Expr.Expr:
         arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
             do = True
             while do:
-                if len(arguments) >= 255:
-                    raise TokenError(self.peek(), "Cannot have more than 255 arguments.")
+                if len(arguments) == 255:
+                    self.error(self.peek(), "Cannot have more than 255 arguments.")
                 arguments.append(self.expression())
                 if not self.match([TokenType.COMMA]):
                     do = False
         paren = self.consume(TokenType.RIGHT_PAREN, "Expect ')' after arguments.")
         return Expr.Call(callee, paren, arguments)
 
-    def primary(self) -> Expr.Expr:
-        if self.match([TokenType.FALSE]):
-            return Expr.Literal(False)
-        if self.match([TokenType.TRUE]):
-            return Expr.Literal(True)
-        if self.match([TokenType.NIL]):
-            return Expr.Literal(None)
-        if self.match([TokenType.NUMBER, TokenType.STRING]):
-            return Expr.Literal(self.previous().literal)
-        if self.match([TokenType.SUPER]):
-            keyword = self.previous()
-            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
-            return Expr.Super(keyword, method)
-        if self.match([TokenType.THIS]):
-            return Expr.This(self.previous())
-        if self.match([TokenType.IDENTIFIER]):
-            return Expr.Variable(self.previous())
-        if self.match([TokenType.LEFT_PAREN]):
-            expr = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Expr.Grouping(expr)
-        raise TokenError(self.peek(), "Expect expression.")
-    
+    def literal(self) -> Expr.Expr:
+        token = self.previous()
+        if token.type == TokenType.FALSE:
+            expr = Expr.Literal(False)
+        elif token.type == TokenType.TRUE:
+            expr = Expr.Literal(True)
+        elif token.type == TokenType.NIL:
+            expr = Expr.Literal(None)
+        else:
+            expr = Expr.Literal(token.literal)
+        # Kept so tools can place statements made only of literals.
+        expr.token = token
+        return expr
+
+    def super_(self) -> Expr.Expr:
+        keyword = self.previous()
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Expr.Super(keyword, method)
+
+    def this(self) -> Expr.Expr:
+        return Expr.This(self.previous())
+
+    def variable(self) -> Expr.Expr:
+        return Expr.Variable(self.previous())
+
+    def grouping(self) -> Expr.Expr:
+        expr = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Expr.Grouping(expr)
+
+# Binding powers, lowest to highest. Mirrors the Precedence enum in clox's compiler.c.
+class Precedence(IntEnum):
+    NONE = 0
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+    CALL = 9
+    PRIMARY = 10
+
+ParseRule = namedtuple("ParseRule", ["prefix", "infix", "precedence"])
+
+rules = {
+    TokenType.LEFT_PAREN:    ParseRule(Parser.grouping, Parser.call,    Precedence.CALL),
+    TokenType.DOT:           ParseRule(None,            Parser.dot,     Precedence.CALL),
+    TokenType.MINUS:         ParseRule(Parser.unary,    Parser.binary,  Precedence.TERM),
+    TokenType.PLUS:          ParseRule(None,            Parser.binary,  Precedence.TERM),
+    TokenType.SLASH:         ParseRule(None,            Parser.binary,  Precedence.FACTOR),
+    TokenType.STAR:          ParseRule(None,            Parser.binary,  Precedence.FACTOR),
+    TokenType.BANG:          ParseRule(Parser.unary,    None,           Precedence.NONE),
+    TokenType.BANG_EQUAL:    ParseRule(None,            Parser.binary,  Precedence.EQUALITY),
+    TokenType.EQUAL_EQUAL:   ParseRule(None,            Parser.binary,  Precedence.EQUALITY),
+    TokenType.GREATER:       ParseRule(None,            Parser.binary,  Precedence.COMPARISON),
+    TokenType.GREATER_EQUAL: ParseRule(None,            Parser.binary,  Precedence.COMPARISON),
+    TokenType.LESS:          ParseRule(None,            Parser.binary,  Precedence.COMPARISON),
+    TokenType.LESS_EQUAL:    ParseRule(None,            Parser.binary,  Precedence.COMPARISON),
+    TokenType.IDENTIFIER:    ParseRule(Parser.variable, None,           Precedence.NONE),
+    TokenType.STRING:        ParseRule(Parser.literal,  None,           Precedence.NONE),
+    TokenType.NUMBER:        ParseRule(Parser.literal,  None,           Precedence.NONE),
+    TokenType.AND:           ParseRule(None,            Parser.logical, Precedence.AND),
+    TokenType.OR:            ParseRule(None,            Parser.logical, Precedence.OR),
+    TokenType.FALSE:         ParseRule(Parser.literal,  None,           Precedence.NONE),
+    TokenType.NIL:           ParseRule(Parser.literal,  None,           Precedence.NONE),
+    TokenType.TRUE:          ParseRule(Parser.literal,  None,           Precedence.NONE),
+    TokenType.SUPER:         ParseRule(Parser.super_,   None,           Precedence.NONE),
+    TokenType.THIS:          ParseRule(Parser.this,     None,           Precedence.NONE),
+}
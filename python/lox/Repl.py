@@ -0,0 +1,23 @@
+# Repl.py
+# This is the session behind the REPL. Each input is scanned, parsed, resolved and run on its own
+# against the globals left by the inputs before it. Nothing but the functions and classes an input
+# defines keeps its syntax tree, so a long session that keeps redefining them stays bounded in memory.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+
+class ReplSession:
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+
+    def run(self, source: str):
+        """Runs one input. Syntax, resolution and runtime errors are raised for the caller to report."""
+        statements = Parser(Scanner(source).scanTokens()).parseOrRaise()
+        # Globals are late bound, so only the new input is resolved. A fresh resolver is made for each,
+        # so one left part way through an input with an error is never reused.
+        Resolver(self.interpreter).resolve(statements)
+        self.interpreter.interpret(statements)
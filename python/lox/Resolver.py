@@ -1,7 +1,7 @@
 # Resolver.py
 # This class is a concrete visitor that resolves the AST.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
 import Expr as E
 import Stmt as S
@@ -31,6 +31,8 @@ class Resolver(E.ExprVisitor, S.StmtVisitor):
         self.scopes: Deque[Dict[str, bool]] = deque()
         self.currentFunction = FunctionType.NONE
         self.currentClass = ClassType.NONE
+        # Blocks and functions whose scopes are open, innermost last.
+        self.frames: List[S.Stmt] = []
     
     def resolve(self, statements):
         if not isinstance(statements, List):
@@ -66,9 +68,12 @@ class Resolver(E.ExprVisitor, S.StmtVisitor):
             i -= 1
 
     def visitBlockStmt(self, block: S.Block):
+        block.captured = False
+        self.frames.append(block)
         self.beginScope()
         self.resolve(block.statements)
         self.endScope()
+        self.frames.pop()
     
     def visitClassStmt(self, classStmt: S.Class):
         enclosingClass: ClassType = self.currentClass
@@ -118,6 +123,11 @@ class Resolver(E.ExprVisitor, S.StmtVisitor):
         if stmt.elseBranch:
             self.resolve(stmt.elseBranch)
     
+    def visitImportStmt(self, stmt: S.Import):
+        # A module's declarations become globals, so it can only be imported by top-level code.
+        if len(self.scopes) != 0:
+            raise LoxRuntimeError(stmt.keyword, "Can only import at the top level.")
+
     def visitPrintStmt(self, stmt: S.Print):
         self.resolve(stmt.expression)
     
@@ -192,6 +202,14 @@ class Resolver(E.ExprVisitor, S.StmtVisitor):
     def resolveFunction(self, function: S.Function, funcType: FunctionType):
         enclosingFunction: FunctionType = self.currentFunction
         self.currentFunction = funcType
+
+        # The new closure holds on to every enclosing frame, so none of them can be recycled.
+        for frame in reversed(self.frames):
+            if frame.captured:
+                break
+            frame.captured = True
+        function.captured = False
+        self.frames.append(function)
         
         self.beginScope()
         for param in function.params:
@@ -200,6 +218,7 @@ class Resolver(E.ExprVisitor, S.StmtVisitor):
         
         self.resolve(function.body)
         self.endScope()
+        self.frames.pop()
         
         self.currentFunction = enclosingFunction
     
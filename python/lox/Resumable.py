@@ -0,0 +1,186 @@
+# Resumable.py
+# This lets a Lox program be suspended part way through and resumed later.
+# The tree walker keeps its state on the Python stack, so each program runs on its own thread,
+# and control is handed back and forth so that only one side ever runs at a time.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import sys, threading
+from enum import Enum, auto
+from typing import List
+import Stmt as S
+from Interpreter import Interpreter
+from LoxCallable import LoxCallable
+from StringTable import strings
+
+# Threads running programs get a large stack so deep Lox recursion still fits.
+PROGRAM_STACK_SIZE = 64 * 1024 * 1024
+MAX_PROGRAM_STACK_SIZE = 512 * 1024 * 1024
+# Stack allowed for each Python frame of recursion, which covers C code such as pickle that
+# recurses on the C stack too. The recursion limit is never raised past what the stack holds.
+STACK_BYTES_PER_FRAME = 512
+
+def runOnProgramThread(function, frames: int):
+    """Runs function on a thread whose stack holds frames Python frames, with the recursion limit
+    raised to match only until it returns. Returns what function returns, or raises what it raises."""
+    stackSize = min(MAX_PROGRAM_STACK_SIZE, max(PROGRAM_STACK_SIZE, frames * STACK_BYTES_PER_FRAME))
+    limit = sys.getrecursionlimit()
+    outcome = []
+
+    def target():
+        try:
+            outcome.append((True, function()))
+        except BaseException as e:
+            # Including SystemExit, which would otherwise only end this thread.
+            outcome.append((False, e))
+
+    sys.setrecursionlimit(max(limit, min(frames, stackSize // STACK_BYTES_PER_FRAME)))
+    try:
+        previous = threading.stack_size(stackSize)
+        try:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+        finally:
+            threading.stack_size(previous)
+        thread.join()
+    finally:
+        sys.setrecursionlimit(limit)
+    succeeded, value = outcome[0]
+    if not succeeded:
+        raise value
+    return value
+
+class Suspend(Enum):
+    """Why a program handed control back."""
+    BUDGET = auto()
+    INPUT = auto()
+    DONE = auto()
+    ERROR = auto()
+
+class ProgramAborted(Exception):
+    """Raised inside a suspended program to unwind it when it is aborted."""
+    pass
+
+# Passed to resume() to abort the program instead of continuing it.
+ABORT = object()
+
+class ProgramThread:
+    """Runs target on a thread that only runs between a resume() and the next suspend()."""
+    def __init__(self, target):
+        self.target = target
+        self.toProgram = threading.Semaphore(0)
+        self.toController = threading.Semaphore(0)
+        self.thread = None
+        self.request = None
+        self.value = None
+        self.reply = None
+        self.finished = False
+
+    def resume(self, reply=None) -> Suspend:
+        """Runs the program until it suspends again. Returns why it stopped; details are in self.value."""
+        if self.finished:
+            return self.request
+        self.reply = reply
+        if self.thread is None:
+            previous = threading.stack_size(PROGRAM_STACK_SIZE)
+            try:
+                self.thread = threading.Thread(target=self.main, daemon=True)
+                self.thread.start()
+            finally:
+                threading.stack_size(previous)
+        else:
+            self.toProgram.release()
+        self.toController.acquire()
+        return self.request
+
+    def suspend(self, request: Suspend, value=None):
+        """Called on the program thread. Returns the reply passed to the next resume()."""
+        self.request = request
+        self.value = value
+        self.toController.release()
+        self.toProgram.acquire()
+        if self.reply is ABORT:
+            raise ProgramAborted()
+        return self.reply
+
+    def abort(self):
+        """Unwinds a suspended program. A program that has not started is never run."""
+        if self.thread is None:
+            self.finished = True
+            self.request = Suspend.ERROR
+            self.value = ProgramAborted()
+        elif not self.finished:
+            self.resume(ABORT)
+
+    def main(self):
+        try:
+            self.value = self.target()
+            self.request = Suspend.DONE
+        except BaseException as e:
+            self.request, self.value = Suspend.ERROR, e
+        self.finished = True
+        self.toController.release()
+
+class SuspendingInputCallable(LoxCallable):
+    """input() that hands control back until the controller supplies a line, or None at end of input."""
+    def arity(self) -> int:
+        return 0
+    def call(self, interpreter, arguments):
+        line = interpreter.program.suspend(Suspend.INPUT)
+        if line is None:
+            return None
+        return strings.intern(line)
+    def __str__(self):
+        return "<native fn>"
+
+class SlicedInterpreter(Interpreter):
+    """An Interpreter that counts the statements it executes and suspends after every sliceSize of them.
+    Loops are counted per iteration, so even a loop with an expression body gives up control."""
+    def __init__(self, maxCallDepth: int = 10000, tailCalls: bool = False, sliceSize: int = 1000, output=None):
+        super().__init__(maxCallDepth, tailCalls)
+        self.sliceSize = sliceSize
+        self.executed = 0
+        self.sliceEnd = sliceSize
+        self.output = output if output is not None else sys.stdout
+        self.program = None
+        self.defineNative("input", SuspendingInputCallable())
+
+    def run(self, statements: List[S.Stmt]) -> ProgramThread:
+        """Returns a suspended program that will interpret statements once resumed."""
+        self.program = ProgramThread(lambda: self.interpret(statements))
+        return self.program
+
+    def endSlice(self):
+        # Set before suspending so the controller can move the end of the next slice.
+        self.sliceEnd = self.executed + self.sliceSize
+        self.program.suspend(Suspend.BUDGET)
+
+    def interpret(self, statements: List[S.Stmt]):
+        for statement in statements:
+            self.executed += 1
+            if self.executed >= self.sliceEnd:
+                self.endSlice()
+            statement.accept(self)
+
+    def executeBlock(self, statements: List[S.Stmt], environment):
+        previous = self.environment
+        try:
+            self.environment = environment
+            for statement in statements:
+                self.executed += 1
+                if self.executed >= self.sliceEnd:
+                    self.endSlice()
+                statement.accept(self)
+        finally:
+            self.environment = previous
+
+    def visitWhileStmt(self, stmt: S.While):
+        while self.isTruthy(stmt.condition.accept(self)):
+            self.executed += 1
+            if self.executed >= self.sliceEnd:
+                self.endSlice()
+            stmt.body.accept(self)
+
+    def visitPrintStmt(self, stmt: S.Print):
+        value = stmt.expression.accept(self)
+        self.output.write(self.stringify(value) + "\n")
@@ -1,8 +1,14 @@
 # Return.py
 # This class represents return values from lox functions.
 # Written by Joel Peckham.
-# Last Modified: 2020-03-18.
+# Last Modified: 2026-10-19.
 
 class Return(Exception):
     def __init__(self, value: object):
-        self.value = value
\ No newline at end of file
+        self.value = value
+
+class TailCall(Exception):
+    """Raised by `return f(...)` in tail-call mode so the caller's frame is reused."""
+    def __init__(self, function, arguments: list):
+        self.function = function
+        self.arguments = arguments
@@ -0,0 +1,51 @@
+# Rope.py
+# This is a lazily concatenated string value, so building a string in a loop takes linear time.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from StringTable import strings
+
+# Concatenations shorter than this produce a plain str.
+MIN_ROPE_LENGTH = 256
+
+class Rope:
+    """A string made of pieces appended to a shared buffer. A rope sees only the first
+    count pieces, so extending the newest rope never changes the shorter ropes before it."""
+    __slots__ = ("pieces", "count", "flat")
+
+    def __init__(self, pieces: list, count: int):
+        self.pieces = pieces
+        self.count = count
+        self.flat = None
+
+    def concat(self, other: str) -> "Rope":
+        pieces = self.pieces
+        if len(pieces) != self.count:
+            pieces = pieces[:self.count]
+        pieces.append(other)
+        return Rope(pieces, self.count + 1)
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            self.flat = "".join(self.pieces[:self.count])
+            # Further concatenations start from the flat string rather than the shared buffer.
+            self.pieces = [self.flat]
+            self.count = 1
+        return self.flat
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (str, Rope)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+def concatenate(left, right):
+    """Concatenates two Lox strings, either of which may be a str or a Rope."""
+    if isinstance(left, Rope):
+        return left.concat(str(right))
+    right = str(right)
+    if len(left) + len(right) < MIN_ROPE_LENGTH:
+        return strings.intern(left + right)
+    return Rope([left, right], 2)
@@ -1,10 +1,11 @@
 # Scanner.py 
 # This is mostly a 1-to-1 port of Scanner.java from the jLox language.
 # Written by Joel Peckham.
-# Last Modified 03/16/2022.
+# Last Modified 10/19/2026.
 
 from Token import Token, TokenType
 from LoxErrors import LoxError
+from StringTable import strings
 
 class Scanner:
     def __init__(self, source: str):
@@ -17,6 +18,7 @@ class Scanner:
             "for": TokenType.FOR,
             "fun": TokenType.FUN,
             "if": TokenType.IF,
+            "import": TokenType.IMPORT,
             "nil": TokenType.NIL,
             "or": TokenType.OR,
             "print": TokenType.PRINT,
@@ -81,7 +83,7 @@ class Scanner:
         if self.isAtEnd():
             raise LoxError(self._line, "Unterminated string.")
         self.advance()
-        self.addToken(TokenType.STRING, self._source[self._start + 1:self._current - 1])
+        self.addToken(TokenType.STRING, strings.intern(self._source[self._start + 1:self._current - 1]))
     
     def number(self):
         while self.isDigit(self.peek()):
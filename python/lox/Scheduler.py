@@ -0,0 +1,135 @@
+# Scheduler.py
+# This is a cooperative scheduler that time-slices many Lox programs in one worker.
+# Each program may have a statement budget and a time limit, checked at slice boundaries.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import io, time
+from collections import deque
+from enum import Enum, auto
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Resumable import SlicedInterpreter, Suspend, ProgramAborted
+
+class TaskState(Enum):
+    READY = auto()
+    PAUSED = auto()
+    WAITING = auto()
+    DONE = auto()
+    FAILED = auto()
+    ABORTED = auto()
+
+class BudgetExceeded(Exception):
+    def __init__(self, message: str):
+        self.message = message
+    def __str__(self):
+        return self.message
+
+class LoxTask:
+    """One program under the scheduler. Its output is collected in self.output unless another stream is given."""
+    def __init__(self, source: str, budget: int = None, timeLimit: float = None, output=None, maxCallDepth: int = 10000):
+        self.budget = budget
+        self.timeLimit = timeLimit
+        self.elapsed = 0.0
+        self.output = output if output is not None else io.StringIO()
+        self.error = None
+        self.inputLines = deque()
+        self.inputClosed = False
+
+        statements = Parser(Scanner(source).scanTokens()).parseOrRaise()
+        self.interpreter = SlicedInterpreter(maxCallDepth, output=self.output)
+        Resolver(self.interpreter).resolve(statements)
+        self.program = self.interpreter.run(statements)
+        self.state = TaskState.READY
+
+    @property
+    def executed(self) -> int:
+        return self.interpreter.executed
+
+    def feed(self, line: str):
+        """Queues a line for input(). A task waiting for input becomes ready again."""
+        self.inputLines.append(line)
+        if self.state == TaskState.WAITING:
+            self.state = TaskState.READY
+
+    def closeInput(self):
+        """Makes input() return nil once the queued lines run out."""
+        self.inputClosed = True
+        if self.state == TaskState.WAITING:
+            self.state = TaskState.READY
+
+    def isFinished(self) -> bool:
+        return self.state in (TaskState.DONE, TaskState.FAILED, TaskState.ABORTED)
+
+class Scheduler:
+    """Runs ready tasks round-robin, one slice of sliceSize statements at a time."""
+    def __init__(self, sliceSize: int = 1000):
+        self.sliceSize = sliceSize
+        self.tasks = deque()
+
+    def spawn(self, source: str, budget: int = None, timeLimit: float = None, output=None) -> LoxTask:
+        task = LoxTask(source, budget, timeLimit, output)
+        self.tasks.append(task)
+        return task
+
+    def pause(self, task: LoxTask):
+        if task.state in (TaskState.READY, TaskState.WAITING):
+            task.state = TaskState.PAUSED
+
+    def resume(self, task: LoxTask):
+        if task.state == TaskState.PAUSED:
+            task.state = TaskState.READY
+
+    def abort(self, task: LoxTask, error: Exception = None):
+        if task.isFinished():
+            return
+        task.program.abort()
+        task.state = TaskState.ABORTED
+        task.error = error if error is not None else ProgramAborted()
+
+    def step(self) -> bool:
+        """Runs one slice of the next ready task. Returns False if no task is ready."""
+        for _ in range(len(self.tasks)):
+            task = self.tasks[0]
+            self.tasks.rotate(-1)
+            if task.isFinished():
+                self.tasks.remove(task)
+            elif task.state == TaskState.READY:
+                self.runSlice(task)
+                return True
+        return False
+
+    def run(self):
+        """Runs until every task has finished or is paused or waiting for input."""
+        while self.step():
+            pass
+
+    def runSlice(self, task: LoxTask):
+        interpreter = task.interpreter
+        sliceEnd = interpreter.executed + self.sliceSize
+        if task.budget is not None:
+            # The program suspends just before running the statement that reaches sliceEnd.
+            if interpreter.executed > task.budget:
+                self.abort(task, BudgetExceeded("Statement budget exceeded."))
+                return
+            sliceEnd = min(sliceEnd, task.budget + 1)
+        interpreter.sliceEnd = sliceEnd
+
+        reply = None
+        if task.program.request == Suspend.INPUT:
+            reply = task.inputLines.popleft() if task.inputLines else None
+
+        start = time.perf_counter()
+        request = task.program.resume(reply)
+        task.elapsed += time.perf_counter() - start
+
+        if request == Suspend.DONE:
+            task.state = TaskState.DONE
+        elif request == Suspend.ERROR:
+            task.state = TaskState.FAILED
+            task.error = task.program.value
+        elif request == Suspend.INPUT and not task.inputLines and not task.inputClosed:
+            task.state = TaskState.WAITING
+        elif task.timeLimit is not None and task.elapsed >= task.timeLimit:
+            self.abort(task, BudgetExceeded("Time limit exceeded."))
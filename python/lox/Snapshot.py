@@ -0,0 +1,186 @@
+# Snapshot.py
+# This saves the globals of an interpreter, along with the classes, closures and environments they
+# reach, so a prelude of definitions can be run once and restored into fresh interpreters.
+# Each list, dict and object is saved on its own with references to the others, so saving never
+# recurses and a linked list of any length can be snapshotted.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import copyreg, io, os, pickle, tempfile
+from Interpreter import Interpreter
+from LoxInstance import Shape, EMPTY_SHAPE
+from Rope import Rope
+
+SNAPSHOT_VERSION = 2
+
+class SnapshotError(Exception):
+    def __init__(self, message: str):
+        self.message = message
+    def __str__(self):
+        return self.message
+
+def shapeWithFields(names: tuple) -> Shape:
+    """Finds the shape for names on the shared transition tree, so restored instances share shapes with new ones."""
+    shape = EMPTY_SHAPE
+    for name in names:
+        shape = shape.withField(name)
+    return shape
+
+# Values that hold nothing else, so they are never saved apart from what refers to them.
+SCALARS = (str, int, float, bool, type(None), bytes)
+
+def setState(obj, state):
+    """Fills in an object made by cls.__new__, the way unpickling would."""
+    if type(obj) is list:
+        obj.extend(state)
+    elif type(obj) is dict:
+        obj.update(state)
+    elif state is not None:
+        slots = None
+        if isinstance(state, tuple):
+            state, slots = state
+        if state:
+            obj.__dict__.update(state)
+        for name, value in (slots or {}).items():
+            setattr(obj, name, value)
+
+class SnapshotPickler(pickle.Pickler):
+    def __init__(self, file, interpreter: Interpreter):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        # Natives and the global environment belong to the interpreter being restored into, so they are saved by name.
+        # Every object whose state is saved on its own is added by flatten.
+        self.references = {id(value): ("native", name) for name, value in interpreter.natives.items()}
+        self.references[id(interpreter.globals)] = ("globals",)
+        self.kept = []
+
+    def persistent_id(self, obj):
+        return self.references.get(id(obj))
+
+    def reduction(self, obj):
+        """How pickle would rebuild obj, or None if it cannot."""
+        reduced = self.reducer_override(obj)
+        if reduced is not NotImplemented:
+            return reduced
+        try:
+            return obj.__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Classes, functions and the like are saved by name, or rejected when the pickle is written.
+            return None
+
+    def flatten(self, root) -> list:
+        """Indexes every list, dict and plain object reachable from root, and returns the state of each
+        with the others replaced by references."""
+        states = []
+        references = self.references
+        work = [root]
+        while work:
+            obj = work.pop()
+            if type(obj) in SCALARS or id(obj) in references or isinstance(obj, type):
+                continue
+            if type(obj) is list:
+                state = list(obj)
+                children = state
+            elif type(obj) is dict:
+                state = list(obj.items())
+                children = [item for pair in state for item in pair]
+            else:
+                reduced = self.reduction(obj)
+                if reduced is None:
+                    continue
+                plain = reduced[0] is copyreg.__newobj__ and reduced[1] == (type(obj),) and not any(reduced[3:])
+                if not plain:
+                    # Saved inline by pickle, so only what it is rebuilt from is searched.
+                    if type(obj) in (tuple, set, frozenset):
+                        work.extend(obj)
+                    else:
+                        work.extend(reduced[1])
+                    continue
+                state = reduced[2] if len(reduced) > 2 else None
+                children = []
+                for part in (state if isinstance(state, tuple) else (state,)):
+                    children.extend((part or {}).values())
+            references[id(obj)] = ("object", len(states), type(obj))
+            # Indexed by id, so each object is kept alive until the pickle is written.
+            self.kept.append(obj)
+            states.append(state)
+            work.extend(children)
+        return states
+
+    def reducer_override(self, obj):
+        if type(obj) is Shape:
+            return shapeWithFields, (tuple(obj.slots),)
+        if type(obj) is Rope:
+            return str, (str(obj),)
+        return NotImplemented
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, interpreter: Interpreter):
+        super().__init__(file)
+        self.interpreter = interpreter
+        # The objects made so far, by their index in the snapshot.
+        self.objects = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == "object":
+            index, cls = pid[1], pid[2]
+            if index not in self.objects:
+                self.objects[index] = cls.__new__(cls)
+            return self.objects[index]
+        if pid[0] == "globals":
+            return self.interpreter.globals
+        if pid[1] not in self.interpreter.natives:
+            raise SnapshotError(f"Snapshot needs the native '{pid[1]}'.")
+        return self.interpreter.natives[pid[1]]
+
+def takeSnapshot(interpreter: Interpreter) -> bytes:
+    """Serializes every global that is not one of the interpreter's natives."""
+    values = {name: value for name, value in interpreter.globals.values.items()
+              if interpreter.natives.get(name) is not value}
+    file = io.BytesIO()
+    try:
+        pickler = SnapshotPickler(file, interpreter)
+        states = pickler.flatten(values)
+        pickler.dump((SNAPSHOT_VERSION, states, values))
+    except SnapshotError:
+        raise
+    except Exception as e:
+        raise SnapshotError(f"Cannot snapshot interpreter state: {e}")
+    return file.getvalue()
+
+def restoreSnapshot(interpreter: Interpreter, data: bytes):
+    """Defines the globals saved in data in interpreter. Snapshots are pickles, so only
+    restore ones you wrote yourself."""
+    try:
+        unpickler = SnapshotUnpickler(io.BytesIO(data), interpreter)
+        snapshot = unpickler.load()
+        if snapshot[0] != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Snapshot version {snapshot[0]} is not supported.")
+        _, states, values = snapshot
+        for index, state in enumerate(states):
+            setState(unpickler.objects[index], state)
+    except SnapshotError:
+        raise
+    except Exception as e:
+        raise SnapshotError(f"Invalid snapshot: {e}")
+    for name, value in values.items():
+        interpreter.globals.define(name, value)
+
+def saveSnapshot(interpreter: Interpreter, path: str):
+    """Writes the snapshot beside path and then moves it into place, so a failed save leaves any old file intact."""
+    data = takeSnapshot(interpreter)
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp makes the file private; give it the mode open() would have.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+def loadSnapshot(interpreter: Interpreter, path: str):
+    with open(path, "rb") as f:
+        restoreSnapshot(interpreter, f.read())
@@ -1,7 +1,7 @@
 # Stmt.py
 # This file was generated by tool/generateAST.py.
 # Generated by: Joel Peckham.
-# Last Modified: 2022-03-17.
+# Last Modified: 2026-10-19.
 
 from abc import ABC, abstractmethod
 
@@ -11,6 +11,7 @@ class Stmt(ABC):
 		pass
 
 class Block(Stmt):
+	captured = None
 	def __init__(self, statements):
 		"""Block          : List<Stmt> statements"""
 		self.statements = statements
@@ -18,6 +19,7 @@ class Block(Stmt):
 		return visitor.visitBlockStmt(self)
 
 class Class(Stmt):
+	coverageSlot = None
 	def __init__(self, name, superclass, methods):
 		"""Class          : Token name, Expr.Variable superclass, List<Stmt.Function> methods"""
 		self.name = name
@@ -27,6 +29,7 @@ class Class(Stmt):
 		return visitor.visitClassStmt(self)
 
 class Expression(Stmt):
+	coverageSlot = None
 	def __init__(self, expression):
 		"""Expression     : Expr expression"""
 		self.expression = expression
@@ -34,6 +37,10 @@ class Expression(Stmt):
 		return visitor.visitExpressionStmt(self)
 
 class Function(Stmt):
+	captured = None
+	hits = None
+	trace = None
+	coverageSlot = None
 	def __init__(self, name, params, body):
 		"""Function       : Token name, List<Token> params, List<Stmt> body"""
 		self.name = name
@@ -43,6 +50,8 @@ class Function(Stmt):
 		return visitor.visitFunctionStmt(self)
 
 class If(Stmt):
+	coverageSlot = None
+	coverageBranch = None
 	def __init__(self, condition, thenBranch, elseBranch):
 		"""If             : Expr condition, Stmt thenBranch, Stmt elseBranch"""
 		self.condition = condition
@@ -51,7 +60,17 @@ class If(Stmt):
 	def accept(self, visitor):
 		return visitor.visitIfStmt(self)
 
+class Import(Stmt):
+	coverageSlot = None
+	def __init__(self, keyword, path):
+		"""Import         : Token keyword, Token path"""
+		self.keyword = keyword
+		self.path = path
+	def accept(self, visitor):
+		return visitor.visitImportStmt(self)
+
 class Print(Stmt):
+	coverageSlot = None
 	def __init__(self, expression):
 		"""Print          : Expr expression"""
 		self.expression = expression
@@ -59,6 +78,7 @@ class Print(Stmt):
 		return visitor.visitPrintStmt(self)
 
 class Return(Stmt):
+	coverageSlot = None
 	def __init__(self, keyword, value):
 		"""Return         : Token keyword, Expr value"""
 		self.keyword = keyword
@@ -67,6 +87,7 @@ class Return(Stmt):
 		return visitor.visitReturnStmt(self)
 
 class Var(Stmt):
+	coverageSlot = None
 	def __init__(self, name, initializer):
 		"""Var            : Token name, Expr initializer"""
 		self.name = name
@@ -75,6 +96,10 @@ class Var(Stmt):
 		return visitor.visitVarStmt(self)
 
 class While(Stmt):
+	hits = None
+	trace = None
+	coverageSlot = None
+	coverageBranch = None
 	def __init__(self, condition, body):
 		"""While          : Expr condition, Stmt body"""
 		self.condition = condition
@@ -103,6 +128,10 @@ class StmtVisitor(ABC):
 	def visitIfStmt(self, ifStmt):
 		pass
 
+	@abstractmethod
+	def visitImportStmt(self, importStmt):
+		pass
+
 	@abstractmethod
 	def visitPrintStmt(self, printStmt):
 		pass
@@ -0,0 +1,30 @@
+# StringTable.py
+# This is a bounded table of interned Lox strings, so equal strings are usually the same object.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+from collections import OrderedDict
+
+# Longer strings are not worth hashing on every concatenation.
+MAX_INTERNED_LENGTH = 256
+
+class StringTable:
+    """Interns strings shorter than MAX_INTERNED_LENGTH. Once the table is full the oldest entry is dropped,
+    so a string may stop being interned but equality never depends on it."""
+    def __init__(self, maxSize: int = 65536):
+        self.strings = OrderedDict()
+        self.maxSize = maxSize
+
+    def intern(self, string: str) -> str:
+        if len(string) >= MAX_INTERNED_LENGTH:
+            return string
+        interned = self.strings.get(string)
+        if interned is not None:
+            return interned
+        if len(self.strings) >= self.maxSize:
+            self.strings.popitem(last=False)
+        self.strings[string] = string
+        return string
+
+# The table shared by the Scanner, string concatenation and the input() native.
+strings = StringTable()
@@ -0,0 +1,413 @@
+# Transpiler.py
+# This is a concrete visitor that translates a resolved Lox program into a Python module.
+# Lox functions become nested Python functions, sharing variables through closures and nonlocal,
+# and Lox classes become Python classes. LoxRuntime.py supplies everything else.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import math
+import Expr as E
+import Stmt as S
+from Token import Token, TokenType
+from LoxErrors import TokenError
+from AstUtil import firstLine
+from typing import List
+
+BINARY_HELPERS = {
+    TokenType.PLUS: "add", TokenType.MINUS: "subtract", TokenType.STAR: "multiply", TokenType.SLASH: "divide",
+    TokenType.GREATER: "greater", TokenType.GREATER_EQUAL: "greaterEqual",
+    TokenType.LESS: "less", TokenType.LESS_EQUAL: "lessEqual",
+}
+PYTHON_OPERATORS = {
+    TokenType.PLUS: "+", TokenType.MINUS: "-", TokenType.STAR: "*", TokenType.SLASH: "/",
+    TokenType.GREATER: ">", TokenType.GREATER_EQUAL: ">=", TokenType.LESS: "<", TokenType.LESS_EQUAL: "<=",
+}
+BOOLEAN_OPERATORS = {
+    TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL,
+}
+
+class Context:
+    """A Python function being generated: main, a Lox function or method, or the body of a block that
+    has to run as a function of its own. Lines are indented relative to the function's body."""
+    def __init__(self, parent, isInitializer: bool = False):
+        self.parent = parent
+        self.isInitializer = isInitializer
+        self.lines = []
+        self.nonlocals = set()
+        self.globals = set()
+        self.loopDepth = 0
+        # Whether a return statement ran in this context, which a block function passes on to its caller.
+        self.returns = False
+
+class Transpiler(E.ExprVisitor, S.StmtVisitor):
+    def __init__(self, sourceName: str = "<lox>", maxCallDepth: int = 10000, runtimePath: str = None):
+        self.sourceName = sourceName
+        self.maxCallDepth = maxCallDepth
+        # Where the module imports LoxRuntime from, if it is not already importable when the module runs.
+        self.runtimePath = runtimePath
+        # Each scope maps a Lox name to its Python name and the Context that owns it, mirroring the Resolver.
+        self.scopes = []
+        self.context = Context(None)
+        self.indent = 0
+        self.line = 1
+        self.counter = 0
+        self.constants = {}
+        self.constantLines = []
+        # Globals declared anywhere at the top level, and those whose declaration has already run.
+        self.globalNames = set()
+        self.definedGlobals = set()
+
+    def transpile(self, statements: List[S.Stmt], nativeNames=()) -> str:
+        self.globalNames = set(nativeNames) | {stmt.name.lexeme for stmt in statements
+                                               if isinstance(stmt, (S.Var, S.Function, S.Class))}
+        self.definedGlobals = set(nativeNames)
+        for statement in statements:
+            self.statement(statement)
+        main = self.function("main", [], self.context)
+
+        lines = [f"# This module was generated from {self.sourceName} by Lox.py --transpile."]
+        if self.runtimePath is None:
+            lines.append("# It needs pylox's lox directory, which has LoxRuntime.py, on the Python path.")
+        else:
+            lines += ["import sys", f"sys.path.insert(0, {self.runtimePath!r})"]
+        lines += [
+            "from LoxRuntime import *",
+            "",
+            "G = globals()",
+            "defineNatives(G)",
+        ]
+        lines += self.constantLines
+        lines += [""] + main + [
+            "",
+            'if __name__ == "__main__":',
+            f"    run(main, {self.maxCallDepth})",
+        ]
+        return "\n".join(lines) + "\n"
+
+    # Output.
+
+    def emit(self, text: str):
+        self.context.lines.append("    " * self.indent + f"{text}  # line {self.line}")
+
+    def emitLines(self, lines: List[str]):
+        self.context.lines += ["    " * self.indent + line for line in lines]
+
+    def function(self, header: str, parameters: List[str], context: Context, footer: str = None) -> List[str]:
+        """The lines of a finished Context as a def."""
+        lines = [f"def {header}({', '.join(parameters)}):"]
+        if context.globals:
+            lines.append("    global " + ", ".join(sorted(context.globals)))
+        if context.nonlocals:
+            lines.append("    nonlocal " + ", ".join(sorted(context.nonlocals)))
+        lines += ["    " + line for line in context.lines]
+        if footer is not None:
+            lines.append("    " + footer)
+        elif not context.lines:
+            lines.append("    pass")
+        return lines
+
+    def fresh(self, prefix: str, name: str = "") -> str:
+        # A number after the prefix keeps every name distinct, whatever the Lox names are.
+        self.counter += 1
+        return f"{prefix}{self.counter}_{name}" if name else f"{prefix}{self.counter}"
+
+    def constant(self, key, source: str) -> str:
+        name = self.constants.get(key)
+        if name is None:
+            name = self.constants[key] = f"k{len(self.constants)}"
+            self.constantLines.append(f"{name} = {source}")
+        return name
+
+    def token(self, token: Token) -> str:
+        return self.constant(("token", token.lexeme, token.line), f"token({token.lexeme!r}, {token.line})")
+
+    def site(self, paren: Token) -> str:
+        return self.constant(("site", paren.line), f"site({paren.line})")
+
+    # Variables.
+
+    def declare(self, name: str) -> str:
+        """Returns the Python name of a new variable in the innermost scope, or of a global."""
+        if not self.scopes:
+            self.context.globals.add(f"g_{name}")
+            return f"g_{name}"
+        pythonName = self.fresh("l", name)
+        self.scopes[-1][name] = (pythonName, self.context)
+        return pythonName
+
+    def defined(self, name: str):
+        if not self.scopes:
+            self.definedGlobals.add(name)
+
+    def lookUp(self, name: Token, depth: int):
+        return self.scopes[-1 - depth][name.lexeme]
+
+    def readVariable(self, name: Token, depth: int) -> str:
+        if depth is not None:
+            return self.lookUp(name, depth)[0]
+        if name.lexeme in self.globalNames:
+            return f"g_{name.lexeme}"
+        return f"undefinedVariable({self.token(name)})"
+
+    def assignVariable(self, name: Token, depth: int, value: str) -> str:
+        if depth is not None:
+            pythonName, owner = self.lookUp(name, depth)
+            if owner is not self.context:
+                self.context.nonlocals.add(pythonName)
+            return f"({pythonName} := {value})"
+        if self.context.parent is None and name.lexeme in self.definedGlobals:
+            self.context.globals.add(f"g_{name.lexeme}")
+            return f"(g_{name.lexeme} := {value})"
+        return f"assignGlobal(G, 'g_{name.lexeme}', {value}, {self.token(name)})"
+
+    # Statements.
+
+    def statement(self, stmt: S.Stmt):
+        self.line = firstLine(stmt, self.line)
+        stmt.accept(self)
+
+    def suite(self, stmt: S.Stmt, loop: bool = False):
+        self.indent += 1
+        self.context.loopDepth += loop
+        start = len(self.context.lines)
+        self.statement(stmt)
+        if len(self.context.lines) == start:
+            self.emit("pass")
+        self.context.loopDepth -= loop
+        self.indent -= 1
+
+    def visitBlockStmt(self, block: S.Block):
+        if not (block.captured and self.context.loopDepth):
+            self.scopes.append({})
+            for statement in block.statements:
+                self.statement(statement)
+            self.scopes.pop()
+            return
+
+        # Closures capture a fresh scope on every iteration, but a Python function has one cell per
+        # variable, so a captured block inside a loop runs as a function of its own.
+        name = self.fresh("b")
+        enclosing, indent = self.context, self.indent
+        self.context, self.indent = Context(enclosing, enclosing.isInitializer), 0
+        self.scopes.append({})
+        for statement in block.statements:
+            self.statement(statement)
+        self.scopes.pop()
+        context = self.context
+        self.context, self.indent = enclosing, indent
+
+        self.emitLines(self.function(name, [], context, "return NORETURN"))
+        if context.returns:
+            result = self.fresh("r")
+            self.emit(f"{result} = {name}()")
+            self.emit(f"if {result} is not NORETURN: return {result}")
+            self.context.returns = True
+        else:
+            self.emit(f"{name}()")
+
+    def visitClassStmt(self, classStmt: S.Class):
+        name = classStmt.name.lexeme
+        target = self.declare(name)
+        self.defined(name)
+        superclass = "None"
+        base = "Instance"
+        if classStmt.superclass:
+            superclass = self.fresh("s")
+            self.emit(f"{superclass} = superclass({classStmt.superclass.accept(self)}, {self.token(classStmt.superclass.name)})")
+            base = f"{superclass}.pythonClass"
+            self.scopes.append({"super": (superclass, self.context)})
+        self.scopes.append({"this": ("this", self.context)})
+
+        pythonClass = self.fresh("c", name)
+        self.emit(f"class {pythonClass}({base}):")
+        self.indent += 1
+        self.emit("__slots__ = ()")
+        for method in classStmt.methods:
+            self.emitLines(self.functionBody(f"m_{method.name.lexeme}", method, method.name.lexeme == "init"))
+        self.indent -= 1
+
+        self.scopes.pop()
+        if classStmt.superclass:
+            self.scopes.pop()
+        self.line = classStmt.name.line
+        self.emit(f"{target} = Class({name!r}, {pythonClass}, {superclass})")
+
+    def functionBody(self, pythonName: str, function: S.Function, isInitializer: bool = None) -> List[str]:
+        enclosing, indent, line = self.context, self.indent, self.line
+        self.context, self.indent = Context(enclosing, bool(isInitializer)), 0
+        scope = {}
+        parameters = [] if isInitializer is None else ["this"]
+        for param in function.params:
+            scope[param.lexeme] = (self.fresh("l", param.lexeme), self.context)
+            parameters.append(scope[param.lexeme][0])
+        self.scopes.append(scope)
+        for statement in function.body:
+            self.statement(statement)
+        self.scopes.pop()
+        context = self.context
+        self.context, self.indent, self.line = enclosing, indent, line
+        return self.function(pythonName, parameters, context, "return this" if isInitializer else None)
+
+    def visitExpressionStmt(self, stmt: S.Expression):
+        self.emit(stmt.expression.accept(self))
+
+    def visitFunctionStmt(self, function: S.Function):
+        name = function.name.lexeme
+        target = self.declare(name)
+        self.defined(name)
+        pythonName = self.fresh("f", name)
+        self.emitLines(self.functionBody(pythonName, function))
+        self.emit(f"{target} = Function({name!r}, {pythonName}, {len(function.params)})")
+
+    def visitIfStmt(self, stmt: S.If):
+        self.emit(f"if {self.condition(stmt.condition)}:")
+        self.suite(stmt.thenBranch)
+        if stmt.elseBranch:
+            self.emit("else:")
+            self.suite(stmt.elseBranch)
+
+    def visitImportStmt(self, stmt: S.Import):
+        raise TokenError(stmt.keyword, "Imports must be inlined before transpiling.")
+
+    def visitPrintStmt(self, stmt: S.Print):
+        self.emit(f"print(stringify({stmt.expression.accept(self)}))")
+
+    def visitReturnStmt(self, stmt: S.Return):
+        self.context.returns = True
+        if self.context.isInitializer:
+            self.emit("return this")
+        elif stmt.value:
+            self.emit(f"return {stmt.value.accept(self)}")
+        else:
+            self.emit("return None")
+
+    def visitVarStmt(self, stmt: S.Var):
+        value = stmt.initializer.accept(self) if stmt.initializer else "None"
+        self.emit(f"{self.declare(stmt.name.lexeme)} = {value}")
+        self.defined(stmt.name.lexeme)
+
+    def visitWhileStmt(self, stmt: S.While):
+        self.emit(f"while {self.condition(stmt.condition)}:")
+        self.suite(stmt.body, loop=True)
+
+    # Expressions. Each visit method returns Python source for the expression.
+
+    def isBoolean(self, expr: E.Expr) -> bool:
+        if isinstance(expr, E.Binary):
+            return expr.operator.type in BOOLEAN_OPERATORS
+        if isinstance(expr, E.Unary):
+            return expr.operator.type == TokenType.BANG
+        if isinstance(expr, E.Literal):
+            return isinstance(expr.value, bool)
+        if isinstance(expr, E.Grouping):
+            return self.isBoolean(expr.expression)
+        if isinstance(expr, E.Logical):
+            return self.isBoolean(expr.left) and self.isBoolean(expr.right)
+        return False
+
+    def isSimple(self, code: str) -> bool:
+        """Whether code can be evaluated twice: a name or a number."""
+        return code.isidentifier() or self.isNumber(code)
+
+    def isNumber(self, code: str) -> bool:
+        try:
+            float(code)
+            return True
+        except ValueError:
+            return False
+
+    def truthy(self, code: str) -> str:
+        if code.isidentifier():
+            return f"{code} is not None and {code} is not False"
+        temp = self.fresh("t")
+        return f"({temp} := {code}) is not None and {temp} is not False"
+
+    def condition(self, expr: E.Expr) -> str:
+        code = expr.accept(self)
+        return code if self.isBoolean(expr) else self.truthy(code)
+
+    def visitAssignExpr(self, expr: E.Assign):
+        return self.assignVariable(expr.name, expr.depth, expr.value.accept(self))
+
+    def visitBinaryExpr(self, expr: E.Binary):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        opType = expr.operator.type
+        if opType in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            negate = "not " if opType == TokenType.BANG_EQUAL else ""
+            if self.isSimple(left) and self.isSimple(right):
+                check = self.floatCheck(left, right)
+                return f"({left} {'!=' if negate else '=='} {right} if {check} else {negate}isEqual({left}, {right}))"
+            return f"({negate}isEqual({left}, {right}))"
+
+        helper = f"{BINARY_HELPERS[opType]}({left}, {right}, {self.token(expr.operator)})"
+        if not (self.isSimple(left) and self.isSimple(right)):
+            return helper
+        # Both operands are names or numbers, so the float case can be tried inline.
+        check = self.floatCheck(left, right)
+        if opType == TokenType.SLASH:
+            check += f" and {right}"
+        return f"({left} {PYTHON_OPERATORS[opType]} {right} if {check} else {helper})"
+
+    def floatCheck(self, left: str, right: str) -> str:
+        checks = [f"type({code}) is float" for code in (left, right) if not self.isNumber(code)]
+        return " and ".join(checks) if checks else "True"
+
+    def visitCallExpr(self, expr: E.Call):
+        arguments = "".join(", " + argument.accept(self) for argument in expr.arguments)
+        if isinstance(expr.callee, E.Get):
+            # Look the method up before evaluating the arguments, as the Interpreter does, but call it unbound.
+            temp = self.fresh("t")
+            obj = expr.callee.object.accept(self)
+            found = f"lookUp(({temp} := {obj}), {expr.callee.name.lexeme!r}, {self.token(expr.callee.name)})"
+            return f"invoke({found}, {temp}, {self.site(expr.paren)}{arguments})"
+        return f"call({expr.callee.accept(self)}, {self.site(expr.paren)}{arguments})"
+
+    def visitGetExpr(self, expr: E.Get):
+        return f"getProperty({expr.object.accept(self)}, {expr.name.lexeme!r}, {self.token(expr.name)})"
+
+    def visitGroupingExpr(self, expr: E.Grouping):
+        return f"({expr.expression.accept(self)})"
+
+    def visitLiteralExpr(self, expr: E.Literal):
+        if isinstance(expr.value, float) and not math.isfinite(expr.value):
+            return f"float({str(expr.value)!r})"
+        return repr(expr.value)
+
+    def visitLogicalExpr(self, expr: E.Logical):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if self.isBoolean(expr.left):
+            operator = "or" if expr.operator.type == TokenType.OR else "and"
+            return f"({left} {operator} {right})"
+        temp = self.fresh("t")
+        test = f"({temp} := {left}) is not None and {temp} is not False"
+        if expr.operator.type == TokenType.OR:
+            return f"({temp} if {test} else {right})"
+        return f"({right} if {test} else {temp})"
+
+    def visitSetExpr(self, expr: E.Set):
+        obj = f"checkInstance({expr.object.accept(self)}, {self.token(expr.name)})"
+        return f"setProperty({obj}, {expr.name.lexeme!r}, {expr.value.accept(self)})"
+
+    def visitSuperExpr(self, expr: E.Super):
+        superclass = self.scopes[-1 - expr.depth]["super"][0]
+        return f"superMethod({superclass}, this, {expr.method.lexeme!r}, {self.token(expr.method)})"
+
+    def visitThisExpr(self, expr: E.This):
+        return "this"
+
+    def visitUnaryExpr(self, expr: E.Unary):
+        right = expr.right.accept(self)
+        if expr.operator.type == TokenType.BANG:
+            if self.isBoolean(expr.right):
+                return f"(not {right})"
+            return f"(not ({self.truthy(right)}))"
+        helper = f"negate({right}, {self.token(expr.operator)})"
+        if self.isSimple(right):
+            return f"(-{right} if {self.floatCheck(right, '0')} else {helper})"
+        return helper
+
+    def visitVariableExpr(self, expr: E.Variable):
+        return self.readVariable(expr.name, expr.depth)
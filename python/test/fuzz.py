@@ -0,0 +1,577 @@
+# fuzz.py
+# This utility generates random Lox programs, runs each with pylox and with a reference interpreter,
+# and reports any program whose output differs, shrunk to a small reproducer.
+# Programs are generated rule by rule from the Parser's grammar, tracking the type of every name in scope,
+# so they compile, rarely fail at runtime, and always finish: loops are counted and nothing recurses.
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import argparse, os, random, re, shlex, subprocess, sys, tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+thisDir = os.path.dirname(os.path.realpath(__file__))
+LOX_DIR = os.path.join(thisDir, "..", "lox")
+sys.path[:0] = [os.path.join(thisDir, "..", "tool"), LOX_DIR]
+
+from generateAST import GrammarNotation, expressionList, statementList
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+from LoxErrors import LoxError, LoxRuntimeError, TokenError
+
+# The clox build the Makefile copies to the top of the repository.
+CLOX_PATH = os.path.join(thisDir, "..", "..", "clox")
+PYLOX_PATH = os.path.join(LOX_DIR, "Lox.py")
+
+# Node types of the grammar the generator does not produce, and why.
+SKIPPED = {"Import": "needs module files next to the program"}
+
+# Precedence levels of the Parser's rules, loosest first.
+ASSIGNMENT, OR, AND, EQUALITY, COMPARISON, TERM, FACTOR, UNARY, CALL, PRIMARY = range(1, 11)
+
+NUM, STR, BOOL, NIL = "number", "string", "bool", "nil"
+FunType = namedtuple("FunType", "arity returns")
+InstanceType = namedtuple("InstanceType", "klass")
+ClassType = namedtuple("ClassType", "klass")
+
+class ClassInfo:
+    def __init__(self, name: str, superclass=None):
+        self.name = name
+        self.superclass = superclass
+        # Fields are numbers, all set by init. Methods return numbers.
+        self.fields = list(superclass.fields) if superclass else []
+        self.methods = dict(superclass.methods) if superclass else {}
+        self.initArity = superclass.initArity if superclass else 0
+
+class ProgramGenerator:
+    """Writes a random program one line per statement, with each block's braces on the lines that open
+    and close it, so the minimizer can remove whole statements by removing lines."""
+    # Node types each rule can produce, checked against the grammar in tool/generateAST.py.
+    PRODUCES = {"Assign", "Binary", "Call", "Get", "Grouping", "Literal", "Logical", "Set", "Super", "This", "Unary",
+                "Variable", "Block", "Class", "Expression", "Function", "If", "Print", "Return", "Var", "While"}
+
+    def __init__(self, rng: random.Random, maxDepth: int = 3):
+        grammar = {GrammarNotation(rule).name for rule in expressionList + statementList}
+        missing = grammar - self.PRODUCES - set(SKIPPED)
+        if missing:
+            raise ValueError(f"The generator does not produce {', '.join(sorted(missing))} from the grammar.")
+        self.rng = rng
+        self.maxDepth = maxDepth
+        self.scopes = [{}]
+        # Loop counters, which nothing else may assign or shadow.
+        self.counters = set()
+        self.counter = 0
+        self.lines = []
+        self.depth = 0
+        # What a return in the function being written returns, or None outside functions.
+        self.returnType = None
+        self.currentClass = None
+        # In an initializer, the fields set so far; otherwise None.
+        self.initFields = None
+
+    def program(self, size: int) -> str:
+        for _ in range(size):
+            self.statement()
+        return "\n".join(self.lines) + "\n"
+
+    # Names and scopes.
+
+    def emit(self, text: str):
+        self.lines.append("  " * self.depth + text)
+
+    def fresh(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def visible(self) -> dict:
+        names = {}
+        for scope in self.scopes:
+            names.update(scope)
+        return names
+
+    def named(self, match) -> list:
+        return [name for name, kind in self.visible().items() if match(kind)]
+
+    def newName(self, prefix: str, hidden=()) -> str:
+        """A fresh name, or sometimes one that shadows a name in an enclosing scope."""
+        if len(self.scopes) > 1 and self.rng.random() < 0.2:
+            outer = [name for scope in self.scopes[:-1] for name in scope
+                     if name not in self.scopes[-1] and name not in self.counters and name not in hidden]
+            if outer:
+                return self.rng.choice(outer)
+        return self.fresh(prefix)
+
+    def pushScope(self):
+        self.scopes.append({})
+        self.depth += 1
+
+    def popScope(self):
+        self.scopes.pop()
+        self.depth -= 1
+
+    # Expressions. Each returns its text and the precedence of its outermost operator.
+
+    def operand(self, expr, minimum: int) -> str:
+        text, precedence = expr
+        if precedence < minimum or self.rng.random() < 0.05:
+            return f"({text})"
+        return text
+
+    def binary(self, left, operator: str, right, level: int):
+        return f"{self.operand(left, level)} {operator} {self.operand(right, level + 1)}", level
+
+    def literal(self, kind):
+        if kind == NUM:
+            return str(self.rng.choice([self.rng.randint(0, 20), self.rng.randint(0, 40) / 4])), PRIMARY
+        if kind == STR:
+            return '"' + "".join(self.rng.choice("abcxyz ") for _ in range(self.rng.randint(0, 5))) + '"', PRIMARY
+        if kind == BOOL:
+            return self.rng.choice(["true", "false"]), PRIMARY
+        return "nil", PRIMARY
+
+    def arguments(self, arity: int, depth: int) -> str:
+        return ", ".join(self.operand(self.expression(NUM, depth + 1), ASSIGNMENT) for _ in range(arity))
+
+    def calls(self, kind) -> list:
+        """Callees whose result, after calling them once or more, is of kind."""
+        found = []
+        for name, nameKind in self.visible().items():
+            chain, calls = nameKind, 0
+            while isinstance(chain, FunType):
+                chain, calls = chain.returns, calls + 1
+            if calls and chain == kind:
+                found.append((name, nameKind))
+            if isinstance(nameKind, ClassType) and InstanceType(nameKind.klass) == kind:
+                found.append((name, nameKind))
+        return found
+
+    def call(self, name: str, kind, depth: int):
+        text = name
+        while isinstance(kind, FunType):
+            text = f"{text}({self.arguments(kind.arity, depth)})"
+            kind = kind.returns
+        if isinstance(kind, ClassType):
+            text = f"{text}({self.arguments(kind.klass.initArity, depth)})"
+        return text, CALL
+
+    def receivers(self) -> list:
+        """Expressions for instances, with their classes, whose methods can be called here."""
+        found = [(name, kind.klass) for name, kind in self.visible().items() if isinstance(kind, InstanceType)]
+        # An initializer calls no methods, since they may read fields it has not set yet.
+        if self.currentClass is not None and self.initFields is None:
+            found.append(("this", self.currentClass))
+        return found
+
+    def expression(self, kind, depth: int = 0):
+        rng = self.rng
+        options = [(lambda: self.literal(kind), 3)]
+        variables = self.named(lambda k: k == kind)
+        if variables:
+            options.append((lambda: (rng.choice(variables), PRIMARY), 4))
+        if depth < self.maxDepth:
+            options += self.compound(kind, depth)
+        choices, weights = zip(*options)
+        return rng.choices(choices, weights)[0]()
+
+    def compound(self, kind, depth: int) -> list:
+        rng = self.rng
+        sub = lambda subKind: self.expression(subKind, depth + 1)
+        options = []
+        assignable = [name for name in self.named(lambda k: k == kind) if name not in self.counters and kind in (NUM, STR, BOOL)]
+        if assignable:
+            options.append((lambda: (f"{rng.choice(assignable)} = {self.operand(sub(kind), ASSIGNMENT)}", ASSIGNMENT), 1))
+        callees = self.calls(kind)
+        if callees:
+            options.append((lambda: self.call(*rng.choice(callees), depth), 2))
+        if kind == NUM:
+            options += [
+                (lambda: self.binary(sub(NUM), rng.choice("+-"), sub(NUM), TERM), 3),
+                (lambda: self.binary(sub(NUM), rng.choice("*/"), sub(NUM), FACTOR), 2),
+                (lambda: (f"-{self.operand(sub(NUM), UNARY)}", UNARY), 1),
+            ]
+            options += self.properties(depth)
+        elif kind == STR:
+            options.append((lambda: self.binary(sub(STR), "+", sub(STR), TERM), 3))
+        elif kind == BOOL:
+            options += [
+                (lambda: self.binary(sub(NUM), rng.choice(["<", "<=", ">", ">="]), sub(NUM), COMPARISON), 3),
+                (lambda: self.binary(sub(rng.choice([NUM, STR, BOOL, NIL])), rng.choice(["==", "!="]),
+                                     sub(rng.choice([NUM, STR, BOOL, NIL])), EQUALITY), 2),
+                (lambda: (f"!{self.operand(sub(BOOL), UNARY)}", UNARY), 1),
+                (lambda: self.binary(sub(BOOL), "and", sub(BOOL), AND), 1),
+                (lambda: self.binary(sub(BOOL), "or", sub(BOOL), OR), 1),
+            ]
+        return options
+
+    def properties(self, depth: int) -> list:
+        """Number-valued field reads, field writes and method calls that are valid here."""
+        rng = self.rng
+        options = []
+        objects = [(name, kind.klass.fields) for name, kind in self.visible().items() if isinstance(kind, InstanceType) and kind.klass.fields]
+        if self.currentClass is not None:
+            # An initializer can only read the fields it has already set.
+            fields = self.currentClass.fields if self.initFields is None else self.initFields
+            if fields:
+                objects.append(("this", fields))
+        if objects:
+            def get():
+                name, fields = rng.choice(objects)
+                return f"{name}.{rng.choice(fields)}", CALL
+            def set():
+                name, fields = rng.choice(objects)
+                return f"{name}.{rng.choice(fields)} = {self.operand(self.expression(NUM, depth + 1), ASSIGNMENT)}", ASSIGNMENT
+            options += [(get, 3), (set, 1)]
+        receivers = [(name, klass) for name, klass in self.receivers() if klass.methods]
+        if receivers:
+            def method():
+                name, klass = rng.choice(receivers)
+                method = rng.choice(sorted(klass.methods))
+                return f"{name}.{method}({self.arguments(klass.methods[method].arity, depth)})", CALL
+            options.append((method, 2))
+        klass = self.currentClass
+        if klass is not None and klass.superclass is not None and klass.superclass.methods and self.initFields is None:
+            def superCall():
+                method = rng.choice(sorted(klass.superclass.methods))
+                return f"super.{method}({self.arguments(klass.superclass.methods[method].arity, depth)})", CALL
+            options.append((superCall, 1))
+        return options
+
+    def anyExpression(self):
+        kinds = [NUM, NUM, STR, BOOL, NIL]
+        values = self.named(lambda k: isinstance(k, (FunType, ClassType, InstanceType)))
+        if values and self.rng.random() < 0.15:
+            return self.rng.choice(values), PRIMARY
+        if self.rng.random() < 0.1:
+            left, right = self.expression(self.rng.choice(kinds)), self.expression(self.rng.choice(kinds))
+            operator, level = self.rng.choice([("and", AND), ("or", OR)])
+            return self.binary(left, operator, right, level)
+        return self.expression(self.rng.choice(kinds))
+
+    # Statements.
+
+    def statement(self):
+        options = [(self.printStatement, 6), (self.varDeclaration, 4), (self.expressionStatement, 2)]
+        if self.depth < self.maxDepth:
+            options += [(self.ifStatement, 2), (self.whileStatement, 1), (self.forStatement, 1), (self.block, 1),
+                        (self.funDeclaration, 1), (self.classDeclaration, 1)]
+        if self.returnType is not None:
+            options.append((self.returnStatement, 1))
+        choices, weights = zip(*options)
+        self.rng.choices(choices, weights)[0]()
+
+    def body(self, count: int = None):
+        for _ in range(self.rng.randint(1, 3) if count is None else count):
+            self.statement()
+
+    def printStatement(self):
+        self.emit(f"print {self.anyExpression()[0]};")
+
+    def varDeclaration(self):
+        kinds = [NUM, NUM, STR, BOOL]
+        kinds += [InstanceType(kind.klass) for kind in self.visible().values() if isinstance(kind, ClassType)]
+        kinds += [kind for kind in self.visible().values() if isinstance(kind, FunType)]
+        kind = self.rng.choice(kinds)
+        if isinstance(kind, FunType):
+            value = self.rng.choice(self.named(lambda k: k == kind)), PRIMARY
+        elif isinstance(kind, InstanceType):
+            value = self.call(*self.rng.choice(self.calls(kind)), 0)
+        else:
+            value = self.expression(kind)
+        # The initializer cannot read the local it declares.
+        name = self.newName("v", hidden=re.findall(r"\w+", value[0]))
+        self.emit(f"var {name} = {value[0]};")
+        self.scopes[-1][name] = kind
+
+    def expressionStatement(self):
+        expression = self.rng.choice([self.expression(NUM), self.expression(STR), self.expression(BOOL)])
+        self.emit(f"{expression[0]};")
+
+    def ifStatement(self):
+        self.emit(f"if ({self.expression(BOOL)[0]}) {{")
+        self.pushScope()
+        self.body()
+        self.popScope()
+        if self.rng.random() < 0.5:
+            self.emit("} else {")
+            self.pushScope()
+            self.body()
+            self.popScope()
+        self.emit("}")
+
+    def whileStatement(self):
+        counter = self.fresh("i")
+        self.counters.add(counter)
+        self.emit(f"var {counter} = 0;")
+        self.scopes[-1][counter] = NUM
+        self.emit(f"while ({counter} < {self.rng.randint(0, 4)}) {{")
+        self.pushScope()
+        self.body()
+        self.emit(f"{counter} = {counter} + 1;")
+        self.popScope()
+        self.emit("}")
+
+    def forStatement(self):
+        counter = self.fresh("i")
+        self.counters.add(counter)
+        self.emit(f"for (var {counter} = 0; {counter} < {self.rng.randint(0, 4)}; {counter} = {counter} + 1) {{")
+        self.scopes.append({counter: NUM})
+        self.pushScope()
+        self.body()
+        self.popScope()
+        self.scopes.pop()
+        self.emit("}")
+
+    def block(self):
+        self.emit("{")
+        self.pushScope()
+        self.body()
+        self.popScope()
+        self.emit("}")
+
+    def function(self, header: str, params: list, returns):
+        """Writes a function body that ends by returning a value of kind returns."""
+        enclosingReturn, self.returnType = self.returnType, returns
+        self.emit(f"{header}({', '.join(params)}) {{")
+        self.pushScope()
+        self.scopes[-1].update({param: NUM for param in params})
+        self.body()
+        if isinstance(returns, FunType):
+            # A closure over this call's locals.
+            inner = self.fresh("f")
+            self.function(f"fun {inner}", [self.fresh("p") for _ in range(returns.arity)], returns.returns)
+            self.emit(f"return {inner};")
+        else:
+            self.returnStatement()
+        self.popScope()
+        self.emit("}")
+        self.returnType = enclosingReturn
+
+    def funDeclaration(self):
+        returns = self.rng.choice([NUM, NUM, STR, BOOL, FunType(self.rng.randint(0, 2), NUM)])
+        name = self.newName("f")
+        params = [self.fresh("p") for _ in range(self.rng.randint(0, 3))]
+        # Declared only after its body, which so cannot call it: nothing recurses.
+        self.function(f"fun {name}", params, returns)
+        self.scopes[-1][name] = FunType(len(params), returns)
+
+    def returnStatement(self):
+        if isinstance(self.returnType, FunType):
+            closures = self.named(lambda k: k == self.returnType)
+            if closures:
+                self.emit(f"return {self.rng.choice(closures)};")
+            return
+        self.emit(f"return {self.expression(self.returnType)[0]};")
+
+    def classDeclaration(self):
+        classes = [kind.klass for kind in self.visible().values() if isinstance(kind, ClassType)]
+        superclass = self.rng.choice(classes) if classes and self.rng.random() < 0.5 else None
+        name = self.fresh("C")
+        klass = ClassInfo(name, superclass)
+        self.emit(f"class {name} < {superclass.name} {{" if superclass else f"class {name} {{")
+        self.depth += 1
+        enclosingClass, self.currentClass = self.currentClass, klass
+        enclosingFields, self.initFields = self.initFields, None
+        if superclass is None or self.rng.random() < 0.5:
+            self.initializer(klass)
+        for _ in range(self.rng.randint(0, 2)):
+            method = self.fresh("m")
+            params = [self.fresh("p") for _ in range(self.rng.randint(0, 2))]
+            # Methods only see the methods before them, and names are never reused, so no method
+            # calls itself or is overridden by one that calls back into it.
+            self.function(method, params, NUM)
+            klass.methods[method] = FunType(len(params), NUM)
+        self.currentClass = enclosingClass
+        self.initFields = enclosingFields
+        self.depth -= 1
+        self.emit("}")
+        self.scopes[-1][name] = ClassType(klass)
+
+    def initializer(self, klass: ClassInfo):
+        params = [self.fresh("p") for _ in range(self.rng.randint(0, 2))]
+        self.emit(f"init({', '.join(params)}) {{")
+        self.pushScope()
+        self.scopes[-1].update({param: NUM for param in params})
+        enclosingReturn, self.returnType = self.returnType, None
+        self.initFields = []
+        if klass.superclass is not None:
+            self.emit(f"super.init({self.arguments(klass.superclass.initArity, 0)});")
+            self.initFields = list(klass.superclass.fields)
+        for _ in range(self.rng.randint(0, 3)):
+            field = self.fresh("x")
+            self.emit(f"this.{field} = {self.expression(NUM)[0]};")
+            self.initFields.append(field)
+            if self.rng.random() < 0.3:
+                self.statement()
+        klass.fields = self.initFields
+        klass.initArity = len(params)
+        self.initFields = None
+        self.returnType = enclosingReturn
+        self.popScope()
+        self.emit("}")
+
+def isValid(source: str) -> bool:
+    """Whether source scans, parses and resolves without errors."""
+    try:
+        parser = Parser(Scanner(source).scanTokens())
+        statements = parser.parse()
+        if parser.errors:
+            return False
+        Resolver(Interpreter()).resolve(statements)
+    except (LoxError, LoxRuntimeError, TokenError, RecursionError):
+        return False
+    return True
+
+NUMBER = re.compile(r"-?(\d+(\.\d*)?(e[+-]?\d+)?|nan|inf)")
+
+def canonical(output: str) -> list:
+    """The lines of output, with numbers written as clox's %g writes them."""
+    lines = []
+    for line in output.splitlines():
+        if NUMBER.fullmatch(line):
+            line = "%g" % float(line)
+            line = "nan" if line in ("nan", "-nan") else line
+        lines.append(line)
+    return lines
+
+Result = namedtuple("Result", "lines failed timedOut")
+
+def runBoth(commands: list, path: str, timeout: float) -> list:
+    """The result of running each command on path, all at the same time."""
+    processes = [subprocess.Popen(command + [path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) for command in commands]
+    results = []
+    for process in processes:
+        try:
+            output, _ = process.communicate(timeout=timeout)
+            results.append(Result(canonical(output.decode("utf-8", errors="replace")), process.returncode != 0, False))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            results.append(Result([], False, True))
+    return results
+
+class Fuzzer:
+    def __init__(self, reference: list, pylox: list, timeout: float, jobs: int):
+        self.reference = reference
+        self.pylox = pylox
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(jobs)
+        self.directory = tempfile.mkdtemp(prefix="loxfuzz")
+
+    def run(self, source: str, name: str):
+        """The reference's and pylox's results for source, which run at the same time."""
+        path = os.path.join(self.directory, name + ".lox")
+        with open(path, "w") as f:
+            f.write(source)
+        reference, pylox = runBoth([self.reference, self.pylox], path, self.timeout)
+        os.remove(path)
+        return reference, pylox
+
+    def diverges(self, source: str, name: str) -> bool:
+        """Whether a valid program gives different output, or fails in one interpreter and not the other.
+        Timeouts count as agreement, since pylox is much slower than clox."""
+        if not isValid(source):
+            return False
+        reference, pylox = self.run(source, name)
+        if reference.timedOut or pylox.timedOut:
+            return False
+        return reference.lines != pylox.lines or reference.failed != pylox.failed
+
+    def minimize(self, source: str, name: str) -> str:
+        """Removes statements from source while it still diverges: first whole blocks, then runs of
+        lines halving in length down to single lines. Candidates in a round are tried in parallel."""
+        lines = source.splitlines()
+        def first(candidates):
+            tried = list(self.pool.map(lambda item: self.diverges("\n".join(item[1]) + "\n", f"{name}-{item[0]}"),
+                                       enumerate(candidates)))
+            return next((candidate for candidate, diverged in zip(candidates, tried) if diverged), None)
+        changed = True
+        while changed:
+            changed = False
+            for start, end in sorted(blocks(lines), key=lambda block: block[0] - block[1]):
+                if end >= len(lines):
+                    continue
+                # Remove the block, or keep its body and drop only the lines that open and close it.
+                found = first([lines[:start] + lines[end + 1:], lines[:start] + lines[start + 1:end] + lines[end + 1:]])
+                if found is not None:
+                    lines, changed = found, True
+                    break
+            if changed:
+                continue
+            size = max(1, len(lines) // 2)
+            while size >= 1 and not changed:
+                found = first([lines[:i] + lines[i + size:] for i in range(0, len(lines), size)])
+                if found is not None:
+                    lines, changed = found, True
+                size //= 2
+        return reindent(lines)
+
+def reindent(lines: list) -> str:
+    """Lines indented again by their braces, since minimizing can remove the lines that opened blocks."""
+    depth, out = 0, []
+    for line in lines:
+        text = line.strip()
+        if text.startswith("}"):
+            depth = max(0, depth - 1)
+        out.append("  " * depth + text)
+        if text.endswith("{"):
+            depth += 1
+    return "\n".join(out) + "\n"
+
+def blocks(lines: list) -> list:
+    """The first and last line of each statement that spans lines, like an if with its else."""
+    stack, spans = [], {}
+    for number, line in enumerate(lines):
+        text = line.strip()
+        if text.startswith("}") and stack:
+            opener = stack.pop()
+            spans[opener] = number
+            if text.endswith("{"):
+                # } else { closes the then branch and opens the else branch of the same if.
+                stack.append(opener)
+        elif text.endswith("{"):
+            stack.append(number)
+    return list(spans.items())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pylox against a reference Lox interpreter on random programs.")
+    parser.add_argument("--count", type=int, default=100, help="Programs to generate.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the first program. Program i uses seed + i.")
+    parser.add_argument("--size", type=int, default=20, help="Top-level statements per program.")
+    parser.add_argument("--depth", type=int, default=3, help="Deepest nesting of statements and of expressions.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Programs run at once.")
+    parser.add_argument("--timeout", type=float, default=20.0, help="Seconds either interpreter may run a program for.")
+    parser.add_argument("--reference", default=CLOX_PATH, help="Command of the reference interpreter. Defaults to the clox that make clox builds.")
+    parser.add_argument("--pylox", default=f"{shlex.quote(sys.executable)} {shlex.quote(PYLOX_PATH)}",
+                        help="Command of the interpreter under test, which can include flags such as --jit.")
+    parser.add_argument("--out", default="fuzz-failures", help="Directory to write reproducers to.")
+    parser.add_argument("--no-minimize", action="store_true", help="Write divergent programs as generated.")
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+    fuzzer = Fuzzer(shlex.split(args.reference), shlex.split(args.pylox), args.timeout, args.jobs)
+    sources = [ProgramGenerator(random.Random(seed + i), args.depth).program(args.size) for i in range(args.count)]
+    results = list(fuzzer.pool.map(lambda item: fuzzer.diverges(item[1], f"p{item[0]}"), enumerate(sources)))
+
+    failures = 0
+    for i, (source, diverged) in enumerate(zip(sources, results)):
+        if not diverged:
+            continue
+        failures += 1
+        if not args.no_minimize:
+            source = fuzzer.minimize(source, f"m{i}")
+        os.makedirs(args.out, exist_ok=True)
+        path = os.path.join(args.out, f"seed-{seed + i}.lox")
+        with open(path, "w") as f:
+            f.write(source)
+        reference, pylox = fuzzer.run(source, f"r{i}")
+        print(f"❌ Divergence with seed {seed + i}, written to {path}:")
+        print(source)
+        print(f"Reference output ({'failed' if reference.failed else 'ok'}):\n" + "\n".join(reference.lines))
+        print(f"Pylox output ({'failed' if pylox.failed else 'ok'}):\n" + "\n".join(pylox.lines) + "\n")
+    print(f"{args.count - failures} of {args.count} programs agreed (seeds {seed} to {seed + args.count - 1}).")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 # test.py
 # This utility runs all the lox files in the testCode directory first with jlox and the with pylox.
 # It then compares the output of each to see if they are the same.
+# Options run pylox in other modes, and add checks that only pylox can pass.
+# Programs that use pylox's natives are checked against their expect comments instead.
 # Written by: Joel Peckham.
-# Last Modified: 2022-03-18
+# Last Modified: 2026-10-19
 
-import os, sys, subprocess, filecmp, difflib
+import argparse, os, sys, subprocess, tempfile, filecmp, difflib
 
 # Assume the testCode directory is in the same directory as this file.
 thisDir = os.path.dirname(os.path.realpath(__file__))
@@ -13,6 +15,58 @@ testDir = os.path.join(thisDir, "testCode")
 JLOX_PATH = "/Users/joel/Documents/School/OPL/craftint/clox"
 PYLOX_PATH = "/Users/joel/Documents/School/OPL/craftint/pylox"
 
+# Runs in constant stack only with --tail-calls; without it each call takes a frame and overflows.
+TAIL_CALL_ITERATIONS = 200000
+TAIL_CALL_LOOP = f"""
+fun loop(n, total) {{
+  if (n == 0) return total;
+  return loop(n - 1, total + 1);
+}}
+print loop({TAIL_CALL_ITERATIONS}, 0);
+"""
+
+parser = argparse.ArgumentParser(description="Runs every program in testCode with a reference Lox and with pylox, and compares their output.")
+parser.add_argument("--reference", default=JLOX_PATH, help="Command of the reference interpreter.")
+parser.add_argument("--pylox", default=PYLOX_PATH, help="Command of pylox.")
+parser.add_argument("--tail-calls", action="store_true",
+                    help=f"Also check that a {TAIL_CALL_ITERATIONS}-iteration tail-call loop runs with --tail-calls, and overflows without it.")
+parser.add_argument("--jit", action="store_true",
+                    help="Run pylox with --jit, compiling every loop and function as soon as it runs, and compare it with the reference.")
+args = parser.parse_args()
+
+# Flags pylox is run with on every program.
+pyloxFlags = ["--jit", "--jit-threshold", "1"] if args.jit else []
+
+# Categories that use pylox's native modules, which the reference interpreters lack.
+# They are checked against their expect comments instead.
+PYLOX_ONLY = {"native"}
+
+def checkPylox(name: str, source: str, flags: list, expectedOutput: str, expectedError: str, expectedCode: int):
+    """Runs source with pylox alone, since the reference interpreters have no such modes or natives."""
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as f:
+        f.write(source)
+    try:
+        result = subprocess.run([args.pylox] + flags + [f.name], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    finally:
+        os.unlink(f.name)
+    output, errors = result.stdout.decode("utf-8"), result.stderr.decode("utf-8")
+    if output == expectedOutput and expectedError in errors and result.returncode == expectedCode:
+        print( "✅ Test passed: " + name + ".")
+    else:
+        print( "❌ Test failed: " + name + ".")
+        failedTests.append({"filename": name, "category": "pylox", "jlox": expectedOutput, "pylox": output,
+                            "jloxError": f"{expectedError} (exit {expectedCode})", "pyloxError": f"{errors} (exit {result.returncode})"})
+
+def expectations(source: str) -> tuple:
+    """Returns the output, error and exit code that a program's expect comments call for."""
+    output, error, code = "", "", 0
+    for line in source.splitlines():
+        if "// expect: " in line:
+            output += line.split("// expect: ", 1)[1] + "\n"
+        elif "// expect runtime error: " in line:
+            error, code = line.split("// expect runtime error: ", 1)[1], 65
+    return output, error, code
+
 categories = [(cat, [os.path.join(os.path.join(testDir, cat),fileName) for fileName in os.listdir(os.path.join(testDir, cat))]) for cat in os.listdir(testDir)]
 
 failedTests = []
@@ -20,12 +74,17 @@ for category, filePaths in categories:
     if category == "benchmark":
         continue
     for filePath in filePaths:
+        if category in PYLOX_ONLY:
+            with open(filePath) as f:
+                source = f.read()
+            checkPylox(os.path.basename(filePath) + " in " + category, source, pyloxFlags, *expectations(source))
+            continue
         # Run the file with jlox.
-        result = subprocess.run([JLOX_PATH, filePath], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        result = subprocess.run([args.reference, filePath], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         jloxOutput = result.stdout.decode("utf-8")
         jloxErrors = result.stderr.decode("utf-8")
         # Run the file with pylox.
-        result = subprocess.run([PYLOX_PATH, filePath], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        result = subprocess.run([args.pylox] + pyloxFlags + [filePath], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         pyloxOutput = result.stdout.decode("utf-8")
         pyloxErrors = result.stderr.decode("utf-8")
         # Compare the outputs.
@@ -36,7 +95,11 @@ for category, filePaths in categories:
             failedTests.append({"filename": fileName, "category": category, "jlox": jloxOutput, "pylox": pyloxOutput, "jloxError": jloxErrors, "pyloxError": pyloxErrors})
         else:
             print( "✅ Test passed: " + fileName + " in " + category + ".")
-        
+
+if args.tail_calls:
+    checkPylox("tail-call loop with --tail-calls", TAIL_CALL_LOOP, ["--tail-calls"], f"{TAIL_CALL_ITERATIONS}\n", "", 0)
+    checkPylox("tail-call loop without --tail-calls", TAIL_CALL_LOOP, [], "", "Stack overflow.", 65)
+
 if len(failedTests) > 0:
     with open("failures.txt", "w") as f:
         for test in failedTests:
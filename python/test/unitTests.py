@@ -0,0 +1,823 @@
+# unitTests.py
+# These are unit tests for the parts of pylox that the .lox files in testCode cannot reach,
+# such as the string table, snapshots and the binary AST format.
+# Run them with: python3 unitTests.py
+# Written by Joel Peckham.
+# Last Modified: 2026-10-19.
+
+import asyncio, contextlib, enum, gc, io, json, os, subprocess, sys, tempfile, threading, unittest
+from unittest import mock
+
+thisDir = os.path.dirname(os.path.realpath(__file__))
+LOX_DIR = os.path.join(thisDir, "..", "lox")
+TEST_CODE = os.path.join(thisDir, "testCode")
+sys.path[:0] = [os.path.join(thisDir, "..", "tool"), LOX_DIR]
+
+from StringTable import StringTable, MAX_INTERNED_LENGTH
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+from LoxErrors import LoxRuntimeError
+from Environment import Environment
+from Repl import ReplSession
+from AllocationTracker import AllocationTracker, TrackingInterpreter
+from AsyncLox import runProgram, InputQueue
+from JIT import JitInterpreter
+from AstUtil import walk
+from Debugger import DebugInterpreter, DebugHooks
+from Scheduler import Scheduler, TaskState, BudgetExceeded
+from Resumable import ProgramAborted
+import Expr as E
+import Stmt as S
+from Token import Token, TokenType
+from Modules import ModuleCache, findModule
+from LoxErrors import ModuleError
+import AstFormat
+from Lint import lintSource, writeFindings
+from LanguageServer import LanguageServer, INVALID_PARAMS, INTERNAL_ERROR
+from Snapshot import SnapshotError, takeSnapshot, restoreSnapshot, saveSnapshot
+
+def runLox(interpreter: Interpreter, source: str) -> str:
+    """Runs source in interpreter and returns what it printed."""
+    statements = Parser(Scanner(source).scanTokens()).parse()
+    Resolver(interpreter).resolve(statements)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        interpreter.interpret(statements)
+    return output.getvalue()
+
+def runLoxFile(source: str, flags: list = (), input: str = "") -> subprocess.CompletedProcess:
+    """Runs source as a file with Lox.py, for what only the command line does."""
+    with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as f:
+        f.write(source)
+    try:
+        return subprocess.run([sys.executable, os.path.join(LOX_DIR, "Lox.py"), *flags, f.name],
+                              input=input, capture_output=True, text=True, timeout=120)
+    finally:
+        os.unlink(f.name)
+
+def runPython(arguments: list, pythonPath: list = ()) -> tuple:
+    """Runs Python with arguments, with pythonPath ahead of PYTHONPATH. Returns its stdout, stderr and exit code."""
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join([*pythonPath, *filter(None, [environment.get("PYTHONPATH")])])
+    result = subprocess.run([sys.executable, *arguments], capture_output=True, text=True, timeout=120, env=environment)
+    return result.stdout, result.stderr, result.returncode
+
+class CallDepthTest(unittest.TestCase):
+    RECURSION = """
+        fun down(n) {
+          if (n == 0) return 0;
+          return 1 + down(n - 1);
+        }
+    """
+
+    def testStackOverflowPastMaxDepth(self):
+        result = runLoxFile(self.RECURSION + "print down(90);\nprint down(150);", ["--max-depth", "100"])
+        self.assertEqual(result.stdout, "90\n")
+        self.assertEqual(result.stderr, "Stack overflow. [line 4]\n")
+        self.assertEqual(result.returncode, 65)
+
+    def testDeepRecursionWithinMaxDepth(self):
+        # Deeper than Python's default recursion limit allows, which Lox.py raises while the program runs.
+        result = runLoxFile(self.RECURSION + "print down(9000);")
+        self.assertEqual((result.stdout, result.stderr, result.returncode), ("9000\n", "", 0))
+
+    def testTailCallsRunInConstantStack(self):
+        source = """
+            fun loop(n, total) {
+              if (n == 0) return total;
+              return loop(n - 1, total + 1);
+            }
+            print loop(20000, 0);
+        """
+        # Far past both the Lox call depth and Python's recursion limit, unless each call reuses its frame.
+        self.assertEqual(runLox(Interpreter(maxCallDepth=100, tailCalls=True), source), "20000\n")
+        with self.assertRaises(LoxRuntimeError) as raised:
+            runLox(Interpreter(maxCallDepth=100), source)
+        self.assertEqual(raised.exception.message, "Stack overflow.")
+
+class JitTest(unittest.TestCase):
+    def outcome(self, interpreter: Interpreter, source: str) -> tuple:
+        """Runs source in interpreter and returns what it printed, its runtime error, and its syntax tree."""
+        statements = Parser(Scanner(source).scanTokens()).parse()
+        Resolver(interpreter).resolve(statements)
+        output, error = io.StringIO(), None
+        with contextlib.redirect_stdout(output):
+            try:
+                interpreter.interpret(statements)
+            except LoxRuntimeError as e:
+                error = str(e)
+        return output.getvalue(), error, statements
+
+    def assertSameAsTreeWalker(self, source: str) -> list:
+        """Checks source prints and fails the same with everything compiled at once. Returns the compiled nodes."""
+        output, error, statements = self.outcome(JitInterpreter(hotLoop=1, hotCalls=1), source)
+        expectedOutput, expectedError, _ = self.outcome(Interpreter(), source)
+        self.assertEqual((output, error), (expectedOutput, expectedError))
+        compiled = [node for node in walk(statements) if isinstance(node, (S.While, S.Function)) and node.trace]
+        self.assertTrue(compiled)
+        return compiled
+
+    def testDeoptimizesMidLoop(self):
+        # Once hot, the loop needs a global that is not defined yet, so the tree walker runs the rest of it.
+        self.assertSameAsTreeWalker("""
+            var i = 0;
+            while (i < 5) {
+              if (i > 10) print later;
+              print i;
+              i = i + 1;
+            }
+            var later = 1;
+        """)
+
+    def testTooManyVariants(self):
+        # The fifth kind of argument is one more variant than a trace keeps.
+        self.assertSameAsTreeWalker("""
+            fun show(v) {
+              var j = 0;
+              while (j < 2) { print v; j = j + 1; }
+            }
+            show(1); show("s"); show(true); show(nil); show(show); show(2);
+        """)
+
+    def testTypeChangesAfterCompiling(self):
+        self.assertSameAsTreeWalker("""
+            var x = 1;
+            var i = 0;
+            while (i < 4) {
+              print x + x;
+              if (i == 1) x = "s";
+              i = i + 1;
+            }
+        """)
+        self.assertSameAsTreeWalker("""
+            fun twice(a) { return a + a; }
+            print twice(1);
+            print twice("s");
+            print twice(true);
+        """)
+
+    def testRuntimeErrorAfterTypeChange(self):
+        self.assertSameAsTreeWalker("""
+            var x = 3;
+            var i = 0;
+            while (i < 4) {
+              x = x - 1;
+              print x;
+              if (i == 1) x = "s";
+              i = i + 1;
+            }
+        """)
+
+    def testTailCallsDisableFunctionCompiling(self):
+        source = """
+            fun loop(n, total) {
+              if (n == 0) return total;
+              return loop(n - 1, total + 1);
+            }
+            print loop(20000, 0);
+        """
+        output, error, statements = self.outcome(JitInterpreter(100, True, hotLoop=1, hotCalls=1), source)
+        self.assertEqual((output, error), ("20000\n", None))
+        self.assertIsNone(statements[0].trace)
+        self.assertIsNone(statements[0].hits)
+
+class TranspilerTest(unittest.TestCase):
+    PROGRAMS = [
+        "closure/nested_closure.lox",
+        "for/closure_in_body.lox",
+        "inheritance/set_fields_from_base_class.lox",
+        "operator/equals_method.lox",
+        "operator/add_bool_string.lox",
+        "limit/stack_overflow_method.lox",
+        "native/map_bool_keys.lox",
+    ]
+
+    def transpile(self, path: str, modulePath: str, flags: list = ()):
+        result = runPython([os.path.join(LOX_DIR, "Lox.py"), *flags, "--transpile", modulePath, path])
+        self.assertEqual(result, ("", "", 0))
+
+    def testMatchesInterpreter(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in self.PROGRAMS:
+                with self.subTest(name):
+                    path = os.path.join(TEST_CODE, name)
+                    modulePath = os.path.join(directory, name.replace("/", "_").replace(".lox", ".py"))
+                    self.transpile(path, modulePath)
+                    expected = runPython([os.path.join(LOX_DIR, "Lox.py"), path])
+                    self.assertEqual(runPython([modulePath], [LOX_DIR]), expected)
+
+    def testRuntimePath(self):
+        path = os.path.join(TEST_CODE, "closure/nested_closure.lox")
+        with tempfile.TemporaryDirectory() as directory:
+            modulePath = os.path.join(directory, "program.py")
+            self.transpile(path, modulePath)
+            # Nothing but the Python path says where LoxRuntime is.
+            self.assertIn("No module named 'LoxRuntime'", runPython([modulePath])[1])
+            self.transpile(path, modulePath, ["--runtime-path", os.path.realpath(LOX_DIR)])
+            self.assertEqual(runPython([modulePath]), ("a\nb\nc\n", "", 0))
+
+class ModulesTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = os.path.realpath(directory.name)
+
+    def write(self, name: str, source: str) -> str:
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(source)
+        return path
+
+    def pathToken(self, name: str) -> Token:
+        return Token(TokenType.STRING, f'"{name}"', name, 1)
+
+    def testFindsModules(self):
+        local = self.write("a.lox", "")
+        onPath = self.write("lib/b.lox", "")
+        shadowed = self.write("lib/a.lox", "")
+        library = os.path.join(self.directory, "lib")
+        self.assertEqual(findModule(self.pathToken("a"), self.directory, [library]), local)
+        self.assertEqual(findModule(self.pathToken("a.lox"), self.directory, [library]), local)
+        self.assertEqual(findModule(self.pathToken("b"), self.directory, [library]), onPath)
+        self.assertEqual(findModule(self.pathToken(shadowed), self.directory, []), shadowed)
+        with self.assertRaises(LoxRuntimeError) as raised:
+            findModule(self.pathToken("b"), self.directory, [])
+        self.assertEqual(raised.exception.message, 'Cannot find module "b".')
+
+    def testCachesPerInterpreter(self):
+        path = self.write("m.lox", "fun f() { return 1; }")
+        cache, first, second = ModuleCache(), Interpreter(), Interpreter()
+        statements = cache.load(path, first, self.pathToken("m"))
+        self.assertIs(cache.load(path, first, self.pathToken("m")), statements)
+        # Parsed once, but each interpreter runs nodes of its own.
+        other = cache.load(path, second, self.pathToken("m"))
+        self.assertIsNot(other[0], statements[0])
+        self.assertEqual((cache.compiled, cache.hits), (1, 2))
+
+    def testChecksModificationTimeThenHash(self):
+        path = self.write("m.lox", "print 1;")
+        cache, interpreter, token = ModuleCache(), Interpreter(), self.pathToken("m")
+        statements = cache.load(path, interpreter, token)
+        stat = os.stat(path)
+        # Touched but not changed: the hash matches, so nothing is parsed again.
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIs(cache.load(path, interpreter, token), statements)
+        self.assertEqual((cache.compiled, cache.hits), (1, 1))
+        # Changed, at the same size, with the modification time put back: only the time and size are checked.
+        touched = os.stat(path).st_mtime_ns
+        self.write("m.lox", "print 2;")
+        os.utime(path, ns=(stat.st_atime_ns, touched))
+        self.assertIs(cache.load(path, interpreter, token), statements)
+        self.assertEqual((cache.compiled, cache.hits), (1, 2))
+        # Changed with a new modification time: parsed again.
+        os.utime(path, ns=(stat.st_atime_ns, touched + 10**9))
+        changed = cache.load(path, interpreter, token)
+        self.assertIsNot(changed, statements)
+        self.assertEqual(changed[0].expression.value, 2.0)
+        self.assertEqual((cache.compiled, cache.hits), (2, 2))
+
+    def testImportsOnlyAtTopLevel(self):
+        for source in ['{ import "m"; }', 'fun f() { import "m"; }']:
+            with self.subTest(source):
+                with self.assertRaises(LoxRuntimeError) as raised:
+                    runLox(Interpreter(), source)
+                self.assertEqual(raised.exception.message, "Can only import at the top level.")
+
+    def testSyntaxErrorsInModule(self):
+        path = self.write("bad.lox", "var = 1;\nprint ;")
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors), self.assertRaises(ModuleError) as raised:
+            runLox(Interpreter(), f'import "{path}";')
+        self.assertEqual(errors.getvalue(), "")
+        self.assertEqual([str(error) for error in raised.exception.errors],
+                         ["[line 1] Error at '=': Expect variable name.", "[line 2] Error at ';': Expect expression."])
+        result = runLoxFile(f'print "before";\nimport "{path}";')
+        self.assertEqual(result.stdout, "before\n")
+        self.assertEqual(result.stderr, "[line 1] Error at '=': Expect variable name.\n"
+                                        "[line 2] Error at ';': Expect expression.\n"
+                                        f'Could not compile module "{path}". [line 2]\n')
+        self.assertEqual(result.returncode, 65)
+
+class RecordingHooks(DebugHooks):
+    """Records each event with the line the interpreter was on."""
+    def __init__(self):
+        self.events = []
+
+    def statement(self, interpreter, stmt, line):
+        self.events.append((line, "statement"))
+
+    def enterCall(self, interpreter, name, line):
+        self.events.append((line, "call " + name))
+
+    def exitCall(self, interpreter, name, value):
+        self.events.append((interpreter.line, "return " + name + " " + interpreter.stringify(value)))
+
+    def runtimeError(self, interpreter, error):
+        self.events.append((interpreter.line, "error " + error.message))
+
+class DebuggerTest(unittest.TestCase):
+    SOURCE = """var a = 1;
+"literal";
+nil;
+fun f(x) {
+  if (x > 1) return x;
+  return f(x + 1);
+}
+print f(a);
+while (true) {
+  true;
+  a.field;
+}
+"""
+    EVENTS = [
+        (1, "statement"), (2, "statement"), (3, "statement"), (4, "statement"),
+        (8, "statement"), (8, "call f"),
+        (5, "statement"), (6, "statement"), (6, "call f"),
+        (5, "statement"), (5, "statement"), (5, "return f 2"), (5, "return f 2"),
+        (9, "statement"), (10, "statement"), (11, "statement"), (11, "error Only instances have properties."),
+    ]
+
+    def events(self, statements: list) -> list:
+        hooks = RecordingHooks()
+        interpreter = DebugInterpreter(hooks)
+        Resolver(interpreter).resolve(statements)
+        with contextlib.redirect_stdout(io.StringIO()), self.assertRaises(LoxRuntimeError):
+            interpreter.interpret(statements)
+        return hooks.events
+
+    def testReportsEachStatementOnItsLine(self):
+        self.assertEqual(self.events(Parser(Scanner(self.SOURCE).scanTokens()).parse()), self.EVENTS)
+
+    def testSameLinesFromAstFile(self):
+        data = AstFormat.dump(Parser(Scanner(self.SOURCE).scanTokens()).parse())
+        self.assertEqual(self.events(AstFormat.load(data)), self.EVENTS)
+
+class CoverageTest(unittest.TestCase):
+    SOURCE = """var x = 1;
+if (x > 5) {
+  print "big";
+} else {
+  print "small";
+}
+fun never() {
+  print "never";
+}
+fun falsely() {
+  return x and false;
+}
+print falsely();
+"""
+
+    def testMergesRuns(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source, tracefile = os.path.join(directory, "program.lox"), os.path.join(directory, "coverage.info")
+            with open(source, "w") as f:
+                f.write(self.SOURCE)
+            for _ in range(2):
+                result = runPython([os.path.join(LOX_DIR, "Lox.py"), "--coverage", tracefile, source])
+                self.assertEqual(result, ("small\nfalse\n", "", 0))
+            with open(tracefile) as f:
+                report = f.read()
+        # Neither the if's then branch nor the and's short circuit is taken, and never() is declared but never runs.
+        self.assertEqual(report, "\n".join([
+            "TN:", f"SF:{source}",
+            "BRDA:2,0,0,0", "BRDA:2,0,1,2", "BRDA:11,0,0,0", "BRDA:11,0,1,2", "BRF:4", "BRH:2",
+            "DA:1,2", "DA:2,2", "DA:3,0", "DA:5,2", "DA:7,2", "DA:8,0", "DA:10,2", "DA:11,2", "DA:13,2",
+            "LF:9", "LH:7", "end_of_record", "",
+        ]))
+
+class ParserRecoveryTest(unittest.TestCase):
+    def parse(self, source: str) -> tuple:
+        """The parser after parsing source, and the statements it parsed."""
+        parser = Parser(Scanner(source).scanTokens())
+        return parser, parser.parse()
+
+    def testReportsEveryIndependentError(self):
+        parser, statements = self.parse("""var = 1;
+print "ok";
+var b = 2
+print b;
+class { }
+if (true print 1;
+var c = (1 + ;
+fun (a) { }
+print "still parsed";
+print c
+""")
+        self.assertEqual([str(error) for error in parser.errors], [
+            "[line 1] Error at '=': Expect variable name.",
+            "[line 4] Error at 'print': Expect ';' after variable declaration.",
+            "[line 5] Error at '{': Expect class name.",
+            "[line 6] Error at 'print': Expect ')' after if condition.",
+            "[line 7] Error at ';': Expect expression.",
+            "[line 8] Error at '(': Expect function name.",
+            "[line 11] Error at end: Expect ';' after value.",
+        ])
+        # The statements between the errors are still parsed.
+        self.assertEqual([stmt.expression.value for stmt in statements], ["ok", "still parsed"])
+
+    def testSynchronizeStopsAtEndOfFile(self):
+        for source, error in [
+            ("print", "[line 1] Error at end: Expect expression."),
+            ("fun f(", "[line 1] Error at end: Expect parameter name."),
+            ("{ var x = 1;", "[line 1] Error at end: Expect '}' after block."),
+            # Nothing to synchronize on before the end.
+            ("print 1 2 3 4", "[line 1] Error at '2': Expect ';' after value."),
+        ]:
+            with self.subTest(source):
+                parser, _ = self.parse(source)
+                self.assertEqual([str(e) for e in parser.errors], [error])
+                self.assertEqual(parser.current, len(parser.tokens) - 1)
+                self.assertEqual(parser.tokens[parser.current].type, TokenType.EOF)
+
+class LintTest(unittest.TestCase):
+    # Each kind of finding, with a source that has it, and the line, column and message of each finding.
+    CASES = [
+        ("syntax-error", "error", 'var a = @;\nprint (1;', [
+            (1, 9, "Unexpected character: @"), (1, 10, "Expect expression."), (2, 9, "Expect ')' after expression.")]),
+        ("resolve-error", "error", 'fun f() {\n  { var a = 1; var a = 2; print a; }\n}', [
+            (2, 20, "Variable with this name already declared in this scope.")]),
+        ("unreachable-code", "warning", 'fun f() {\n  return 1;\n  print 2;\n}', [
+            (3, 9, "Code after a return is never run.")]),
+        ("unused-parameter", "warning", 'fun f(used, unused) {\n  return used;\n}', [
+            (1, 13, "Parameter 'unused' is never used.")]),
+        ("unused-variable", "warning", '{\n  var unused = 1;\n}', [
+            (2, 7, "Local 'unused' is never used.")]),
+        ("constant-condition", "warning", 'if (nil) print 1;\nwhile (!false) print 2;', [
+            (1, 5, "Condition is always false."), (2, 8, "Condition is always true.")]),
+        ("string-concat-in-loop", "warning", 'var s = "";\nfor (var i = 0; i < 3; i = i + 1) {\n    s = "x" + s;\n}', [
+            (3, 5, "'s' is built by adding to its front in a loop, which copies the whole string each time. Append to it instead.")]),
+        ("uncached-method-lookup", "warning", 'class A { m() {} }\nclass B < A {\n  n() { while (true) { this.m(); super.m(); } }\n}', [
+            (3, 29, "Method 'm' is looked up and bound on every iteration, since only fields are cached. Store it in a local before the loop."),
+            (3, 40, "'super.m' is looked up and bound on every iteration. Store it in a local before the loop.")]),
+    ]
+
+    def written(self, source: str, format: str) -> list:
+        out = io.StringIO()
+        writeFindings(lintSource(source, "t.lox"), format, out)
+        return out.getvalue().splitlines()
+
+    def testTextFormat(self):
+        for code, severity, source, expected in self.CASES:
+            with self.subTest(code):
+                self.assertEqual(self.written(source, "text"),
+                                 [f"t.lox:{line}:{column}: {severity} {code}: {message}" for line, column, message in expected])
+
+    def testJsonFormat(self):
+        for code, severity, source, expected in self.CASES:
+            with self.subTest(code):
+                self.assertEqual([json.loads(line) for line in self.written(source, "json")],
+                                 [{"path": "t.lox", "line": line, "column": column, "severity": severity, "code": code,
+                                   "message": message} for line, column, message in expected])
+
+class ReplSessionTest(unittest.TestCase):
+    LINES = [
+        "fun f(n) { var x = n; return x + 1; }",
+        "class C { init() { this.v = f(1); } get() { fun g() { return this.v; } return g(); } }",
+        "var c = C();",
+        "print c.get();",
+        "print missing;",
+        "var = ;",
+    ]
+
+    def session(self, session: ReplSession, rounds: int) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            for _ in range(rounds):
+                for line in self.LINES:
+                    try:
+                        session.run(line)
+                    except Exception:
+                        pass
+        return output.getvalue()
+
+    def retained(self) -> int:
+        """The syntax tree nodes and environments alive."""
+        gc.collect()
+        return sum(1 for obj in gc.get_objects() if isinstance(obj, (E.Expr, S.Stmt, Environment)))
+
+    def testRedefinitionsAreFreed(self):
+        session = ReplSession(Interpreter())
+        self.assertEqual(self.session(session, 10), "2\n" * 10)
+        before = self.retained()
+        self.assertEqual(self.session(session, 1000), "2\n" * 1000)
+        self.assertEqual(self.retained(), before)
+
+class AllocationTrackerTest(unittest.TestCase):
+    SOURCE = """
+        fun f(n) { var x = n; return x; }
+        for (var i = 0; i < 100; i = i + 1) f(i);
+    """
+
+    def testCountsRecycledFrames(self):
+        # Fill the free list before tracking starts, as an earlier program in the process would.
+        runLox(Interpreter(), self.SOURCE)
+        self.assertTrue(Environment.pool.frames)
+        interpreter = TrackingInterpreter()
+        tracker = AllocationTracker(interpreter)
+        tracker.install()
+        try:
+            runLox(interpreter, self.SOURCE)
+            gc.collect()
+        finally:
+            tracker.uninstall()
+        report = tracker.toDict()
+        # A call frame and a loop body block for each of the 100 iterations, and the loop's own scope.
+        self.assertEqual(report["allocations"]["Environment"], 201)
+        self.assertEqual(report["liveAtExit"]["Environment"], 0)
+        self.assertEqual(report["allocations"]["LoxFunction"], 1)
+
+class EnvironmentPoolTest(unittest.TestCase):
+    SOURCE = """
+        fun f(n) { var x = n; return x; }
+        var total = 0;
+        for (var i = 0; i < 2000; i = i + 1) total = total + f(i);
+        print total;
+    """
+
+    def testEachThreadHasItsOwnFreeList(self):
+        runLox(Interpreter(), self.SOURCE)
+        pooled = list(Environment.pool.frames)
+        self.assertTrue(pooled)
+        seen = []
+        def run():
+            seen.append(len(Environment.pool.frames))
+            runLox(Interpreter(), self.SOURCE)
+            seen.append(len(Environment.pool.frames))
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        # The thread started with an empty free list, filled its own, and left this thread's alone.
+        self.assertEqual(seen[0], 0)
+        self.assertGreater(seen[1], 0)
+        self.assertEqual(Environment.pool.frames, pooled)
+
+    def testConcurrentInterpreters(self):
+        results = []
+        def run():
+            interpreter = Interpreter()
+            statements = Parser(Scanner(self.SOURCE.replace("print total;", "")).scanTokens()).parse()
+            Resolver(interpreter).resolve(statements)
+            interpreter.interpret(statements)
+            results.append(interpreter.globals.values["total"])
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [1999000.0] * 4)
+
+class TaggedOutput:
+    """Output that records each printed line with the name of the program that printed it."""
+    def __init__(self, log: list, name: str):
+        self.log = log
+        self.name = name
+
+    def write(self, text: str):
+        self.log.append(self.name + ":" + text.rstrip("\n"))
+
+async def settle():
+    """Lets every other task on the loop run until it blocks."""
+    for _ in range(100):
+        await asyncio.sleep(0)
+
+class AsyncLoxTest(unittest.TestCase):
+    COUNT = "for (var i = 0; i < 3; i = i + 1) print i;"
+
+    def testInputSuspendsUntilFed(self):
+        async def scenario():
+            input, output = InputQueue(), io.StringIO()
+            source = 'print "ready"; print "got " + input(); print input();'
+            task = asyncio.create_task(runProgram(source, input, output))
+            await settle()
+            self.assertEqual(output.getvalue(), "ready\n")
+            self.assertFalse(task.done())
+            input.feed("x")
+            await settle()
+            self.assertEqual(output.getvalue(), "ready\ngot x\n")
+            self.assertFalse(task.done())
+            # End of input reads as nil.
+            input.close()
+            await task
+            self.assertEqual(output.getvalue(), "ready\ngot x\nnil\n")
+        asyncio.run(scenario())
+
+    def testProgramsTakeTurns(self):
+        async def scenario():
+            log = []
+            await asyncio.gather(runProgram(self.COUNT, output=TaggedOutput(log, "a"), sliceSize=1),
+                                 runProgram(self.COUNT, output=TaggedOutput(log, "b"), sliceSize=1))
+            return log
+        self.assertEqual(asyncio.run(scenario()), ["a:0", "b:0", "a:1", "b:1", "a:2", "b:2"])
+
+    def testWaitingForInputDoesNotBlockOthers(self):
+        async def scenario():
+            log, input = [], InputQueue()
+            waiting = asyncio.create_task(runProgram("print input();", input, TaggedOutput(log, "a")))
+            await runProgram(self.COUNT, output=TaggedOutput(log, "b"), sliceSize=1)
+            self.assertFalse(waiting.done())
+            input.feed("line")
+            await waiting
+            return log
+        self.assertEqual(asyncio.run(scenario()), ["b:0", "b:1", "b:2", "a:line"])
+
+class SchedulerTest(unittest.TestCase):
+    FIVE = "print 1; print 2; print 3; print 4; print 5;"
+    FOREVER = "var i = 0; while (true) { i = i + 1; print i; }"
+
+    def testTasksTakeTurns(self):
+        log = []
+        scheduler = Scheduler(sliceSize=2)
+        scheduler.spawn(self.FIVE, output=TaggedOutput(log, "a"))
+        scheduler.spawn(self.FIVE, output=TaggedOutput(log, "b"))
+        scheduler.run()
+        # The first slice of each task ends before its second statement, later ones every two statements.
+        self.assertEqual(log, ["a:1", "b:1", "a:2", "a:3", "b:2", "b:3", "a:4", "a:5", "b:4", "b:5"])
+
+    def testBudgetCountsStatements(self):
+        scheduler = Scheduler(sliceSize=2)
+        within = scheduler.spawn(self.FIVE, budget=5)
+        over = scheduler.spawn(self.FIVE, budget=4)
+        scheduler.run()
+        self.assertEqual((within.state, within.output.getvalue()), (TaskState.DONE, "1\n2\n3\n4\n5\n"))
+        self.assertEqual((over.state, over.output.getvalue()), (TaskState.ABORTED, "1\n2\n3\n4\n"))
+        self.assertIsInstance(over.error, BudgetExceeded)
+        self.assertEqual(str(over.error), "Statement budget exceeded.")
+
+    def testTimeLimitFiresAtSliceBoundary(self):
+        scheduler = Scheduler(sliceSize=2)
+        task = scheduler.spawn(self.FOREVER, timeLimit=2.5)
+        # Each slice appears to take one second, so the limit is passed during the third slice.
+        clock = iter(range(1000))
+        with mock.patch("Scheduler.time.perf_counter", lambda: next(clock)):
+            scheduler.run()
+        self.assertEqual(task.state, TaskState.ABORTED)
+        self.assertEqual(str(task.error), "Time limit exceeded.")
+        self.assertEqual(task.elapsed, 3)
+        # The third slice still ran to its end before the limit was checked.
+        self.assertEqual(task.executed, 6)
+
+    def testAbort(self):
+        scheduler = Scheduler(sliceSize=2)
+        aborted = scheduler.spawn(self.FOREVER)
+        other = scheduler.spawn(self.FIVE)
+        waiting = scheduler.spawn("print input();")
+        notStarted = scheduler.spawn(self.FIVE)
+        scheduler.step()
+        scheduler.step()
+        scheduler.step()
+        self.assertEqual(waiting.state, TaskState.WAITING)
+        for task in (aborted, waiting, notStarted):
+            scheduler.abort(task)
+        scheduler.run()
+        for task in (aborted, waiting, notStarted):
+            self.assertEqual(task.state, TaskState.ABORTED)
+            self.assertIsInstance(task.error, ProgramAborted)
+            self.assertTrue(task.program.finished)
+        # The program threads of the suspended tasks were unwound, not left blocked.
+        self.assertFalse(aborted.program.thread.is_alive())
+        self.assertFalse(waiting.program.thread.is_alive())
+        self.assertIsNone(notStarted.program.thread)
+        self.assertEqual(notStarted.output.getvalue(), "")
+        self.assertEqual((other.state, other.output.getvalue()), (TaskState.DONE, "1\n2\n3\n4\n5\n"))
+        self.assertEqual(scheduler.tasks, type(scheduler.tasks)())
+
+class StringTableTest(unittest.TestCase):
+    def testInternsEqualStrings(self):
+        table = StringTable()
+        first = table.intern("".join(["ab", "c"]))
+        self.assertIs(table.intern("".join(["a", "bc"])), first)
+
+    def testSkipsLongStrings(self):
+        table = StringTable()
+        table.intern("a" * MAX_INTERNED_LENGTH)
+        self.assertEqual(len(table.strings), 0)
+
+    def testDropsOldestPastMaxSize(self):
+        table = StringTable(maxSize=100)
+        for i in range(1000):
+            table.intern(str(i))
+        self.assertEqual(len(table.strings), 100)
+        self.assertNotIn("0", table.strings)
+        self.assertEqual(list(table.strings)[0], "900")
+        # A string dropped from the table is interned again as a new entry.
+        fresh = "".join(["0"])
+        self.assertIs(table.intern(fresh), fresh)
+        self.assertNotIn("900", table.strings)
+
+class SnapshotTest(unittest.TestCase):
+    def testRestoresDeepStructures(self):
+        # Deep enough to overflow the C stack if the snapshot were pickled recursively.
+        source = """
+            class Node { init(next) { this.next = next; } }
+            var head = nil;
+            for (var i = 0; i < 100000; i = i + 1) head = Node(head);
+            fun count(node) { var n = 0; while (node != nil) { n = n + 1; node = node.next; } return n; }
+        """
+        data = takeSnapshot(self.interpreterWith(source))
+        restored = Interpreter()
+        restoreSnapshot(restored, data)
+        self.assertEqual(runLox(restored, "print count(head);"), "100000\n")
+
+    def testKeepsSharingAndCycles(self):
+        source = """
+            class Pair {}
+            var a = Pair();
+            var b = Pair();
+            a.other = b;
+            b.other = a;
+            var list = List();
+            list.append(a);
+            list.append(a);
+            fun get() { return a; }
+        """
+        restored = Interpreter()
+        restoreSnapshot(restored, takeSnapshot(self.interpreterWith(source)))
+        output = runLox(restored, "print a.other.other == a; print list.get(0) == list.get(1); print get() == a;")
+        self.assertEqual(output, "true\ntrue\ntrue\n")
+
+    def testFailedSaveKeepsOldFile(self):
+        interpreter = self.interpreterWith("var x = 1;")
+        interpreter.globals.define("y", lambda: None)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "state.snapshot")
+            with open(path, "wb") as f:
+                f.write(b"old")
+            with self.assertRaises(SnapshotError):
+                saveSnapshot(interpreter, path)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"old")
+            self.assertEqual(os.listdir(directory), ["state.snapshot"])
+
+    def testRejectsInvalidData(self):
+        with self.assertRaises(SnapshotError):
+            restoreSnapshot(Interpreter(), b"not a snapshot")
+
+    def interpreterWith(self, source: str) -> Interpreter:
+        interpreter = Interpreter()
+        runLox(interpreter, source)
+        return interpreter
+
+class AstFormatTest(unittest.TestCase):
+    SOURCE = "class A < B { f(x) { return x.y + \"s\" and nil; } } var a = A(); for (;;) print !-1;"
+
+    def testRoundTrips(self):
+        statements = Parser(Scanner(self.SOURCE).scanTokens()).parse()
+        loaded = AstFormat.load(AstFormat.dump(statements))
+        self.assertEqual(AstFormat.dump(loaded), AstFormat.dump(statements))
+
+    def testTokenTypeChangeInvalidatesFiles(self):
+        data = AstFormat.dump(Parser(Scanner(self.SOURCE).scanTokens()).parse())
+        # A token type inserted before the others shifts every ordinal written to the file.
+        changed = enum.Enum("TokenType", ["ADDED"] + [tokenType.name for tokenType in TokenType])
+        self.assertNotEqual(AstFormat.schemaHash(changed), AstFormat.SCHEMA)
+        schema = AstFormat.SCHEMA
+        AstFormat.SCHEMA = AstFormat.schemaHash(changed)
+        try:
+            with self.assertRaises(AstFormat.AstFormatError):
+                AstFormat.load(data)
+        finally:
+            AstFormat.SCHEMA = schema
+
+class LanguageServerTest(unittest.TestCase):
+    def serve(self, messages: list) -> list:
+        """Runs a server over messages and returns the replies and notifications it sent."""
+        input = io.BytesIO()
+        for message in messages:
+            body = json.dumps(message).encode("utf-8")
+            input.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+        input.seek(0)
+        output = io.BytesIO()
+        with contextlib.redirect_stderr(io.StringIO()):
+            LanguageServer(input, output).serve()
+        sent, data = [], output.getvalue()
+        while data:
+            header, _, data = data.partition(b"\r\n\r\n")
+            length = int(header.split(b":")[1])
+            sent.append(json.loads(data[:length]))
+            data = data[length:]
+        return sent
+
+    def testSurvivesFailedMessages(self):
+        uri = "file:///a.lox"
+        sent = self.serve([
+            {"jsonrpc": "2.0", "method": "textDocument/didChange",
+             "params": {"textDocument": {"uri": uri}, "contentChanges": [{"text": "var a;"}]}},
+            {"jsonrpc": "2.0", "id": 1, "method": "textDocument/hover",
+             "params": {"textDocument": {"uri": uri}, "position": {"line": 0, "character": 4}}},
+            {"jsonrpc": "2.0", "id": 2, "method": "textDocument/definition", "params": {}},
+            {"jsonrpc": "2.0", "method": "textDocument/didOpen",
+             "params": {"textDocument": {"uri": uri, "text": "var a = 1;\nprint a;"}}},
+            {"jsonrpc": "2.0", "id": 3, "method": "textDocument/definition",
+             "params": {"textDocument": {"uri": uri}, "position": {"line": 1, "character": 6}}},
+        ])
+        replies = {message["id"]: message for message in sent if "id" in message}
+        self.assertEqual(replies[1]["error"]["code"], INVALID_PARAMS)
+        self.assertEqual(replies[2]["error"]["code"], INTERNAL_ERROR)
+        self.assertEqual(replies[3]["result"]["range"]["start"], {"line": 0, "character": 4})
+
+if __name__ == "__main__":
+    unittest.main()
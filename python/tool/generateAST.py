@@ -1,8 +1,9 @@
 # generateAST.py
 # This is a tool to generate the AST classes for Lox.
-# When run, this script outputs Expr.py and Stmt.py.
+# When run, this script outputs Expr.py and Stmt.py, AstChildren.py for walking the tree,
+# and AstCodec.py for the binary AST format.
 # Written by: Joel Peckham.
-# Last Modified: 03/17/2022.
+# Last Modified: 10/19/2026.
 
 class GrammarNotation:
     """Class for holding and parsing grammar notation."""
@@ -12,8 +13,9 @@ class GrammarNotation:
         self.name = notationString.split(":")[0].strip()
         self.fields = [x.strip().split(" ") for x in notationString.split(":")[1].strip().split(",")]
 
-def defineAST(outputDir, baseClassName, typeList):
-    """Writes the AST class files to the output directory."""
+def defineAST(outputDir, baseClassName, typeList, annotations={}):
+    """Writes the AST class files to the output directory.
+    Each type in annotations gets the listed attributes, defaulting to None, for later passes to fill in."""
 
     with open(outputDir + baseClassName + ".py", "w") as f:
         # Introduce the file with a comment.
@@ -37,6 +39,8 @@ def defineAST(outputDir, baseClassName, typeList):
         # Write a class for each type with an accept method.
         for t in typeList:
             f.write(f"\nclass {t.name}({baseClassName}):\n")
+            for attribute in annotations.get(t.name, []):
+                f.write(f"\t{attribute} = None\n")
             parameterString = ", ".join([f"{x[1]}" for x in t.fields])
             f.write(f"\tdef __init__(self, {parameterString}):\n")
             f.write(f'\t\t"""{t.notationString}"""\n')
@@ -53,6 +57,90 @@ def defineAST(outputDir, baseClassName, typeList):
             f.write(f"\tdef visit{t.name}{baseClassName}(self, {t.name.lower()}{baseClassName}):\n")
             f.write("\t\tpass\n\n")
 
+def fieldKind(fieldType):
+    """How the codec stores a field: inline in its node's record, or as a child encoded before it."""
+    if fieldType in ("Token", "List<Token>", "Object"):
+        return fieldType
+    return "child"
+
+def defineChildren(outputDir, fileName, grammar):
+    """Writes CHILDREN, which maps each node class to a function returning its child nodes and lists,
+    in field order, for the passes that walk the tree without a visitor."""
+
+    with open(outputDir + fileName + ".py", "w") as f:
+        from datetime import datetime as dt
+        startComment = f"""# {fileName}.py\n# This file was generated by tool/generateAST.py.\n# Generated by: Joel Peckham.\n# Last Modified: {str(dt.now())[:-16]}.\n\n"""
+        f.write(startComment)
+        f.write("import " + ", ".join(baseClassName for baseClassName, _ in grammar) + "\n")
+
+        nodes = []
+        for baseClassName, typeList in grammar:
+            for t in [GrammarNotation(typeString) for typeString in typeList]:
+                suffix = t.name + baseClassName
+                nodes.append((baseClassName, t.name, suffix))
+                children = [field[1] for field in t.fields if fieldKind(field[0]) == "child"]
+                f.write(f"\ndef children{suffix}(node):\n")
+                childString = ", ".join(f"node.{name}" for name in children)
+                f.write(f"\treturn ({childString}{',' if len(children) == 1 else ''})\n")
+
+        f.write("\nCHILDREN = {\n" + "".join(f"\t{base}.{name}: children{suffix},\n" for base, name, suffix in nodes) + "}\n")
+
+def defineCodec(outputDir, fileName, grammar, savedAnnotations={}):
+    """Writes the encoder and decoder of the binary AST format used by AstFormat.py.
+    Nodes are written in post-order: a node's child nodes and lists come first, then its tag and
+    inline fields. Decoding is then a loop that pops each node's children off a stack.
+    The token annotations in savedAnnotations are written after the inline fields, and may be missing."""
+
+    import zlib
+    with open(outputDir + fileName + ".py", "w") as f:
+        from datetime import datetime as dt
+        startComment = f"""# {fileName}.py\n# This file was generated by tool/generateAST.py.\n# Generated by: Joel Peckham.\n# Last Modified: {str(dt.now())[:-16]}.\n\n"""
+        f.write(startComment)
+        f.write("import " + ", ".join(baseClassName for baseClassName, _ in grammar) + "\n")
+
+        # Files written for a different grammar would decode to the wrong nodes, so they carry its hash.
+        specification = "\n".join(typeString for _, typeList in grammar for typeString in typeList)
+        specification += "".join(f"\n{name}.{attribute}" for name, attributes in savedAnnotations.items() for attribute in attributes)
+        f.write(f"\n# Hash of the grammar the tags were numbered from.\nGRAMMAR = {zlib.crc32(specification.encode()):#010x}\n")
+        f.write("\n# Tags 0 and 1 are a missing node and a list; node tags follow in grammar order.\nNONE = 0\nLIST = 1\n")
+
+        tag = 2
+        nodes = []
+        for baseClassName, typeList in grammar:
+            for t in [GrammarNotation(typeString) for typeString in typeList]:
+                suffix = t.name + baseClassName
+                nodes.append((baseClassName, t.name, suffix))
+                children = [field[1] for field in t.fields if fieldKind(field[0]) == "child"]
+                inline = [field for field in t.fields if fieldKind(field[0]) != "child"]
+                saved = savedAnnotations.get(t.name, [])
+
+                f.write(f"\ndef write{suffix}(writer, node):\n")
+                f.write(f"\twriter.varint({tag})\n")
+                for fieldType, name in inline:
+                    method = {"Token": "token", "List<Token>": "tokens", "Object": "object"}[fieldType]
+                    f.write(f"\twriter.{method}(node.{name})\n")
+                for attribute in saved:
+                    f.write(f"\twriter.optionalToken(node.{attribute})\n")
+
+                f.write(f"\ndef read{suffix}(reader, stack):\n")
+                for name in reversed(children):
+                    f.write(f"\t{name} = stack.pop()\n")
+                for fieldType, name in inline:
+                    method = {"Token": "token", "List<Token>": "tokens", "Object": "object"}[fieldType]
+                    f.write(f"\t{name} = reader.{method}()\n")
+                parameterString = ", ".join(field[1] for field in t.fields)
+                if saved:
+                    f.write(f"\tnode = {baseClassName}.{t.name}({parameterString})\n")
+                    for attribute in saved:
+                        f.write(f"\tnode.{attribute} = reader.optionalToken()\n")
+                    f.write("\tstack.append(node)\n")
+                else:
+                    f.write(f"\tstack.append({baseClassName}.{t.name}({parameterString}))\n")
+                tag += 1
+
+        f.write("\nWRITERS = {\n" + "".join(f"\t{base}.{name}: write{suffix},\n" for base, name, suffix in nodes) + "}\n")
+        f.write("\nREADERS = [\n\tNone,\n\tNone,\n" + "".join(f"\tread{suffix},\n" for _, _, suffix in nodes) + "]\n")
+
 
 expressionList = [
     "Assign   : Token name, Expr value",
@@ -69,12 +157,48 @@ expressionList = [
     "Variable : Token name"
 ]
 
+# Attributes stored on the nodes themselves: the Resolver's scope distance for
+# expressions that refer to a variable, the inline shape cache of property accesses,
+# the flags Coverage.py numbers branches with, and the token a literal was parsed from.
+expressionAnnotations = {
+    "Assign": ["depth"],
+    "Get": ["shape", "index"],
+    "Literal": ["token"],
+    "Logical": ["coverageBranch"],
+    "Set": ["shape", "index", "nextShape"],
+    "Super": ["depth"],
+    "This": ["depth"],
+    "Variable": ["depth"]
+}
+
+# Whether a closure may capture the scope of a block or function, set by the Resolver,
+# the execution counts and compiled traces of loops and functions kept by the JIT,
+# and the flags Coverage.py numbers statements and branches with.
+statementAnnotations = {
+    "Block": ["captured"],
+    "Class": ["coverageSlot"],
+    "Expression": ["coverageSlot"],
+    "Function": ["captured", "hits", "trace", "coverageSlot"],
+    "If": ["coverageSlot", "coverageBranch"],
+    "Import": ["coverageSlot"],
+    "Print": ["coverageSlot"],
+    "Return": ["coverageSlot"],
+    "Var": ["coverageSlot"],
+    "While": ["hits", "trace", "coverageSlot", "coverageBranch"]
+}
+
+# The annotations the binary AST format keeps, so positions read from a loaded tree match the parsed one.
+savedAnnotations = {
+    "Literal": ["token"]
+}
+
 statementList = [
     "Block          : List<Stmt> statements",
     "Class          : Token name, Expr.Variable superclass, List<Stmt.Function> methods",
     "Expression     : Expr expression",
     "Function       : Token name, List<Token> params, List<Stmt> body",
     "If             : Expr condition, Stmt thenBranch, Stmt elseBranch",
+    "Import         : Token keyword, Token path",
     "Print          : Expr expression",
     "Return         : Token keyword, Expr value",
     "Var            : Token name, Expr initializer",
@@ -82,6 +206,10 @@ statementList = [
 ]
 
 # Actually define the AST classes and write them to the output directory.
+# Importing this file only reads the grammar, as test/fuzz.py does.
 
-defineAST("","Expr", expressionList)
-defineAST("","Stmt", statementList)
\ No newline at end of file
+if __name__ == "__main__":
+    defineAST("","Expr", expressionList, expressionAnnotations)
+    defineAST("","Stmt", statementList, statementAnnotations)
+    defineChildren("", "AstChildren", [("Expr", expressionList), ("Stmt", statementList)])
+    defineCodec("", "AstCodec", [("Expr", expressionList), ("Stmt", statementList)], savedAnnotations)
\ No newline at end of file